@@ -1,20 +1,53 @@
 import os
+from functools import partial
 from aiogram import executor
 from dotenv import load_dotenv
-from loader import dp, db
+from data import config
+from loader import dp, bot, db, scheduler, deadlines, broadcaster, admins, lifecycle, metrics_server, errors
 import middlewares, filters, handlers
 from utils.notify_admins import on_startup_notify
 from utils.set_bot_commands import set_default_commands
+from utils.webhook import start_webhook
+from utils.supervisor import Supervisor, serve_worker
+from utils.lifecycle import exit_on_sigterm
 
 load_dotenv()
 
-async def on_startup(dispatcher):
+async def on_startup(dispatcher, worker_id=0):
+    if config.METRICS_PORT:
+        await metrics_server.start(config.METRICS_HOST, config.METRICS_PORT + worker_id)
+    # Xatolar har bir ishchida sanaladi, jamlanmasi ham har birida yuboriladi
+    errors.start()
+    if worker_id:
+        # Qo‘shimcha ishchilar faqat updatelarni qayta ishlaydi
+        return
     await set_default_commands(dispatcher)
     try:
         db.create_tables()
     except Exception as e:
         print(f"DB xatosi: {e}")
-    await on_startup_notify(dispatcher)
+    scheduler.start()
+    deadlines.sync()
+    broadcaster.resume()
+    await on_startup_notify(dispatcher, admins.ids())
+
+async def on_shutdown(dispatcher):
+    await lifecycle.shutdown()
+
+def run_worker(worker_id, queue):
+    """Supervisor ishchisi; taymer, muddatlar va tarqatishlar faqat #0 da ishlaydi"""
+    serve_worker(dp, queue, on_startup=partial(on_startup, worker_id=worker_id), on_shutdown=on_shutdown)
 
 if __name__ == '__main__':
-    executor.start_polling(dp, on_startup=on_startup, skip_updates=True)
\ No newline at end of file
+    if config.MODE == "webhook":
+        start_webhook(
+            dp, on_startup=on_startup, on_shutdown=on_shutdown,
+            webhook_url=f"{config.WEBHOOK_HOST}{config.WEBHOOK_PATH}" if config.WEBHOOK_HOST else None,
+            path=config.WEBHOOK_PATH, secret=config.WEBHOOK_SECRET,
+            host=config.WEBAPP_HOST, port=config.WEBAPP_PORT
+        )
+    elif config.MODE == "supervisor":
+        Supervisor(bot, run_worker, workers=config.WORKERS).run()
+    else:
+        exit_on_sigterm()
+        executor.start_polling(dp, on_startup=on_startup, on_shutdown=on_shutdown, skip_updates=True)
\ No newline at end of file
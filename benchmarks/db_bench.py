@@ -0,0 +1,411 @@
+"""
+Database va UserDatabase metodlari uchun mikrobenchmark.
+
+Har bir o‘lcham uchun sintetik baza (foydalanuvchilar va buyurtmalar,
+haqiqatga yaqin holatlar taqsimoti bilan) bir marta yaratiladi va
+--data-dir da saqlanadi, keyingi ishga tushirishlarda nusxasi ishlatiladi.
+Har bir ochiq metod (va admin statistikasi yo‘li) o‘lchanadi, natija JSON
+faylga yoziladi; --compare bilan avvalgi natija bilan solishtiriladi.
+
+    python -m benchmarks.db_bench --sizes 1000 100000 --json db-bench.json
+    python -m benchmarks.db_bench --sizes 1000000 --compare db-bench.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Buyurtma holatlari ulushi (ko‘pchiligi bajarilgan, oz qismi kutilmoqda)
+STATUS_MIX = (("Bajarildi", 0.65), ("Rad etildi", 0.15), ("Qabul qilindi", 0.12), ("Jarayonda", 0.08))
+FIRST_NAMES = ("Aziz", "Dilnoza", "Jasur", "Madina", "Otabek", "Sevara", "Bekzod", "Nilufar", "Sardor", "Zarina")
+LAST_NAMES = ("Karimov", "Yusupova", "Rahimov", "Toshmatova", "Ergashev", "Aliyeva", "Sultonov", "Qodirova")
+ADMIN_IDS = (37054118, 973358587, 555000111)
+USER_BASE = 10 ** 9
+HISTORY_DAYS = 730
+MIN_RUNS = 3
+
+
+def seed_database(path, size, rng):
+    """size ta foydalanuvchi va size ta buyurtmali asosiy baza"""
+    from data.services import SERVICES
+    from utils.db_api.database import Database
+    from utils.db_api.profiler import profiler
+    from utils.deadlines import DUE_SOON, OVERDUE
+
+    profiler.enabled = False
+    db = Database(path)
+    db.seed_services(SERVICES)
+    services = [(name, info["price"], info["min_pages"]) for name, info in SERVICES.items()]
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    cursor = db.conn.cursor()
+
+    def timestamp(days_ago):
+        return (now - timedelta(seconds=int(days_ago * 86400))).strftime("%Y-%m-%d %H:%M:%S")
+
+    users = []
+    for i in range(size):
+        joined = rng.random() * HISTORY_DAYS
+        users.append((
+            USER_BASE + i, f"user{i}", timestamp(joined), timestamp(joined * rng.random()), int(rng.random() > 0.05)
+        ))
+    cursor.executemany(
+        "INSERT INTO Users (telegram_id, username, created_at, last_active, is_active) VALUES (?, ?, ?, ?, ?)", users
+    )
+
+    statuses = [status for status, _ in STATUS_MIX]
+    weights = [weight for _, weight in STATUS_MIX]
+    orders = []
+    jobs = []
+    for order_id in range(1, size + 1):
+        # Kam sonli foydalanuvchilar ko‘p buyurtma beradi
+        user_index = int(size * rng.random() ** 2)
+        status = rng.choices(statuses, weights)[0]
+        # Kutilayotgan va qabul qilingan buyurtmalar asosan yangi
+        age = rng.random() * (30 if status in ("Jarayonda", "Qabul qilindi") else HISTORY_DAYS)
+        created = now - timedelta(days=age)
+        deadline = created + timedelta(days=rng.choice((1, 3, 7, 14)))
+        deadline_at = int(deadline.timestamp())
+        service, price, min_pages = rng.choice(services)
+        pages = rng.randint(min_pages, 40)
+        admin_id = rng.choice(ADMIN_IDS) if status in ("Qabul qilindi", "Bajarildi") else None
+        orders.append((
+            order_id, USER_BASE + user_index, f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            f"user{user_index}", None, service, f"Mavzu {order_id}", pages, price, pages * price,
+            deadline.strftime("%d.%m.%Y"), status, created.strftime("%Y-%m-%d %H:%M:%S"), admin_id, deadline_at, 1
+        ))
+        if status == "Jarayonda":
+            jobs.append(("reminder", order_id, USER_BASE + user_index, time.time() + rng.random() * 43200, "pending"))
+        elif status == "Qabul qilindi":
+            jobs.append((DUE_SOON, order_id, admin_id, deadline_at - 86400, "pending"))
+            jobs.append((OVERDUE, order_id, admin_id, deadline_at, "pending"))
+    cursor.executemany(
+        "INSERT INTO Orders (order_id, user_id, user, username, phone, service, subject, pages, price, total_price, "
+        "deadline, status, created_at, confirmed_by_admin_id, deadline_at, catalog_version) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", orders
+    )
+    cursor.executemany("INSERT INTO Jobs (kind, order_id, chat_id, run_at, status) VALUES (?, ?, ?, ?, ?)", jobs)
+
+    # Jamlanmalar, admin hisoblagichlari va qidiruv indeksi bazaning o‘z backfill kodi bilan
+    for table in ("RevenueDaily", "RevenueMonthly", "AdminStats", "AdminLatency", "OrderSearch"):
+        cursor.execute(f"DELETE FROM {table}")
+    db._backfill_revenue()
+    db._backfill_admin_stats()
+    db._backfill_search()
+    cursor.executemany(
+        "INSERT INTO AdminLatency (admin_id, metric, bucket, count) VALUES (?, ?, ?, ?)",
+        [(admin_id, metric, bucket, rng.randint(1, size // 100 + 1))
+         for admin_id in ADMIN_IDS for metric in ("accept", "complete") for bucket in (300, 3600, 86400)]
+    )
+    db.create_broadcast(ADMIN_IDS[0], "Benchmark xabari")
+    db.conn.commit()
+    cursor.execute("ANALYZE")
+    db.close()
+    profiler.enabled = True
+
+
+def seed_user_database(path, size, rng):
+    """UserDatabase (utils/db_api/user.py) uchun Users jadvali"""
+    from utils.db_api.user import UserDatabase
+
+    users = UserDatabase(path)
+    users.create_table_users()
+    now = users._get_current_time()
+    rows = []
+    for i in range(size):
+        joined = now - timedelta(days=rng.random() * HISTORY_DAYS)
+        active = joined + (now - joined) * rng.random()
+        rows.append((USER_BASE + i, f"user{i}", joined.isoformat(), active.isoformat(), int(rng.random() < 0.001)))
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            "INSERT INTO Users (telegram_id, username, created_at, last_active, is_admin) VALUES (?, ?, ?, ?, ?)", rows
+        )
+
+
+def measure(func, setup=None, repeat=20, budget=2.0):
+    """Bir marta isitib, keyin repeat marta (budget soniyadan oshmasdan) o‘lchash"""
+    func(*(setup() if setup else ()))
+    times = []
+    deadline = time.perf_counter() + budget
+    while len(times) < repeat and (len(times) < MIN_RUNS or time.perf_counter() < deadline):
+        args = setup() if setup else ()
+        started = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - started)
+    times.sort()
+    return {
+        "runs": len(times),
+        "min": times[0],
+        "median": statistics.median(times),
+        "mean": statistics.mean(times),
+        "p95": times[min(len(times) - 1, int(len(times) * 0.95))],
+    }
+
+
+def database_cases(db, size, rng):
+    """(nom, funksiya, setup) - Database ning har bir ochiq metodi"""
+    from data.services import SERVICES
+    from utils.db_api.database import local_now
+    from utils.deadlines import DUE_SOON, OVERDUE
+
+    db.cursor.execute("SELECT order_id FROM Orders WHERE status = 'Jarayonda'")
+    pending = [row[0] for row in db.cursor.fetchall()]
+    db.cursor.execute("SELECT order_id FROM Orders WHERE status = 'Qabul qilindi'")
+    accepted = [row[0] for row in db.cursor.fetchall()]
+    db.cursor.execute("SELECT user_id FROM Orders WHERE status = 'Qabul qilindi' LIMIT 1000")
+    accepted_users = [row[0] for row in db.cursor.fetchall()] or [USER_BASE]
+    db.cursor.execute("SELECT job_id FROM Jobs WHERE status = 'pending' LIMIT 1000")
+    job_ids = [row[0] for row in db.cursor.fetchall()]
+    new_users = iter(range(USER_BASE + size, USER_BASE + 10 * size + 10 ** 6))
+    broadcast_id = db.get_running_broadcasts()[0]
+    today = local_now()
+    months = [today.strftime("%Y-%m"), (today.replace(day=1) - timedelta(days=1)).strftime("%Y-%m")]
+
+    def user_id():
+        return USER_BASE + rng.randrange(size)
+
+    def order_id():
+        return rng.randint(1, size)
+
+    def new_order():
+        pages = rng.randint(5, 40)
+        return {
+            "user_id": user_id(), "user": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "username": "bench", "phone": None, "service": "📑 Mustaqil ish", "subject": "Benchmark",
+            "pages": pages, "price": 2000, "total_price": pages * 2000,
+            "deadline": (today + timedelta(days=3)).strftime("%d.%m.%Y"), "status": "Jarayonda",
+            "catalog_version": 1,
+        }
+
+    def next_pending():
+        return (pending.pop() if pending else db.add_order(new_order()),)
+
+    def next_accepted():
+        return (accepted.pop() if accepted else db.add_order(new_order()),)
+
+    def admin_stats():
+        # handlers/users/admin.py: show_stats dagi so‘rovlar
+        db.count_users()
+        db.get_status_totals()
+        db.get_daily_totals("Qabul qilindi", 60)
+        db.get_monthly_totals("Qabul qilindi", months)
+        db.get_service_totals("Qabul qilindi", 30)
+
+    def admin_perf():
+        # handlers/users/admin.py: show_admin_performance
+        db.get_admin_stats()
+        db.get_admin_latency()
+
+    return [
+        ("add_user", db.add_user, lambda: (next(new_users), "bench")),
+        ("update_last_active", db.update_last_active, lambda: (user_id(),)),
+        ("select_user", db.select_user, lambda: (user_id(),)),
+        ("count_users", db.count_users, None),
+        ("count_active_users", db.count_active_users, None),
+        ("get_active_users_after", db.get_active_users_after, lambda: (rng.randrange(size), 100)),
+        ("deactivate_user", db.deactivate_user, lambda: (user_id(),)),
+        ("add_order", db.add_order, lambda: (new_order(),)),
+        ("get_orders", db.get_orders, None),
+        ("get_orders(Jarayonda)", db.get_orders, lambda: ("Jarayonda",)),
+        ("transition_order_status(accept)", db.transition_order_status,
+         lambda: (*next_pending(), "Jarayonda", "Qabul qilindi", rng.choice(ADMIN_IDS))),
+        ("transition_order_status(complete)", db.transition_order_status,
+         lambda: (*next_accepted(), "Qabul qilindi", "Bajarildi")),
+        ("transition_order_status(conflict)", db.transition_order_status,
+         lambda: (order_id(), "Bajarildi", "Qabul qilindi")),
+        ("delete_order", db.delete_order, lambda: (db.add_order(new_order()),)),
+        ("get_order_by_id", db.get_order_by_id, lambda: (order_id(),)),
+        ("get_latest_confirmed_order_by_user", db.get_latest_confirmed_order_by_user,
+         lambda: (rng.choice(accepted_users),)),
+        ("get_orders_by_ids", db.get_orders_by_ids, lambda: ([order_id() for _ in range(50)],)),
+        ("search_orders", db.search_orders, lambda: (rng.choice(FIRST_NAMES).lower()[:3],)),
+        ("get_admin_queue", db.get_admin_queue, lambda: (rng.choice(ADMIN_IDS),)),
+        ("get_untracked_accepted_orders", db.get_untracked_accepted_orders, lambda: ([DUE_SOON, OVERDUE],)),
+        ("get_status_totals", db.get_status_totals, None),
+        ("get_daily_totals", db.get_daily_totals, lambda: ("Qabul qilindi", 60)),
+        ("get_monthly_totals", db.get_monthly_totals, lambda: ("Qabul qilindi", months)),
+        ("get_service_totals", db.get_service_totals, lambda: ("Qabul qilindi", 30)),
+        ("get_admin_stats", db.get_admin_stats, None),
+        ("get_admin_latency", db.get_admin_latency, None),
+        ("admin_stats_path", admin_stats, None),
+        ("admin_perf_path", admin_perf, None),
+        ("add_job", db.add_job, lambda: ("reminder", time.time() + 43200, order_id(), user_id())),
+        ("get_pending_jobs", db.get_pending_jobs, None),
+        ("cancel_jobs", db.cancel_jobs, lambda: (order_id(), "reminder")),
+        ("count_pending_jobs", db.count_pending_jobs, lambda: ("reminder",)),
+        ("get_pending_job_ids", db.get_pending_job_ids, lambda: (rng.sample(job_ids, min(50, len(job_ids))),)),
+        ("finish_jobs", db.finish_jobs, lambda: ([rng.choice(job_ids) for _ in range(10)],)),
+        ("get_catalog_version", db.get_catalog_version, None),
+        ("get_services", db.get_services, None),
+        ("seed_services", db.seed_services, lambda: (SERVICES,)),
+        ("set_service_price", db.set_service_price, lambda: ("📑 Mustaqil ish", rng.randint(1500, 2500))),
+        ("create_broadcast", db.create_broadcast, lambda: (ADMIN_IDS[0], "Benchmark")),
+        ("get_broadcast", db.get_broadcast, lambda: (broadcast_id,)),
+        ("get_running_broadcasts", db.get_running_broadcasts, None),
+        ("update_broadcast", lambda *args: db.update_broadcast(*args, sent=rng.randrange(size)), lambda: (broadcast_id,)),
+    ]
+
+
+def user_database_cases(users, size, rng):
+    """UserDatabase ning ochiq metodlari"""
+    new_users = iter(range(USER_BASE + size, USER_BASE + 10 * size + 10 ** 6))
+
+    def user_id():
+        return USER_BASE + rng.randrange(size)
+
+    return [
+        ("add_user", users.add_user, lambda: (next(new_users), "bench")),
+        ("select_all_users", users.select_all_users, None),
+        ("count_users", users.count_users, None),
+        ("select_user", users.select_user, lambda: (user_id(),)),
+        ("count_daily_users", users.count_daily_users, None),
+        ("count_weekly_users", users.count_weekly_users, None),
+        ("count_monthly_users", users.count_monthly_users, None),
+        ("update_last_active", users.update_last_active, lambda: (user_id(),)),
+        ("count_active_daily_users", users.count_active_daily_users, None),
+        ("count_active_weekly_users", users.count_active_weekly_users, None),
+        ("count_active_monthly_users", users.count_active_monthly_users, None),
+        ("check_if_admin", users.check_if_admin, lambda: (user_id(),)),
+    ]
+
+
+def prepare(data_dir, workdir, name, size, seed, seeder):
+    """Seed qilingan bazani (kerak bo‘lsa yaratib) ishchi papkaga nusxalash"""
+    source = os.path.join(data_dir, f"{name}-{size}-{seed}.db")
+    seed_seconds = None
+    if not os.path.exists(source):
+        started = time.perf_counter()
+        tmp_path = source + ".tmp"
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(tmp_path + suffix):
+                os.remove(tmp_path + suffix)
+        seeder(tmp_path, size, random.Random(seed))
+        os.replace(tmp_path, source)
+        seed_seconds = time.perf_counter() - started
+    target = os.path.join(workdir, os.path.basename(source))
+    shutil.copyfile(source, target)
+    return target, seed_seconds
+
+
+def run_suite(name, cases, repeat, budget, only=None):
+    results = {}
+    for case_name, func, setup in cases:
+        if only and not any(pattern in case_name for pattern in only):
+            continue
+        results[case_name] = stats = measure(func, setup, repeat, budget)
+        print(f"  {name}.{case_name:<38}{stats['median'] * 1000:>10.3f} ms  (p95 {stats['p95'] * 1000:.3f}, "
+              f"{stats['runs']} marta)", flush=True)
+    return results
+
+
+def git_version():
+    try:
+        return subprocess.check_output(
+            ["git", "describe", "--always", "--dirty"], cwd=ROOT, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old, new, threshold=0.2):
+    """Median bo‘yicha threshold dan ko‘p o‘zgargan metodlar"""
+    lines = [f"Solishtirish: {old.get('version')} -> {new.get('version')} (chegara {threshold:.0%})"]
+    for size, suites in new["sizes"].items():
+        for suite, cases in suites["results"].items():
+            before = old.get("sizes", {}).get(size, {}).get("results", {}).get(suite, {})
+            for case_name, stats in cases.items():
+                if case_name not in before:
+                    continue
+                ratio = stats["median"] / max(before[case_name]["median"], 1e-9)
+                if abs(ratio - 1) >= threshold:
+                    mark = "🔺 sekinlashdi" if ratio > 1 else "🔻 tezlashdi"
+                    lines.append(
+                        f"  [{size}] {suite}.{case_name}: {before[case_name]['median'] * 1000:.3f} -> "
+                        f"{stats['median'] * 1000:.3f} ms (x{ratio:.2f}) {mark}"
+                    )
+    return "\n".join(lines)
+
+
+def main(args):
+    # Modul darajasidagi db = Database() (data/main.db) haqiqiy bazaga tegmasligi uchun
+    # benchmark vaqtinchalik papkada ishlaydi
+    sys.path.insert(0, ROOT)
+    data_dir = os.path.abspath(args.data_dir)
+    os.makedirs(data_dir, exist_ok=True)
+    json_path = os.path.abspath(args.json) if args.json else None
+    compare_path = os.path.abspath(args.compare) if args.compare else None
+    workdir = tempfile.mkdtemp(prefix="db-bench-")
+    os.makedirs(os.path.join(workdir, "data"))
+    os.chdir(workdir)
+
+    from utils.db_api.database import Database
+    from utils.db_api.user import UserDatabase
+
+    # Har bir add_order/transition_order_status dagi INFO loglar o‘lchovga aralashmasin
+    logging.getLogger().setLevel(logging.WARNING)
+
+    result = {
+        "version": git_version(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "seed": args.seed,
+        "sizes": {},
+    }
+    try:
+        for size in args.sizes:
+            print(f"O‘lcham: {size} ta foydalanuvchi va buyurtma", flush=True)
+            main_path, main_seed = prepare(data_dir, workdir, "main", size, args.seed, seed_database)
+            users_path, users_seed = prepare(data_dir, workdir, "users", size, args.seed, seed_user_database)
+            rng = random.Random(args.seed)
+            db = Database(main_path)
+            try:
+                results = {
+                    "Database": run_suite("Database", database_cases(db, size, rng), args.repeat, args.budget, args.only)
+                }
+            finally:
+                db.close()
+            users = UserDatabase(users_path)
+            results["UserDatabase"] = run_suite(
+                "UserDatabase", user_database_cases(users, size, rng), args.repeat, args.budget, args.only
+            )
+            result["sizes"][str(size)] = {
+                "seed_seconds": {"main": main_seed, "users": users_seed},
+                "results": results,
+            }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"Natija: {json_path}")
+    if compare_path:
+        with open(compare_path, encoding="utf-8") as f:
+            print(compare(json.load(f), result, args.threshold))
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Database metodlari mikrobenchmarki")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=20, help="har bir metod uchun maksimal o‘lchovlar")
+    parser.add_argument("--budget", type=float, default=2.0, help="har bir metod uchun vaqt (s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default="data/bench", help="seed qilingan bazalar papkasi")
+    parser.add_argument("--only", nargs="+", help="faqat nomida shu so‘zlar bor metodlar")
+    parser.add_argument("--json", help="natijani JSON faylga yozish")
+    parser.add_argument("--compare", help="avvalgi JSON natija bilan solishtirish")
+    parser.add_argument("--threshold", type=float, default=0.2, help="solishtirishda sezilarli o‘zgarish ulushi")
+    main(parser.parse_args())
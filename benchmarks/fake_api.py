@@ -0,0 +1,167 @@
+import asyncio
+import json
+import time
+from collections import Counter
+
+from aiohttp import web
+
+BOT_USER = {"id": 100000, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+
+
+class FakeBotAPI:
+    """
+    Lokal soxta Bot API server (benchmark uchun).
+
+    getUpdates navbatdagi updatelarni long polling bilan beradi, sendMessage,
+    editMessageText, deleteMessage va answerCallbackQuery chaqiruvlari
+    hisoblanadi va har bir chatning hodisalar navbatiga qo‘yiladi - simulyatsiya
+    qilingan foydalanuvchilar bot javobini shu navbatdan kutadi. latency -
+    har bir javobga qo‘shiladigan sun’iy kechikish (soniya); record_events=False
+    bo‘lsa hodisalar navbatga qo‘yilmaydi (faqat hisoblanadi).
+    """
+
+    def __init__(self, latency=0.0, record_events=True):
+        self.latency = latency
+        self.record_events = record_events
+        self.calls = Counter()
+        self.polling = asyncio.Event()  # bot getUpdates ni boshladi
+        self._updates = []
+        self._has_updates = asyncio.Event()
+        self._closing = False
+        self._update_id = 0
+        self._message_id = 0
+        self._events = {}  # chat_id -> asyncio.Queue
+        self._callback_chats = {}  # callback_query_id -> chat_id
+        self._runner = None
+        self.app = web.Application()
+        self.app.router.add_route("*", "/bot{token}/{method}", self.handle)
+
+    async def start(self, host="127.0.0.1", port=0):
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        host, port = self._runner.addresses[0][:2]
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        self.release()
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def release(self):
+        """Kutayotgan getUpdates larni bo‘sh javob bilan qaytarish (to‘xtatishda)"""
+        self._closing = True
+        self._has_updates.set()
+
+    def events(self, chat_id):
+        """Chatga tegishli bot javoblari navbati"""
+        queue = self._events.get(chat_id)
+        if queue is None:
+            queue = self._events[chat_id] = asyncio.Queue()
+        return queue
+
+    def next_message_id(self):
+        self._message_id += 1
+        return self._message_id
+
+    def push(self, kind, payload):
+        """Bot uchun update qo‘shish (kind: message, callback_query, ...)"""
+        self._update_id += 1
+        if kind == "callback_query":
+            self._callback_chats[payload["id"]] = payload["from"]["id"]
+        self._updates.append({"update_id": self._update_id, kind: payload})
+        self._has_updates.set()
+        return self._update_id
+
+    async def handle(self, request):
+        method = request.match_info["method"]
+        params = dict(await request.post())
+        if request.query:
+            params.update(request.query)
+        self.calls[method] += 1
+        handler = getattr(self, f"_{method}", None)
+        if method != "getUpdates" and self.latency:
+            await asyncio.sleep(self.latency)
+        if handler:
+            result = await handler(params)
+        elif method.startswith("send") and "chat_id" in params:
+            # sendPhoto, sendDocument va h.k. - Message qaytaradi
+            result = self._message(int(params["chat_id"]), params)
+        else:
+            result = True
+        return web.json_response({"ok": True, "result": result})
+
+    def _emit(self, chat_id, method, **event):
+        if not self.record_events:
+            return
+        event.update(method=method, at=time.perf_counter())
+        self.events(chat_id).put_nowait(event)
+
+    def _message(self, chat_id, params, message_id=None):
+        message = {
+            "message_id": message_id or self.next_message_id(),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": BOT_USER,
+            "text": params.get("text", ""),
+        }
+        markup = params.get("reply_markup")
+        if markup:
+            markup = json.loads(markup)
+            if "inline_keyboard" in markup:
+                message["reply_markup"] = markup
+        return message
+
+    async def _getUpdates(self, params):
+        offset = int(params.get("offset") or 0)
+        limit = int(params.get("limit") or 100)
+        timeout = float(params.get("timeout") or 0)
+        if offset < 0:
+            # skip_updates: oxirgi updatelar
+            return self._updates[offset:]
+        self.polling.set()
+        # offset dan kichik updatelar bot tomonidan tasdiqlangan
+        self._updates = [update for update in self._updates if update["update_id"] >= offset]
+        if not self._updates and timeout and not self._closing:
+            self._has_updates.clear()
+            try:
+                await asyncio.wait_for(self._has_updates.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self._updates[:limit]
+
+    async def _getMe(self, params):
+        return BOT_USER
+
+    async def _getWebhookInfo(self, params):
+        # skip_updates va reset_webhook uchun: webhook o‘rnatilmagan
+        return {"url": "", "has_custom_certificate": False, "pending_update_count": 0}
+
+    async def _getChat(self, params):
+        return {"id": int(params["chat_id"]), "type": "private", "first_name": "User"}
+
+    async def _sendMessage(self, params):
+        chat_id = int(params["chat_id"])
+        message = self._message(chat_id, params)
+        self._emit(chat_id, "sendMessage", message=message)
+        return message
+
+    async def _editMessageText(self, params):
+        if "inline_message_id" in params:
+            return True
+        chat_id = int(params["chat_id"])
+        message = self._message(chat_id, params, int(params["message_id"]))
+        self._emit(chat_id, "editMessageText", message=message)
+        return message
+
+    async def _deleteMessage(self, params):
+        self._emit(int(params["chat_id"]), "deleteMessage", message_id=int(params["message_id"]))
+        return True
+
+    async def _answerCallbackQuery(self, params):
+        callback_id = params["callback_query_id"]
+        chat_id = self._callback_chats.pop(callback_id, None)
+        if chat_id is not None:
+            self._emit(chat_id, "answerCallbackQuery", callback_query_id=callback_id, text=params.get("text"))
+        return True
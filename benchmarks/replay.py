@@ -0,0 +1,232 @@
+"""
+Yozib olingan updatelarni (RECORD_FILE) Dispatcherga qayta ijro etish.
+
+Bot shu jarayonda, vaqtinchalik papkada va soxta Bot API serverga qaratilgan
+holda ishga tushiriladi; updatelar yozilgan vaqt oraliqlari bilan (--speed 1),
+N marta tezroq (--speed N) yoki kutmasdan (--speed 0) update_scheduler ga
+beriladi. Har bir handler vaqti tracelardan olinadi, natija JSON ga yoziladi
+va --compare bilan avvalgi ijro bilan solishtiriladi.
+
+    python -m benchmarks.replay data/updates.jsonl.gz --speed 0 --json replay-old.json
+    python -m benchmarks.replay data/updates.*.jsonl.gz --speed 10 --db backup.db --compare replay-old.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from benchmarks.fake_api import FakeBotAPI
+from benchmarks.wizard_load import percentiles
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class CollectingSink:
+    """Tracelarni faylga emas, xotiraga yig‘uvchi sink"""
+
+    def __init__(self):
+        self.records = []
+
+    def write(self, record):
+        self.records.append(record)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def prepare_workdir(base_url, db_path=None, admins=None):
+    """Bot uchun vaqtinchalik papka va muhit (loader import qilinishidan oldin)"""
+    workdir = tempfile.mkdtemp(prefix="bot-replay-")
+    os.makedirs(os.path.join(workdir, "data"))
+    if db_path:
+        shutil.copyfile(db_path, os.path.join(workdir, "data", "main.db"))
+    if admins:
+        with open(os.path.join(workdir, "admins.json"), "w") as f:
+            json.dump([str(admin_id) for admin_id in admins], f)
+    os.environ.update(
+        BOT_TOKEN="123456:replay",
+        BOT_API_SERVER=base_url,
+        MODE="polling",
+        FSM_STORAGE="memory",
+        ADMINS_FILE="admins.json",
+        METRICS_PORT="0",
+        RECORD_FILE="",
+    )
+    os.chdir(workdir)
+    return workdir
+
+
+async def replay(dp, records, speed=0.0, drain_timeout=60):
+    """Updatelarni yozilgan tartibda (speed > 0 bo‘lsa yozilgan oraliqlar bilan) berish"""
+    from aiogram import types
+
+    scheduler = dp.update_scheduler
+    scheduler.start()
+    first = records[0]["ts"]
+    behind = []
+    started = time.perf_counter()
+    for record in records:
+        if speed:
+            delay = (record["ts"] - first) / speed - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                behind.append(-delay)
+        await scheduler.submit(types.Update(**record["update"]))
+    await scheduler.join(drain_timeout)
+    return time.perf_counter() - started, behind
+
+
+def summarize(traces):
+    """Handler va update vaqtlari tracelardan"""
+    handlers = {}
+    updates = []
+    for trace in traces:
+        updates.append(trace["duration"])
+        for span in trace["spans"]:
+            if span["kind"] == "handler":
+                handlers.setdefault(span["name"], []).append(span["duration"])
+    return {
+        "update": percentiles(updates),
+        "handlers": {
+            name: dict(percentiles(values), mean=statistics.mean(values))
+            for name, values in sorted(handlers.items())
+        },
+    }
+
+
+def run(args):
+    sys.path.insert(0, ROOT)
+    paths = [os.path.abspath(path) for path in args.paths]
+    db_path = os.path.abspath(args.db) if args.db else None
+
+    loop = asyncio.get_event_loop()
+    api = FakeBotAPI(latency=args.api_latency / 1000, record_events=False)
+    base_url = loop.run_until_complete(api.start())
+    workdir = prepare_workdir(base_url, db_path, args.admins)
+
+    # utils paketi data.config ni yuklaydi - muhit tayyor bo‘lgandan keyin import qilinadi
+    # (aks holda haqiqiy BOT_TOKEN kerak bo‘ladi va so‘rovlar api.telegram.org ga ketadi)
+    from utils.recorder import read_recording
+    records = read_recording(*paths)
+    if args.limit:
+        records = records[:args.limit]
+    if not records:
+        os.chdir(ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+        loop.run_until_complete(api.stop())
+        raise SystemExit("Yozuvlar topilmadi")
+
+    # Handlerlar va middlewarelar shu yerda ro‘yxatdan o‘tadi (muhit tayyor bo‘lgandan keyin)
+    from aiogram import Bot, Dispatcher
+    import loader
+    import middlewares, filters, handlers  # noqa: F401
+
+    loader.tracer.sink = CollectingSink()
+    loader.tracer.sample_rate = 1.0
+    Bot.set_current(loader.bot)
+    Dispatcher.set_current(loader.dp)
+
+    async def _run():
+        try:
+            return await replay(loader.dp, records, args.speed)
+        finally:
+            await loader.lifecycle.shutdown()
+            await loader.dp.storage.close()
+            session = await loader.bot.get_session()
+            await session.close()
+            await api.stop()
+
+    try:
+        duration, behind = loop.run_until_complete(_run())
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    calls = Counter(api.calls)
+    for method in ("getMe", "getUpdates"):
+        calls.pop(method, None)
+    result = {
+        "source": paths,
+        "updates": len(records),
+        "recorded_seconds": records[-1]["ts"] - records[0]["ts"],
+        "speed": args.speed,
+        "api_latency_ms": args.api_latency,
+        "duration": duration,
+        "updates_per_second": len(records) / duration,
+        # speed > 0 da: yozilgan jadvaldan orqada qolish (navbat to‘lganda)
+        "behind_schedule": percentiles(behind),
+        "api_calls": dict(calls),
+    }
+    result.update(summarize(loader.tracer.sink.records))
+    return result
+
+
+def format_result(result):
+    speed = f"{result['speed']}x" if result["speed"] else "maksimal"
+    update = result["update"]
+    lines = [
+        f"Updatelar: {result['updates']} (yozilgan {result['recorded_seconds']:.0f} s), tezlik: {speed}",
+        f"Vaqt: {result['duration']:.2f} s | {result['updates_per_second']:.1f} update/s | "
+        f"update p50 {update.get('p50', 0) * 1000:.1f} ms, p95 {update.get('p95', 0) * 1000:.1f} ms",
+        f"\n{'handler':<32}{'soni':>7}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}  (ms)",
+    ]
+    for name, stats in sorted(result["handlers"].items(), key=lambda x: -x[1]["count"] * x[1]["mean"]):
+        lines.append(
+            f"{name:<32}{stats['count']:>7}" + "".join(f"{stats[q] * 1000:>10.2f}" for q in ("p50", "p95", "p99", "max"))
+        )
+    return "\n".join(lines)
+
+
+def compare(old, new, threshold=0.2):
+    """Handlerlar p50/p95 vaqtini avvalgi ijro bilan solishtirish"""
+    lines = [f"\nSolishtirish (chegara {threshold:.0%}):"]
+    for name, stats in new["handlers"].items():
+        before = old["handlers"].get(name)
+        if not before:
+            lines.append(f"  {name}: yangi handler")
+            continue
+        changes = []
+        for q in ("p50", "p95"):
+            ratio = stats[q] / max(before[q], 1e-9)
+            if abs(ratio - 1) >= threshold:
+                changes.append(f"{q} {before[q] * 1000:.2f} -> {stats[q] * 1000:.2f} ms (x{ratio:.2f})")
+        if changes:
+            lines.append(f"  {name}: " + ", ".join(changes))
+    if len(lines) == 1:
+        lines.append("  sezilarli o‘zgarish yo‘q")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Yozib olingan updatelarni qayta ijro etish")
+    parser.add_argument("paths", nargs="+", help="RECORD_FILE fayllari (.jsonl.gz)")
+    parser.add_argument("--speed", type=float, default=0.0, help="1 - real vaqt, N - N marta tez, 0 - maksimal")
+    parser.add_argument("--db", help="boshlang‘ich baza nusxasi (yozib olish boshidagi holat)")
+    parser.add_argument("--admins", nargs="+", help="admin ID lari (bo‘lmasa data/config.py dagi ADMINS)")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="Bot API javob kechikishi (ms)")
+    parser.add_argument("--limit", type=int, help="faqat birinchi N ta update")
+    parser.add_argument("--json", help="natijani JSON faylga yozish")
+    parser.add_argument("--compare", help="avvalgi ijro natijasi (JSON)")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    json_path = os.path.abspath(args.json) if args.json else None
+    compare_path = os.path.abspath(args.compare) if args.compare else None
+    result = run(args)
+    print(format_result(result))
+    if compare_path:
+        with open(compare_path, encoding="utf-8") as f:
+            print(compare(json.load(f), result, args.threshold))
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,371 @@
+"""
+Buyurtma wizardi uchun yuklama testi.
+
+Lokal soxta Bot API server ishga tushiriladi, bot (app.py) vaqtinchalik
+papkada BOT_API_SERVER shu serverga qaratilgan holda alohida jarayonda
+ishlaydi. N ta foydalanuvchi /start -> xizmat -> mavzu -> varaq -> muddat ->
+telefon -> tasdiqlash qadamlaridan o‘tadi, adminlar yangi buyurtmalarni
+qabul qiladi. Natijada o‘tkazuvchanlik, har bir qadam kechikishi
+(p50/p95/p99) va bitta buyurtmaga to‘g‘ri keladigan Bot API chaqiruvlari
+chiqariladi.
+
+    python -m benchmarks.wizard_load --users 200
+    python -m benchmarks.wizard_load --users 500 --mode supervisor --workers 4 --json data/bench.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import re
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, deque
+
+from benchmarks.fake_api import FakeBotAPI
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+USER_BASE = 500000
+ADMIN_BASE = 900000
+ORDER_ID = re.compile(r"#(\d+)")
+
+# (qadam, turi, matn yoki tugma nomi)
+USER_STEPS = (
+    ("start", "text", "/start"),
+    ("service", "text", "📑 Mustaqil ish"),
+    ("subject", "text", "Benchmark mavzusi"),
+    ("pages", "text", "10"),
+    ("deadline", "button", "📅 3 kun"),
+    ("phone", "text", "➡️ O'tkazib yuborish"),
+    ("confirm", "button", "✅ Tasdiqlash"),
+)
+ACCEPT_BUTTON = "✅ Qabul"
+
+
+class StepTimeout(Exception):
+    pass
+
+
+def percentiles(values):
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+    return {
+        "count": len(ordered),
+        "p50": pick(0.5), "p95": pick(0.95), "p99": pick(0.99), "max": ordered[-1],
+    }
+
+
+def find_button(message, text):
+    """Inline klaviaturadan tugma callback_data si (matni bo‘yicha)"""
+    for row in message.get("reply_markup", {}).get("inline_keyboard", []):
+        for button in row:
+            if button.get("text") == text and "callback_data" in button:
+                return button["callback_data"]
+    return None
+
+
+class Simulation:
+    def __init__(self, api: FakeBotAPI, admins, users=100, think=0.0, ramp=0.0, admin_delay=0.6, timeout=60):
+        self.api = api
+        self.admins = admins
+        self.users = users
+        self.think = think
+        self.ramp = ramp
+        self.admin_delay = admin_delay
+        self.timeout = timeout
+        # Buyurtmalar adminlar navbatida kutadi: qabul qilinishini kutish muddati kattaroq
+        self.accept_timeout = timeout + admin_delay * users / max(len(admins), 1)
+        self.latencies = {}
+        self.failures = Counter()
+        self.confirmed = 0
+        self.accepted = 0
+        self.throttled = 0
+        self.updates = 0
+        self._callback_ids = itertools.count(1)
+        self._done = asyncio.Event()
+
+    def record(self, name, value):
+        self.latencies.setdefault(name, []).append(value)
+
+    async def wait(self, queue, predicate, timeout=None):
+        """predicate ga mos hodisani kutish; oraliqdagi hodisalar ham qaytariladi"""
+        deadline = time.perf_counter() + (timeout or self.timeout)
+        skipped = []
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise StepTimeout()
+            try:
+                event = await asyncio.wait_for(queue.get(), remaining)
+            except asyncio.TimeoutError:
+                raise StepTimeout()
+            if predicate(event):
+                return event, skipped
+            skipped.append(event)
+
+    async def send_text(self, user, text):
+        self.updates += 1
+        started = time.perf_counter()
+        self.api.push("message", {
+            "message_id": self.api.next_message_id(), "date": int(time.time()),
+            "chat": {"id": user["id"], "type": "private"}, "from": user, "text": text,
+        })
+        event, _ = await self.wait(self.api.events(user["id"]), lambda e: e["method"] == "sendMessage")
+        return event["message"], event["at"] - started, []
+
+    async def press(self, user, message, text):
+        data = find_button(message, text) if message else None
+        if data is None:
+            raise StepTimeout()
+        callback_id = str(next(self._callback_ids))
+        self.updates += 1
+        started = time.perf_counter()
+        self.api.push("callback_query", {
+            "id": callback_id, "from": user, "chat_instance": "benchmark", "message": message, "data": data,
+        })
+        event, skipped = await self.wait(
+            self.api.events(message["chat"]["id"]),
+            lambda e: e["method"] == "answerCallbackQuery" and e["callback_query_id"] == callback_id
+        )
+        sent = [e["message"] for e in skipped if e["method"] == "sendMessage"]
+        return (sent[-1] if sent else None), event["at"] - started, skipped
+
+    async def run_user(self, index):
+        await asyncio.sleep(self.ramp * index / self.users)
+        user = {"id": USER_BASE + index, "is_bot": False, "first_name": f"User{index}", "username": f"bench_user{index}"}
+        started = time.perf_counter()
+        message = None
+        step = None
+        try:
+            for step, kind, value in USER_STEPS:
+                if self.think:
+                    await asyncio.sleep(self.think)
+                if kind == "text":
+                    message, latency, skipped = await self.send_text(user, value)
+                else:
+                    message, latency, skipped = await self.press(user, message, value)
+                self.record(step, latency)
+            # Tasdiqlashdan keyin "Buyurtmangiz qabul qilindi! #id" xabari
+            if not any(e["method"] == "sendMessage" and ORDER_ID.search(e["message"]["text"]) for e in skipped):
+                raise StepTimeout()
+            confirmed_at = time.perf_counter()
+            self.confirmed += 1
+            self.record("order", confirmed_at - started)
+
+            # Admin qabul qilgani haqidagi xabar (tasdiqlash javobidan oldin ham kelishi mumkin)
+            step = "accept_wait"
+            accepted = [e for e in skipped if self._is_accepted(e)]
+            if accepted:
+                event = accepted[0]
+            else:
+                event, _ = await self.wait(self.api.events(user["id"]), self._is_accepted, self.accept_timeout)
+            self.record("confirm_to_accept", max(event["at"] - confirmed_at, 0.0))
+        except StepTimeout:
+            self.failures[step] += 1
+
+    @staticmethod
+    def _is_accepted(event):
+        return event["method"] == "sendMessage" and event["message"]["text"].startswith("🎉")
+
+    def _collect(self, event, index, backlog):
+        """Shu admin qabul qilishi kerak bo‘lgan yangi buyurtma xabarlari"""
+        if event["method"] != "sendMessage" or not find_button(event["message"], ACCEPT_BUTTON):
+            return
+        match = ORDER_ID.search(event["message"]["text"])
+        if match and int(match.group(1)) % len(self.admins) == index:
+            backlog.append(event["message"])
+
+    async def run_admin(self, index, admin_id):
+        admin = {"id": admin_id, "is_bot": False, "first_name": f"Admin{index}", "username": f"bench_admin{index}"}
+        events = self.api.events(admin_id)
+        backlog = deque()
+        while not self._done.is_set():
+            if not backlog:
+                try:
+                    event = await asyncio.wait_for(events.get(), 0.5)
+                except asyncio.TimeoutError:
+                    continue
+                self._collect(event, index, backlog)
+                continue
+            message = backlog.popleft()
+            await asyncio.sleep(self.admin_delay)
+            try:
+                _, latency, skipped = await self.press(admin, message, ACCEPT_BUTTON)
+            except StepTimeout:
+                self.failures["accept"] += 1
+                continue
+            accepted = False
+            for event in skipped:
+                if event["method"] == "editMessageText" and event["message"]["message_id"] == message["message_id"]:
+                    accepted = True
+                else:
+                    self._collect(event, index, backlog)
+            if accepted:
+                self.accepted += 1
+                self.record("accept", latency)
+            else:
+                # Throttling middleware rad etdi - biroz kutib qayta bosiladi
+                self.throttled += 1
+                backlog.appendleft(message)
+                await asyncio.sleep(1)
+
+    async def run(self):
+        calls_before = Counter(self.api.calls)
+        admins = [asyncio.ensure_future(self.run_admin(i, admin_id)) for i, admin_id in enumerate(self.admins)]
+        started = time.perf_counter()
+        await asyncio.gather(*(self.run_user(i) for i in range(self.users)))
+        duration = time.perf_counter() - started
+        self._done.set()
+        await asyncio.gather(*admins)
+
+        calls = Counter(self.api.calls)
+        calls.subtract(calls_before)
+        calls.pop("getUpdates", None)
+        orders = max(self.confirmed, 1)
+        return {
+            "users": self.users,
+            "admins": len(self.admins),
+            "duration": duration,
+            "confirmed": self.confirmed,
+            "accepted": self.accepted,
+            "throttled": self.throttled,
+            "failures": dict(self.failures),
+            "orders_per_second": self.confirmed / duration,
+            "updates_per_second": self.updates / duration,
+            "latency": {name: percentiles(values) for name, values in self.latencies.items()},
+            "api_calls": dict(calls),
+            "api_calls_per_order": {method: count / orders for method, count in calls.items() if count},
+        }
+
+
+async def wait_ready(api: FakeBotAPI, process, admins, timeout):
+    """Bot getUpdates ni boshlab, adminlarga "Bot faollashdi!" yuborguncha kutish"""
+    waiting = set(admins)
+    deadline = time.monotonic() + timeout
+    while waiting or not api.polling.is_set():
+        if process.poll() is not None:
+            raise RuntimeError(f"Bot jarayoni to‘xtadi (kod {process.returncode})")
+        if time.monotonic() > deadline:
+            raise RuntimeError("Bot ishga tushmadi")
+        for admin_id in list(waiting):
+            queue = api.events(admin_id)
+            while not queue.empty():
+                event = queue.get_nowait()
+                if event["method"] == "sendMessage" and event["message"]["text"].startswith("Bot faollashdi"):
+                    waiting.discard(admin_id)
+        await asyncio.sleep(0.1)
+
+
+def start_bot(base_url, workdir, admins, mode, workers):
+    os.makedirs(os.path.join(workdir, "data"), exist_ok=True)
+    with open(os.path.join(workdir, "admins.json"), "w") as f:
+        json.dump([str(admin_id) for admin_id in admins], f)
+    env = dict(
+        os.environ,
+        BOT_TOKEN="123456:benchmark",
+        BOT_API_SERVER=base_url,
+        MODE=mode,
+        WORKERS=str(workers),
+        ADMINS_FILE="admins.json",
+        FSM_DB="data/fsm.db",
+        TRACE_FILE="data/traces.jsonl",
+        METRICS_PORT="0",
+    )
+    log = open(os.path.join(workdir, "bot.log"), "w")
+    # Baza va boshqa fayllar nisbiy yo‘llar bilan ochiladi - vaqtinchalik papkada
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "app.py")], cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    return process, log
+
+
+def stop_bot(process, timeout=60):
+    if process.poll() is None:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+async def run(args):
+    loop = asyncio.get_event_loop()
+    api = FakeBotAPI(latency=args.api_latency / 1000)
+    base_url = await api.start(port=args.port)
+    workdir = tempfile.mkdtemp(prefix="bot-bench-")
+    admins = [ADMIN_BASE + i for i in range(args.admins)]
+    process, log = start_bot(base_url, workdir, admins, args.mode, args.workers)
+    print(f"Soxta Bot API: {base_url}, bot papkasi: {workdir}")
+    try:
+        await wait_ready(api, process, admins, args.startup_timeout)
+        simulation = Simulation(
+            api, admins, users=args.users, think=args.think, ramp=args.ramp,
+            admin_delay=args.admin_delay, timeout=args.timeout
+        )
+        result = await simulation.run()
+    finally:
+        api.release()
+        await loop.run_in_executor(None, stop_bot, process)
+        await api.stop()
+        log.close()
+    result.update(mode=args.mode, workers=args.workers if args.mode == "supervisor" else 1,
+                  api_latency_ms=args.api_latency, workdir=workdir)
+    return result
+
+
+def format_result(result):
+    lines = [
+        f"Rejim: {result['mode']} (ishchilar: {result['workers']}), foydalanuvchilar: {result['users']}, "
+        f"adminlar: {result['admins']}, API kechikishi: {result['api_latency_ms']} ms",
+        f"Vaqt: {result['duration']:.2f} s | tasdiqlangan: {result['confirmed']} "
+        f"({result['orders_per_second']:.1f}/s) | qabul qilingan: {result['accepted']} | "
+        f"updatelar: {result['updates_per_second']:.1f}/s",
+    ]
+    if result["failures"]:
+        lines.append("Kutish muddati o‘tgan qadamlar: " + ", ".join(f"{k}={v}" for k, v in result["failures"].items()))
+    if result["throttled"]:
+        lines.append(f"Throttling sabab qayta bosilgan: {result['throttled']}")
+    lines.append(f"\n{'qadam':<18}{'soni':>7}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}  (ms)")
+    for name, stats in result["latency"].items():
+        if not stats["count"]:
+            continue
+        lines.append(
+            f"{name:<18}{stats['count']:>7}" + "".join(f"{stats[q] * 1000:>10.1f}" for q in ("p50", "p95", "p99", "max"))
+        )
+    total = sum(result["api_calls_per_order"].values())
+    lines.append(f"\nBot API chaqiruvlari (bitta buyurtmaga): {total:.1f}")
+    for method, count in sorted(result["api_calls_per_order"].items(), key=lambda x: -x[1]):
+        lines.append(f"  {method:<22}{count:>8.2f}  ({result['api_calls'][method]})")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Buyurtma wizardi yuklama testi")
+    parser.add_argument("-u", "--users", type=int, default=100, help="bir vaqtdagi foydalanuvchilar")
+    parser.add_argument("-a", "--admins", type=int, default=2)
+    parser.add_argument("--mode", choices=("polling", "supervisor"), default="polling")
+    parser.add_argument("--workers", type=int, default=2, help="supervisor rejimida ishchilar soni")
+    parser.add_argument("--think", type=float, default=0.0, help="qadamlar orasidagi pauza (s)")
+    parser.add_argument("--ramp", type=float, default=0.0, help="foydalanuvchilarni shu vaqt ichida boshlash (s)")
+    parser.add_argument("--admin-delay", type=float, default=0.6, help="admin qabul qilishlari orasidagi pauza (s)")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="Bot API javob kechikishi (ms)")
+    parser.add_argument("--timeout", type=float, default=60, help="bitta qadam uchun kutish (s)")
+    parser.add_argument("--startup-timeout", type=float, default=60)
+    parser.add_argument("--port", type=int, default=0, help="soxta Bot API porti (0 - ixtiyoriy)")
+    parser.add_argument("--json", help="natijani JSON faylga yozish")
+    args = parser.parse_args()
+
+    result = asyncio.get_event_loop().run_until_complete(run(args))
+    print(format_result(result))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
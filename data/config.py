@@ -1,3 +1,5 @@
+import os
+
 from environs import Env
 
 # environs kutubxonasidan foydalanish
@@ -7,9 +9,70 @@ env.read_env()
 # .env fayl ichidan o‘qiymiz
 BOT_TOKEN = env.str("BOT_TOKEN")  # Bot token
 IP = env.str("ip", "localhost")   # Xosting IP manzili, standart qiymat qo‘shildi
+# Bot API server manzili (bo‘sh - api.telegram.org; lokal Bot API server yoki benchmark uchun)
+BOT_API_SERVER = env.str("BOT_API_SERVER", "")
 
 # Adminlarni statik ro‘yxat sifatida aniqlaymiz (test uchun)
 ADMINS = ["37054118","973358587"]  # Sizning ID’ingizni qo‘lda kiritamiz
 
 # Agar .env dan o‘qimoqchi bo‘lsangiz, quyidagini faollashtiring:
-# ADMINS = env.list("ADMINS", default=["37054118"])
\ No newline at end of file
+# ADMINS = env.list("ADMINS", default=["37054118"])
+
+# Adminlar ro‘yxati fayli (bo‘lmasa yuqoridagi ADMINS ishlatiladi)
+ADMINS_FILE = env.str("ADMINS_FILE", "admins.json")
+
+# Ishlash rejimi: "polling", "webhook" yoki "supervisor" (ko‘p jarayonli polling)
+MODE = env.str("MODE", "polling")
+WEBHOOK_HOST = env.str("WEBHOOK_HOST", "")  # Masalan: https://example.com (bo‘sh bo‘lsa setWebhook chaqirilmaydi)
+WEBHOOK_PATH = env.str("WEBHOOK_PATH", "/webhook")
+WEBHOOK_SECRET = env.str("WEBHOOK_SECRET", "")  # X-Telegram-Bot-Api-Secret-Token
+WEBAPP_HOST = env.str("WEBAPP_HOST", "0.0.0.0")
+WEBAPP_PORT = env.int("WEBAPP_PORT", 8080)
+
+# Updatelarni qayta ishlash: parallel ishchilar, umumiy navbat va bitta chat navbati hajmi
+UPDATE_WORKERS = env.int("UPDATE_WORKERS", 32)
+UPDATE_QUEUE_SIZE = env.int("UPDATE_QUEUE_SIZE", 1000)
+CHAT_QUEUE_SIZE = env.int("CHAT_QUEUE_SIZE", 20)
+# To‘xtatishda ishlanayotgan updatelarni kutish muddati (soniya)
+SHUTDOWN_TIMEOUT = env.int("SHUTDOWN_TIMEOUT", 25)
+
+# Supervisor rejimi: ishchi jarayonlar soni (standart - protsessor yadrolari soni)
+WORKERS = env.int("WORKERS", os.cpu_count() or 2)
+
+# FSM holatlari: "memory" yoki "sqlite" (supervisor rejimida doim sqlite)
+FSM_STORAGE = env.str("FSM_STORAGE", "memory")
+FSM_DB = env.str("FSM_DB", "data/fsm.db")
+
+# /metrics HTTP manzili (0 - o‘chirilgan; supervisor rejimida har bir ishchi port + id da)
+METRICS_HOST = env.str("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = env.int("METRICS_PORT", 9100)
+
+# Update tracelari: har bir updatening sample ulushi va sekinlari JSONL faylga yoziladi
+TRACE_FILE = env.str("TRACE_FILE", "data/traces.jsonl")
+TRACE_SAMPLE_RATE = env.float("TRACE_SAMPLE_RATE", 0.01)
+TRACE_SLOW_THRESHOLD = env.float("TRACE_SLOW_THRESHOLD", 1.0)  # soniya
+
+# Sekin SQL so‘rovlari chegarasi (millisekund)
+SLOW_QUERY_MS = env.int("SLOW_QUERY_MS", 50)
+
+# Updatelarni yozib olish (replay uchun, masalan data/updates.jsonl.gz; bo‘sh - o‘chirilgan)
+RECORD_FILE = env.str("RECORD_FILE", "")
+# Olib tashlanadigan shaxsiy ma’lumotlar: ids, names, phone, text (vergul bilan)
+RECORD_SCRUB = [field for field in env.str("RECORD_SCRUB", "ids,names,phone,text").split(",") if field]
+RECORD_SALT = env.str("RECORD_SALT", "")  # ID psevdonimlari uchun kalit (bo‘sh - bot tokeni)
+
+# Loglar: umumiy daraja, modul darajalari (masalan "aiogram=WARNING,db.slow=INFO"),
+# format ("text" yoki "json") va qo‘shimcha fayl (bo‘sh - faqat stderr)
+LOG_LEVEL = env.str("LOG_LEVEL", "INFO")
+LOG_LEVELS = env.dict("LOG_LEVELS", {})
+LOG_FORMAT = env.str("LOG_FORMAT", "text")
+LOG_FILE = env.str("LOG_FILE", "")
+# Bir xil INFO xabarlardan har LOG_SAMPLE_INTERVAL soniyada faqat LOG_SAMPLE_BURST tasi (0 - cheklovsiz)
+LOG_SAMPLE_BURST = env.int("LOG_SAMPLE_BURST", 20)
+LOG_SAMPLE_INTERVAL = env.float("LOG_SAMPLE_INTERVAL", 60.0)
+
+# Handler xatolari: oyna (soniya), oynadagi to‘liq logga yoziladigan namunalar soni
+# va adminlarga jamlangan xabar oralig‘i (soniya)
+ERROR_WINDOW = env.int("ERROR_WINDOW", 60)
+ERROR_SAMPLES = env.int("ERROR_SAMPLES", 3)
+ERROR_DIGEST_INTERVAL = env.int("ERROR_DIGEST_INTERVAL", 600)
@@ -1,6 +1,17 @@
+# Narxlar katalogining boshlang‘ich qiymatlari (bazada Services jadvali bo‘sh bo‘lsa yoziladi)
 SERVICES = {
     "📽 Prezentatsiya": {"price": 2500, "min_pages": 5, "description": "Slaydlardan iborat prezentatsiya"},
     "📑 Mustaqil ish": {"price": 2000, "min_pages": 5, "description": "Mustaqil ish yozish"},
     "📜 Referat": {"price": 2000, "min_pages": 5, "description": "Referat tayyorlash"},
-    "📝 Esselar": {"price": 2500, "min_pages": 5, "description": "Esse yozish"}
-}
\ No newline at end of file
+    "📝 Esselar": {"price": 2500, "min_pages": 5, "description": "Esse yozish"},
+    "🔠 Boshqa xizmatlar": {"price": 5000, "min_pages": 5, "description": "Menyuda yo‘q boshqa ishlar"}
+}
+
+# Katalogda yo‘q xizmatlar shu yozuv narxi bilan hisoblanadi
+OTHER_SERVICE = "🔠 Boshqa xizmatlar"
+
+# Reply klaviatura tugmalari (updatelarni yozib olishda tozalanmaydi)
+MENU_TEXTS = frozenset(SERVICES) | {
+    "📞 Admin bilan bog'lanish", "🔙 Ortga", "❌ Bekor", "➡️ O'tkazib yuborish",
+    "📌 Mavzu", "📄 Varaq", "⏳ Deadline", "📞 Telefon",
+}
@@ -1,11 +1,13 @@
-import logging
-from aiogram.utils.exceptions import (Unauthorized, InvalidQueryID, TelegramAPIError,
+from aiogram.utils.exceptions import (Unauthorized, TelegramAPIError,
                                       CantDemoteChatCreator, MessageNotModified, MessageToDeleteNotFound,
-                                      MessageTextIsEmpty, RetryAfter,
-                                      CantParseEntities, MessageCantBeDeleted)
+                                      MessageTextIsEmpty, MessageCantBeDeleted)
 
 
-from loader import dp
+from loader import dp, errors
+
+# Oddiy holatlar: hisoblanadi va logga yoziladi, lekin adminlarga yuborilmaydi
+QUIET_ERRORS = (CantDemoteChatCreator, MessageNotModified, MessageCantBeDeleted, MessageToDeleteNotFound,
+                MessageTextIsEmpty, Unauthorized)
 
 
 @dp.errors_handler()
@@ -15,44 +17,12 @@ async def errors_handler(update, exception):
     :param dispatcher:
     :param update:
     :param exception:
-    :return: stdout logging
+    :return: True - Telegram API xatolari ishlangan deb hisoblanadi
     """
-
-    if isinstance(exception, CantDemoteChatCreator):
-        logging.exception("Can't demote chat creator")
-        return True
-
-    if isinstance(exception, MessageNotModified):
-        logging.exception('Message is not modified')
-        return True
-    if isinstance(exception, MessageCantBeDeleted):
-        logging.exception('Message cant be deleted')
-        return True
-
-    if isinstance(exception, MessageToDeleteNotFound):
-        logging.exception('Message to delete not found')
-        return True
-
-    if isinstance(exception, MessageTextIsEmpty):
-        logging.exception('MessageTextIsEmpty')
-        return True
-
-    if isinstance(exception, Unauthorized):
-        logging.exception(f'Unauthorized: {exception}')
-        return True
-
-    if isinstance(exception, InvalidQueryID):
-        logging.exception(f'InvalidQueryID: {exception} \nUpdate: {update}')
-        return True
+    quiet = isinstance(exception, QUIET_ERRORS)
+    errors.record(exception, update, quiet=quiet)
+    if not quiet:
+        await errors.notify()
 
     if isinstance(exception, TelegramAPIError):
-        logging.exception(f'TelegramAPIError: {exception} \nUpdate: {update}')
-        return True
-    if isinstance(exception, RetryAfter):
-        logging.exception(f'RetryAfter: {exception} \nUpdate: {update}')
-        return True
-    if isinstance(exception, CantParseEntities):
-        logging.exception(f'CantParseEntities: {exception} \nUpdate: {update}')
         return True
-    
-    logging.exception(f'Update: {update} \n{exception}')
@@ -1,15 +1,19 @@
 import logging
-import json
-import os
+from datetime import timedelta
 from aiogram import types
 from aiogram.dispatcher import FSMContext
 from aiogram.dispatcher.filters.state import State, StatesGroup
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, MessageEntity
-from loader import dp, bot, db
-from data.config import ADMINS
-from data.services import SERVICES
+from loader import (dp, bot, db, chat_cache, scheduler, deadlines, broadcaster, admins, catalog, callbacks, idempotency,
+                    order_states)
+from keyboards.inline.admin_panel import get_admin_panel_keyboard
+from keyboards.inline import callback_datas as cb
+from utils.deadlines import urgency, format_time_left
+from utils.db_api.database import local_now, histogram_median
+from utils.misc import rate_limit
+from utils.db_api.profiler import format_top
+from utils.order_status import ALREADY_HANDLED, FAILED, NOT_FOUND, PENDING, ACCEPTED
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class AdminState(StatesGroup):
@@ -18,27 +22,17 @@ class AdminState(StatesGroup):
     edit_price = State()
     add_admin = State()
     remove_admin = State()
+    broadcast = State()
 
 CARD_NUMBER = "9860600408900816"
 CARD_OWNER = "Azizbek Sultonov"  # Yangi karta egasi
+# Buyurtma holatini o‘zgartiruvchi amallar va ularni takroriy bosishdan himoya oynasi (soniya)
+STATUS_ACTIONS = ("accept", "reject", "complete")
+DOUBLE_TAP_WINDOW = 10
 
-# Adminlar ro‘yxatini JSON fayldan yuklash va saqlash
-ADMINS_FILE = "admins.json"
-
-def load_admins():
-    global ADMINS
-    if os.path.exists(ADMINS_FILE):
-        with open(ADMINS_FILE, "r") as f:
-            ADMINS = json.load(f)
-    return ADMINS
-
-def save_admins():
-    with open(ADMINS_FILE, "w") as f:
-        json.dump(ADMINS, f)
-
-# Admin tekshiruvi
+# Admin tekshiruvi (ro‘yxat xotirada, admins.json faqat o‘zgarganda o‘qiladi)
 def is_admin(user_id):
-    return str(user_id) in load_admins()
+    return admins.is_admin(user_id)
 
 # Admin paneli
 @dp.message_handler(commands=['admin'], state='*')
@@ -46,16 +40,8 @@ async def admin_panel(message: types.Message):
     if not is_admin(message.from_user.id):
         await message.answer("🚫 <b>Bu buyruq faqat adminlar uchun!</b>", parse_mode="HTML")
         return
-    logger.info(f"Admin {message.from_user.id} panelga kirdi.")
-    markup = InlineKeyboardMarkup(row_width=2)
-    markup.add(
-        InlineKeyboardButton("📋 Buyurtmalar", callback_data="view_orders"),
-        InlineKeyboardButton("👥 Foydalanuvchilar", callback_data="view_users"),
-        InlineKeyboardButton("📊 Statistika", callback_data="stats"),
-        InlineKeyboardButton("🕒 Tarix", callback_data="order_history"),
-        InlineKeyboardButton("💰 Narxlar", callback_data="manage_prices"),
-        InlineKeyboardButton("👨‍💻 Adminlar", callback_data="manage_admins")
-    )
+    logger.info("Admin %s panelga kirdi.", message.from_user.id)
+    markup = get_admin_panel_keyboard()
     await message.answer(
         "👨‍💻 <b>Admin Paneli</b>\n"
         "🎨 <i>Kerakli bo‘limni tanlang:</i>",
@@ -63,30 +49,34 @@ async def admin_panel(message: types.Message):
     )
 
 # Narxlarni ko‘rish
-@dp.callback_query_handler(lambda c: c.data == "manage_prices")
+@callbacks.register("manage_prices")
 async def show_prices(callback_query: types.CallbackQuery):
     if not is_admin(callback_query.from_user.id):
         await callback_query.answer("🚫 Faqat adminlar uchun!", show_alert=True)
         return
     text = "💰 <b>Joriy narxlar:</b>\n"
     markup = InlineKeyboardMarkup(row_width=2)
-    for service, info in SERVICES.items():
+    for service, info in catalog.items():
         text += f"🌟 {service}: <b>{info['price']:,}</b> so'm/varaq\n"
-        markup.add(InlineKeyboardButton(f"✏️ {service}", callback_data=f"edit_price_{service}"))
+        markup.add(InlineKeyboardButton(f"✏️ {service}", callback_data=cb.edit_price.new(info['id'])))
     markup.add(InlineKeyboardButton("🔙 Panel", callback_data="back_to_panel"))
     await callback_query.message.edit_text(text, reply_markup=markup, parse_mode="HTML")
 
 # Narxni tahrirlash
-@dp.callback_query_handler(lambda c: c.data.startswith("edit_price_"))
-async def edit_price(callback_query: types.CallbackQuery, state: FSMContext):
+@callbacks.register(cb.edit_price)
+async def edit_price(callback_query: types.CallbackQuery, state: FSMContext, callback_data: dict):
     if not is_admin(callback_query.from_user.id):
         await callback_query.answer("🚫 Faqat adminlar uchun!", show_alert=True)
         return
-    service = callback_query.data.replace("edit_price_", "")
+    service = catalog.name_by_id(callback_data["service_id"])
+    info = catalog.get(service)
+    if not info:
+        await callback_query.answer("⚠️ Xizmat topilmadi!", show_alert=True)
+        return
     await state.update_data(service=service)
     text = (
         f"💰 <b>{service}</b>\n"
-        f"📈 Joriy narx: <b>{SERVICES[service]['price']:,}</b> so'm/varaq\n"
+        f"📈 Joriy narx: <b>{info['price']:,}</b> so'm/varaq\n"
         "✏️ <i>Yangi narxni kiriting (faqat raqam):</i>"
     )
     markup = InlineKeyboardMarkup().add(InlineKeyboardButton("🔙 Narxlar", callback_data="manage_prices"))
@@ -101,21 +91,24 @@ async def process_new_price(message: types.Message, state: FSMContext):
         await message.answer("⚠️ <b>Faqat raqam kiriting!</b>", parse_mode="HTML")
         return
     new_price = int(message.text)
-    SERVICES[service]['price'] = new_price
+    if catalog.set_price(service, new_price) is None:
+        await message.answer("⚠️ <b>Serverda xatolik yuz berdi!</b>", parse_mode="HTML")
+        await state.finish()
+        return
     text = (
         f"✅ <b>{service}</b> narxi yangilandi: <b>{new_price:,}</b> so'm/varaq\n"
         "💰 <i>Boshqa narxlarni o‘zgartirish:</i>"
     )
     markup = InlineKeyboardMarkup(row_width=2)
-    for s in SERVICES.keys():
-        markup.add(InlineKeyboardButton(f"✏️ {s}", callback_data=f"edit_price_{s}"))
+    for s, info in catalog.items():
+        markup.add(InlineKeyboardButton(f"✏️ {s}", callback_data=cb.edit_price.new(info['id'])))
     markup.add(InlineKeyboardButton("🔙 Panel", callback_data="back_to_panel"))
     await message.answer(text, reply_markup=markup, parse_mode="HTML")
     await state.finish()
-    logger.info(f"Admin {message.from_user.id} {service} narxini {new_price:,} so'm qildi.")
+    logger.info("Admin %s %s narxini %s so'm qildi.", message.from_user.id, service, f"{new_price:,}")
 
 # Buyurtmalarni ko‘rish
-@dp.callback_query_handler(lambda c: c.data == "view_orders")
+@callbacks.register("view_orders")
 async def show_orders(callback_query: types.CallbackQuery):
     if not is_admin(callback_query.from_user.id):
         await callback_query.answer("🚫 Faqat adminlar uchun!", show_alert=True)
@@ -142,20 +135,20 @@ async def show_orders(callback_query: types.CallbackQuery):
         )
     markup = InlineKeyboardMarkup(row_width=2)
     markup.add(
-        InlineKeyboardButton("⏳ Jarayonda", callback_data="filter_pending"),
-        InlineKeyboardButton("✅ Qabul qilingan", callback_data="filter_accepted"),
-        InlineKeyboardButton("❌ Rad etilgan", callback_data="filter_rejected"),
+        InlineKeyboardButton("⏳ Jarayonda", callback_data=cb.order_filter.new("pending")),
+        InlineKeyboardButton("✅ Qabul qilingan", callback_data=cb.order_filter.new("accepted")),
+        InlineKeyboardButton("❌ Rad etilgan", callback_data=cb.order_filter.new("rejected")),
         InlineKeyboardButton("🔙 Panel", callback_data="back_to_panel")
     )
     await callback_query.message.edit_text(text, reply_markup=markup, parse_mode="HTML")
 
 # Buyurtmalarni filtr qilish
-@dp.callback_query_handler(lambda c: c.data.startswith("filter_"))
-async def filter_orders(callback_query: types.CallbackQuery):
+@callbacks.register(cb.order_filter)
+async def filter_orders(callback_query: types.CallbackQuery, callback_data: dict):
     if not is_admin(callback_query.from_user.id):
         await callback_query.answer("🚫 Faqat adminlar uchun!", show_alert=True)
         return
-    filter_type = callback_query.data.split("_")[1]
+    filter_type = callback_data["status"]
     try:
         orders = db.get_orders()
     except Exception as e:
@@ -188,12 +181,12 @@ async def filter_orders(callback_query: types.CallbackQuery):
     await callback_query.message.edit_text(text or f"📭 <b>{filter_name} buyurtmalar yo‘q</b>", reply_markup=markup, parse_mode="HTML")
 
 # Buyurtma detallari
-@dp.callback_query_handler(lambda c: c.data.startswith("details_"))
-async def show_order_details(callback_query: types.CallbackQuery):
+@callbacks.register(cb.order_details)
+async def show_order_details(callback_query: types.CallbackQuery, callback_data: dict):
     if not is_admin(callback_query.from_user.id):
         await callback_query.answer("🚫 Faqat adminlar uchun!", show_alert=True)
         return
-    order_id = int(callback_query.data.split("_")[1])
+    order_id = callback_data["order_id"]
     try:
         order = db.get_order_by_id(order_id)
     except Exception as e:
@@ -216,27 +209,32 @@ async def show_order_details(callback_query: types.CallbackQuery):
         f"⏳ <b>Muddat:</b> {order[10]}\n"
     )
     if order[13]:
-        admin_user = await bot.get_chat(order[13])
+        admin_user = await chat_cache.get(order[13])
         text += f"👨‍💻 <b>Tasdiqlagan:</b> @{admin_user.username or 'Noma’lum'}"
 
     markup = InlineKeyboardMarkup(row_width=2)
     if order[11] == "Jarayonda":
         markup.add(
-            InlineKeyboardButton("✅ Qabul", callback_data=f"accept_{order_id}"),
-            InlineKeyboardButton("❌ Rad etish", callback_data=f"reject_{order_id}"),
-            InlineKeyboardButton("✔️ Bajarildi", callback_data=f"complete_{order_id}")
+            InlineKeyboardButton("✅ Qabul", callback_data=cb.order_action.new("accept", order_id)),
+            InlineKeyboardButton("❌ Rad etish", callback_data=cb.order_action.new("reject", order_id)),
+            InlineKeyboardButton("✔️ Bajarildi", callback_data=cb.order_action.new("complete", order_id))
         )
     elif order[11] == "Qabul qilindi":
-        markup.add(InlineKeyboardButton("✔️ Bajarildi", callback_data=f"complete_{order_id}"))
+        markup.add(InlineKeyboardButton("✔️ Bajarildi", callback_data=cb.order_action.new("complete", order_id)))
     markup.add(
-        InlineKeyboardButton("📩 Xabar", callback_data=f"send_{order_id}"),
+        InlineKeyboardButton("📩 Xabar", callback_data=cb.order_action.new("send", order_id)),
         InlineKeyboardButton("💬 Bog‘lanish", url=f"tg://user?id={order[1]}"),
         InlineKeyboardButton("🔙 Buyurtmalar", callback_data="view_orders")
     )
+    if callback_query.message is None:
+        # Inline qidiruv natijasidan bosilgan: batafsil ma'lumot bot chatiga yuboriladi
+        await bot.send_message(callback_query.from_user.id, text, reply_markup=markup, parse_mode="HTML")
+        await callback_query.answer()
+        return
     await callback_query.message.edit_text(text, reply_markup=markup, parse_mode="HTML")
 
 # Foydalanuvchilar soni
-@dp.callback_query_handler(lambda c: c.data == "view_users")
+@callbacks.register("view_users")
 async def show_users(callback_query: types.CallbackQuery):
     if not is_admin(callback_query.from_user.id):
         await callback_query.answer("🚫 Faqat adminlar uchun!", show_alert=True)
@@ -252,34 +250,70 @@ async def show_users(callback_query: types.CallbackQuery):
     await callback_query.message.edit_text(text, reply_markup=markup, parse_mode="HTML")
 
 # Statistika
-@dp.callback_query_handler(lambda c: c.data == "stats")
+@callbacks.register("stats")
+@rate_limit(2, burst=3)
 async def show_stats(callback_query: types.CallbackQuery):
     if not is_admin(callback_query.from_user.id):
         await callback_query.answer("🚫 Faqat adminlar uchun!", show_alert=True)
         return
+    # Barcha raqamlar oldindan hisoblangan jamlanma jadvallardan olinadi
+    today = local_now()
+    this_month = today.strftime("%Y-%m")
+    last_month = (today.replace(day=1) - timedelta(days=1)).strftime("%Y-%m")
     try:
-        total_orders = len(db.get_orders())
         total_users = db.count_users()
-        total_income = sum(o[9] for o in db.get_orders() if o[11] == "Qabul qilindi")
-        rejected_orders = len([o for o in db.get_orders() if o[11] == "Rad etildi"])
-        completed_orders = len([o for o in db.get_orders() if o[11] == "Bajarildi"])
+        totals = db.get_status_totals()
+        daily = db.get_daily_totals("Qabul qilindi", 60)
+        monthly = db.get_monthly_totals("Qabul qilindi", [this_month, last_month])
+        services = db.get_service_totals("Qabul qilindi", 30)
     except Exception as e:
         logger.error(f"DB error in stats: {e}")
         await callback_query.message.edit_text("⚠️ <b>Serverda xatolik yuz berdi!</b>", parse_mode="HTML")
         return
+
+    def window(start, days):
+        keys = [(today - timedelta(days=start + i)).strftime("%Y-%m-%d") for i in range(days)]
+        return sum(daily.get(key, (0, 0))[1] for key in keys)
+
+    def trend(current, previous):
+        if not previous:
+            return ""
+        change = (current - previous) * 100 // previous
+        return f" ({'📈' if change >= 0 else '📉'} {change:+d}%)"
+
+    week, prev_week = window(0, 7), window(7, 7)
+    month30, prev_month30 = window(0, 30), window(30, 30)
+    this_month_income = monthly.get(this_month, (0, 0))[1]
+    last_month_income = monthly.get(last_month, (0, 0))[1]
     text = (
         f"📊 <b>Statistika:</b>\n"
         f"👥 Foydalanuvchilar: {total_users}\n"
-        f"📋 Jami buyurtmalar: {total_orders}\n"
-        f"✅ Qabul qilingan: {completed_orders}\n"
-        f"❌ Rad etilgan: {rejected_orders}\n"
-        f"💰 Jami daromad: {total_income:,} so'm"
+        f"📋 Jami buyurtmalar: {totals.get('Jarayonda', (0, 0))[0]}\n"
+        f"✅ Qabul qilingan: {totals.get('Qabul qilindi', (0, 0))[0]}\n"
+        f"✔️ Bajarilgan: {totals.get('Bajarildi', (0, 0))[0]}\n"
+        f"❌ Rad etilgan: {totals.get('Rad etildi', (0, 0))[0]}\n"
+        f"💰 Jami daromad: {totals.get('Qabul qilindi', (0, 0))[1]:,} so'm\n"
+        "────────────────────\n"
+        f"📅 7 kun: <b>{week:,}</b> so'm{trend(week, prev_week)}\n"
+        f"📅 30 kun: <b>{month30:,}</b> so'm{trend(month30, prev_month30)}\n"
+        f"🗓 Bu oy: <b>{this_month_income:,}</b> so'm{trend(this_month_income, last_month_income)}\n"
+        f"🗓 O‘tgan oy: {last_month_income:,} so'm\n"
+        "────────────────────\n"
+        "📈 <b>Oxirgi 7 kun:</b>\n"
     )
+    for i in range(6, -1, -1):
+        day = today - timedelta(days=i)
+        orders, revenue = daily.get(day.strftime("%Y-%m-%d"), (0, 0))
+        text += f"▫️ {day.strftime('%d.%m')}: {orders} ta - {revenue:,} so'm\n"
+    if services:
+        text += "────────────────────\n🏆 <b>Xizmatlar (30 kun):</b>\n"
+        for service, orders, revenue in services:
+            text += f"🌟 {service}: {orders} ta - {revenue:,} so'm\n"
     markup = InlineKeyboardMarkup().add(InlineKeyboardButton("🔙 Panel", callback_data="back_to_panel"))
     await callback_query.message.edit_text(text, reply_markup=markup, parse_mode="HTML")
 
 # Buyurtmalar tarixi
-@dp.callback_query_handler(lambda c: c.data == "order_history")
+@callbacks.register("order_history")
 async def show_order_history(callback_query: types.CallbackQuery):
     if not is_admin(callback_query.from_user.id):
         await callback_query.answer("🚫 Faqat adminlar uchun!", show_alert=True)
@@ -306,22 +340,170 @@ async def show_order_history(callback_query: types.CallbackQuery):
             f"⏳ {order[10]}\n"
             "➖➖➖➖➖\n"
         )
-        markup.add(InlineKeyboardButton(f"#{order[0]} Batafsil", callback_data=f"details_{order[0]}"))
+        markup.add(InlineKeyboardButton(f"#{order[0]} Batafsil", callback_data=cb.order_details.new(order[0])))
+    markup.add(InlineKeyboardButton("🔙 Panel", callback_data="back_to_panel"))
+    await callback_query.message.edit_text(text, reply_markup=markup, parse_mode="HTML")
+
+def format_duration(seconds):
+    """Soniyalarni qisqa matnga o‘tkazish (masalan: 2 soat 15 daqiqa)"""
+    if seconds is None:
+        return "—"
+    minutes = int(seconds // 60)
+    if minutes < 60:
+        return f"{minutes} daqiqa"
+    hours, minutes = divmod(minutes, 60)
+    if hours < 24:
+        return f"{hours} soat {minutes} daqiqa"
+    days, hours = divmod(hours, 24)
+    return f"{days} kun {hours} soat"
+
+# Adminlar samaradorligi (hisoblagichlar holat o‘zgarishlarida yangilanadi)
+@callbacks.register("admin_perf")
+async def show_admin_performance(callback_query: types.CallbackQuery):
+    if not is_admin(callback_query.from_user.id):
+        await callback_query.answer("🚫 Faqat adminlar uchun!", show_alert=True)
+        return
+    try:
+        stats = db.get_admin_stats()
+        latency = db.get_admin_latency()
+    except Exception as e:
+        logger.error(f"DB error in admin_perf: {e}")
+        await callback_query.message.edit_text("⚠️ <b>Serverda xatolik yuz berdi!</b>", parse_mode="HTML")
+        return
+    markup = InlineKeyboardMarkup().add(InlineKeyboardButton("🔙 Panel", callback_data="back_to_panel"))
+    if not stats:
+        await callback_query.message.edit_text("🏅 <b>Hozircha ma'lumot yo‘q.</b>", reply_markup=markup, parse_mode="HTML")
+        return
+
+    chats = await chat_cache.get_many(row[0] for row in stats)
+    text = "🏅 <b>Adminlar samaradorligi:</b>\n"
+    for admin_id, accepted, completed, rejected, open_orders in stats:
+        user = chats.get(str(admin_id))
+        accept_median = histogram_median(latency.get((admin_id, 'accept'), {}))
+        complete_median = histogram_median(latency.get((admin_id, 'complete'), {}))
+        text += (
+            f"👨‍💻 @{user.username if user and user.username else admin_id}\n"
+            f"✅ Qabul: {accepted} | ✔️ Bajarildi: {completed} | ❌ Rad: {rejected}\n"
+            f"📂 Ochiq buyurtmalar: {open_orders}\n"
+            f"⏱ Qabulgacha (mediana): {format_duration(accept_median)}\n"
+            f"⏱ Bajarilgunicha (mediana): {format_duration(complete_median)}\n"
+            "➖➖➖➖➖\n"
+        )
+    await callback_query.message.edit_text(text, reply_markup=markup, parse_mode="HTML")
+
+# Adminning ish navbati (muddati yaqinlari birinchi)
+@callbacks.register("my_queue")
+async def show_my_queue(callback_query: types.CallbackQuery):
+    if not is_admin(callback_query.from_user.id):
+        await callback_query.answer("🚫 Faqat adminlar uchun!", show_alert=True)
+        return
+    try:
+        orders = db.get_admin_queue(callback_query.from_user.id)
+    except Exception as e:
+        logger.error(f"DB error in my_queue: {e}")
+        await callback_query.message.edit_text("⚠️ <b>Serverda xatolik yuz berdi!</b>", parse_mode="HTML")
+        return
+    markup = InlineKeyboardMarkup(row_width=2)
+    if not orders:
+        markup.add(InlineKeyboardButton("🔙 Panel", callback_data="back_to_panel"))
+        await callback_query.message.edit_text("📌 <b>Navbatingizda buyurtmalar yo‘q.</b>", reply_markup=markup, parse_mode="HTML")
+        return
+
+    text = "📌 <b>Mening navbatim:</b>\n"
+    for order in orders:
+        if order[14]:
+            emoji, left = urgency(order[14])
+            time_left = f" ({format_time_left(left)})"
+        else:
+            emoji, time_left = "⚪️", ""
+        text += (
+            f"{emoji} <b>#{order[0]}</b> - <i>{order[5]}</i>\n"
+            f"👤 {order[2]} (@{order[3] or 'Noma’lum'})\n"
+            f"⏳ {order[10]}{time_left}\n"
+            "➖➖➖➖➖\n"
+        )
+        markup.insert(InlineKeyboardButton(f"#{order[0]} Batafsil", callback_data=cb.order_details.new(order[0])))
     markup.add(InlineKeyboardButton("🔙 Panel", callback_data="back_to_panel"))
     await callback_query.message.edit_text(text, reply_markup=markup, parse_mode="HTML")
 
+# Eng og‘ir SQL so‘rovlari: /queries [total|count|p95|rows]
+@dp.message_handler(commands=['queries'], state='*')
+async def show_top_queries(message: types.Message):
+    if not is_admin(message.from_user.id):
+        await message.answer("🚫 <b>Bu buyruq faqat adminlar uchun!</b>", parse_mode="HTML")
+        return
+    key = message.get_args().strip() or "total"
+    if key not in ("total", "count", "p95", "rows"):
+        await message.answer("⚠️ <b>Saralash: total, count, p95 yoki rows</b>", parse_mode="HTML")
+        return
+    text = format_top(10, key)
+    await message.answer(
+        f"🐢 <b>Eng og‘ir so‘rovlar ({key}):</b>\n{text}" if text else "📭 <b>Hali so‘rovlar yo‘q</b>",
+        parse_mode="HTML"
+    )
+
+# Ommaviy xabar tarqatish
+@dp.message_handler(commands=['broadcast'], state='*')
+async def broadcast_command(message: types.Message, state: FSMContext):
+    if not is_admin(message.from_user.id):
+        await message.answer("🚫 <b>Bu buyruq faqat adminlar uchun!</b>", parse_mode="HTML")
+        return
+    await state.finish()
+    await message.answer(
+        f"📢 <b>Ommaviy xabar</b>\n"
+        f"👥 Faol foydalanuvchilar: {db.count_active_users()}\n"
+        "✍️ <i>Barchaga yuboriladigan xabar matnini kiriting:</i>",
+        parse_mode="HTML"
+    )
+    await AdminState.broadcast.set()
+
+@callbacks.register("broadcast")
+async def broadcast_prompt(callback_query: types.CallbackQuery):
+    if not is_admin(callback_query.from_user.id):
+        await callback_query.answer("🚫 Faqat adminlar uchun!", show_alert=True)
+        return
+    markup = InlineKeyboardMarkup().add(InlineKeyboardButton("🔙 Panel", callback_data="back_to_panel"))
+    await callback_query.message.edit_text(
+        f"📢 <b>Ommaviy xabar</b>\n"
+        f"👥 Faol foydalanuvchilar: {db.count_active_users()}\n"
+        "✍️ <i>Barchaga yuboriladigan xabar matnini kiriting:</i>",
+        reply_markup=markup, parse_mode="HTML"
+    )
+    await AdminState.broadcast.set()
+
+@dp.message_handler(state=AdminState.broadcast)
+async def process_broadcast(message: types.Message, state: FSMContext):
+    await state.finish()
+    broadcast_id = await broadcaster.start(message.from_user.id, message.html_text)
+    if broadcast_id is None:
+        await message.answer("⚠️ <b>Serverda xatolik yuz berdi!</b>", parse_mode="HTML")
+        return
+    logger.info("Admin %s ommaviy xabar #%s ni boshladi.", message.from_user.id, broadcast_id)
+
+@callbacks.register(cb.broadcast_stop)
+async def stop_broadcast(callback_query: types.CallbackQuery, callback_data: dict):
+    if not is_admin(callback_query.from_user.id):
+        await callback_query.answer("🚫 Faqat adminlar uchun!", show_alert=True)
+        return
+    broadcaster.stop(callback_data["broadcast_id"])
+    await callback_query.answer("⛔️ Tarqatish to‘xtatildi.")
+
 # Adminlar boshqaruvi
-@dp.callback_query_handler(lambda c: c.data == "manage_admins")
+@callbacks.register("manage_admins")
 async def manage_admins(callback_query: types.CallbackQuery):
     if not is_admin(callback_query.from_user.id):
         await callback_query.answer("🚫 Faqat adminlar uchun!", show_alert=True)
         return
     text = "👨‍💻 <b>Adminlar ro‘yxati:</b>\n"
     markup = InlineKeyboardMarkup(row_width=2)
-    for admin_id in ADMINS:
-        user = await bot.get_chat(admin_id)
-        text += f"🌟 @{user.username or 'Noma’lum'} (ID: {admin_id})\n"
-        markup.add(InlineKeyboardButton(f"➖ @{user.username or admin_id}", callback_data=f"remove_admin_{admin_id}"))
+    # Profillar keshdan olinadi, yo‘qlari parallel so‘raladi
+    admin_ids = admins.ids()
+    chats = await chat_cache.get_many(admin_ids)
+    for admin_id in admin_ids:
+        user = chats.get(str(admin_id))
+        username = user.username if user else None
+        text += f"🌟 @{username or 'Noma’lum'} (ID: {admin_id})\n"
+        markup.add(InlineKeyboardButton(f"➖ @{username or admin_id}", callback_data=cb.remove_admin.new(admin_id)))
     markup.add(
         InlineKeyboardButton("➕ Admin qo‘shish", callback_data="add_admin"),
         InlineKeyboardButton("🔙 Panel", callback_data="back_to_panel")
@@ -329,7 +511,7 @@ async def manage_admins(callback_query: types.CallbackQuery):
     await callback_query.message.edit_text(text, reply_markup=markup, parse_mode="HTML")
 
 # Admin qo‘shish
-@dp.callback_query_handler(lambda c: c.data == "add_admin")
+@callbacks.register("add_admin")
 async def add_admin_prompt(callback_query: types.CallbackQuery, state: FSMContext):
     if not is_admin(callback_query.from_user.id):
         await callback_query.answer("🚫 Faqat adminlar uchun!", show_alert=True)
@@ -348,35 +530,32 @@ async def process_add_admin(message: types.Message, state: FSMContext):
         await message.answer("⚠️ <b>Faqat raqam kiriting (Telegram ID)!</b>", parse_mode="HTML")
         return
     new_admin_id = message.text
-    if new_admin_id in ADMINS:
+    if not admins.add(new_admin_id):
         await message.answer("⚠️ <b>Bu foydalanuvchi allaqachon admin!</b>", parse_mode="HTML")
         return
-    ADMINS.append(new_admin_id)
-    save_admins()
     try:
-        user = await bot.get_chat(new_admin_id)
+        user = await chat_cache.get(new_admin_id)
         await message.answer(f"✅ <b>@{user.username or 'Noma’lum'} admin qilib qo‘shildi!</b>", parse_mode="HTML")
     except:
         await message.answer(f"✅ <b>ID: {new_admin_id} admin qilib qo‘shildi!</b>\nℹ️ Foydalanuvchi topilmadi.", parse_mode="HTML")
     await state.finish()
 
 # Admin o‘chirish
-@dp.callback_query_handler(lambda c: c.data.startswith("remove_admin_"))
-async def process_remove_admin(callback_query: types.CallbackQuery):
+@callbacks.register(cb.remove_admin)
+async def process_remove_admin(callback_query: types.CallbackQuery, callback_data: dict):
     if not is_admin(callback_query.from_user.id):
         await callback_query.answer("🚫 Faqat adminlar uchun!", show_alert=True)
         return
-    admin_id = callback_query.data.replace("remove_admin_", "")
-    if admin_id not in ADMINS:
+    admin_id = str(callback_data["admin_id"])
+    if admin_id not in admins:
         await callback_query.answer("⚠️ Bu ID adminlar ro‘yxatida yo‘q!", show_alert=True)
         return
-    if len(ADMINS) <= 1:
+    if len(admins) <= 1:
         await callback_query.answer("⚠️ Oxirgi adminni o‘chirib bo‘lmaydi!", show_alert=True)
         return
-    ADMINS.remove(admin_id)
-    save_admins()
+    admins.remove(admin_id)
     try:
-        user = await bot.get_chat(admin_id)
+        user = await chat_cache.get(admin_id)
         await callback_query.message.edit_text(
             f"✅ <b>@{user.username or 'Noma’lum'} adminlikdan olindi!</b>",
             reply_markup=InlineKeyboardMarkup().add(InlineKeyboardButton("🔙 Adminlar", callback_data="manage_admins")),
@@ -390,20 +569,12 @@ async def process_remove_admin(callback_query: types.CallbackQuery):
         )
 
 # Admin panelga qaytish
-@dp.callback_query_handler(lambda c: c.data == "back_to_panel")
+@callbacks.register("back_to_panel")
 async def back_to_admin_panel(callback_query: types.CallbackQuery):
     if not is_admin(callback_query.from_user.id):
         await callback_query.answer("🚫 Faqat adminlar uchun!", show_alert=True)
         return
-    markup = InlineKeyboardMarkup(row_width=2)
-    markup.add(
-        InlineKeyboardButton("📋 Buyurtmalar", callback_data="view_orders"),
-        InlineKeyboardButton("👥 Foydalanuvchilar", callback_data="view_users"),
-        InlineKeyboardButton("📊 Statistika", callback_data="stats"),
-        InlineKeyboardButton("🕒 Tarix", callback_data="order_history"),
-        InlineKeyboardButton("💰 Narxlar", callback_data="manage_prices"),
-        InlineKeyboardButton("👨‍💻 Adminlar", callback_data="manage_admins")
-    )
+    markup = get_admin_panel_keyboard()
     await callback_query.message.edit_text(
         "👨‍💻 <b>Admin Paneli</b>\n"
         "🎨 <i>Kerakli bo‘limni tanlang:</i>",
@@ -411,19 +582,41 @@ async def back_to_admin_panel(callback_query: types.CallbackQuery):
     )
 
 # Buyurtma qabul qilish, rad etish, yakunlash
-@dp.callback_query_handler(lambda c: c.data.startswith(('accept_', 'reject_', 'complete_', 'send_')))
-async def process_admin_response(callback_query: types.CallbackQuery, state: FSMContext):
+@callbacks.register(cb.order_action)
+async def process_admin_response(callback_query: types.CallbackQuery, state: FSMContext, callback_data: dict):
     if not is_admin(callback_query.from_user.id):
         await callback_query.answer("🚫 Faqat adminlar uchun!", show_alert=True)
         return
-    action, order_id = callback_query.data.split('_', 1)
-    order_id = int(order_id)
+    action, order_id = callback_data["action"], callback_data["order_id"]
+    # Bir yoki bir nechta admin bir necha soniya ichida bir xil amalni bossa - faqat birinchisi ishlanadi
+    action_key = ("order_action", order_id, action)
+    if action in STATUS_ACTIONS and not idempotency.claim(action_key, ttl=DOUBLE_TAP_WINDOW):
+        await callback_query.answer("⏳ Bu buyurtma hozir ko‘rib chiqilmoqda!")
+        return
+    transition = None
     try:
-        order = db.get_order_by_id(order_id)
+        if action in ("accept", "complete"):
+            # Holat bitta shartli UPDATE bilan o‘zgaradi, yangilangan qator shu so‘rovdan qaytadi
+            transition = order_states.apply(order_id, action, callback_query.from_user.id)
+            failed, order = transition.result == FAILED, transition.order
+        else:
+            failed, order = False, db.get_order_by_id(order_id)
     except Exception as e:
-        logger.error(f"DB error in get_order_by_id: {e}")
+        logger.error(f"DB error in process_admin_response: {e}")
+        failed = True
+    if failed:
+        idempotency.release(action_key)
         await callback_query.message.edit_text("⚠️ <b>Serverda xatolik yuz berdi!</b>", parse_mode="HTML")
         return
+    if transition and transition.result == ALREADY_HANDLED:
+        if action == "complete" and transition.status == ACCEPTED:
+            await callback_query.answer("⚠️ Bu buyurtmani faqat tasdiqlagan admin yakunlay oladi!", show_alert=True)
+        elif action == "complete":
+            await callback_query.answer("⚠️ Bu buyurtma allaqachon yakunlangan yoki hali qabul qilinmagan!",
+                                        show_alert=True)
+        else:
+            await callback_query.answer("⚠️ Bu buyurtma allaqachon tasdiqlangan yoki rad etilgan!", show_alert=True)
+        return
     if not order:
         await callback_query.answer("⚠️ Buyurtma topilmadi!", show_alert=True)
         return
@@ -434,15 +627,8 @@ async def process_admin_response(callback_query: types.CallbackQuery, state: FSM
     HALF_PAYMENT = order[9] // 2
 
     if action == "accept":
-        if order[11] != "Jarayonda":
-            await callback_query.answer("⚠️ Bu buyurtma allaqachon tasdiqlangan yoki rad etilgan!", show_alert=True)
-            return
-        try:
-            db.update_order_status(order_id, "Qabul qilindi", confirmed_by_admin_id=callback_query.from_user.id)
-        except Exception as e:
-            logger.error(f"DB error in update_order_status: {e}")
-            await callback_query.message.edit_text("⚠️ <b>Serverda xatolik yuz berdi!</b>", parse_mode="HTML")
-            return
+        scheduler.cancel(order_id, "reminder")
+        deadlines.track(order_id, order[14], callback_query.from_user.id)
         admin_text = (
             f"✅ <b>Buyurtma #{order_id} qabul qilindi!</b>\n"
             "────────────────────\n"
@@ -466,7 +652,7 @@ async def process_admin_response(callback_query: types.CallbackQuery, state: FSM
             "ℹ️ <i>50% to‘lovni amalga oshirib, skrinshotni admin ga yuboring. To‘lov tasdiqlangach ish boshlanadi!</i>"
         )
         entities = [MessageEntity(type="code", offset=user_text.find(CARD_NUMBER), length=len(CARD_NUMBER))]
-        for admin_id in ADMINS:
+        for admin_id in admins.ids():
             if str(admin_id) != str(callback_query.from_user.id):
                 try:
                     await bot.send_message(
@@ -479,15 +665,7 @@ async def process_admin_response(callback_query: types.CallbackQuery, state: FSM
                     logger.error(f"Admin {admin_id} ga xabar yuborib bo‘lmadi.")
 
     elif action == "complete":
-        if order[11] != "Qabul qilindi" or str(order[13]) != str(callback_query.from_user.id):
-            await callback_query.answer("⚠️ Bu buyurtmani faqat tasdiqlagan admin yakunlay oladi!", show_alert=True)
-            return
-        try:
-            db.update_order_status(order_id, "Bajarildi")
-        except Exception as e:
-            logger.error(f"DB error in update_order_status: {e}")
-            await callback_query.message.edit_text("⚠️ <b>Serverda xatolik yuz berdi!</b>", parse_mode="HTML")
-            return
+        deadlines.untrack(order_id)
         admin_text = (
             f"✔️ <b>Buyurtma #{order_id} bajarildi!</b>\n"
             "────────────────────\n"
@@ -505,7 +683,8 @@ async def process_admin_response(callback_query: types.CallbackQuery, state: FSM
         )
         entities = None
     elif action == "reject":
-        if order[11] != "Jarayonda":
+        # Holat sabab kiritilganda (process_reject_reason) o‘zgaradi
+        if order[11] != PENDING:
             await callback_query.answer("⚠️ Bu buyurtma allaqachon tasdiqlangan yoki rad etilgan!", show_alert=True)
             return
         await state.update_data(order_id=order_id, admin_message_id=admin_message_id)
@@ -528,7 +707,7 @@ async def process_admin_response(callback_query: types.CallbackQuery, state: FSM
 
     markup = InlineKeyboardMarkup(row_width=2)
     markup.add(
-        InlineKeyboardButton("📩 Xabar", callback_data=f"send_{order_id}"),
+        InlineKeyboardButton("📩 Xabar", callback_data=cb.order_action.new("send", order_id)),
         InlineKeyboardButton("💬 Bog‘lanish", url=f"tg://user?id={user_chat_id}"),
         InlineKeyboardButton("🔙 Buyurtmalar", callback_data="view_orders")
     )
@@ -542,12 +721,24 @@ async def process_reject_reason(message: types.Message, state: FSMContext):
     data = await state.get_data()
     order_id = data['order_id']
     try:
-        order = db.get_order_by_id(order_id)
-        db.update_order_status(order_id, "Rad etildi")
+        transition = order_states.apply(order_id, "reject", message.from_user.id)
     except Exception as e:
         logger.error(f"DB error in reject_reason: {e}")
+        transition = None
+    if transition is None or transition.result == FAILED:
         await message.answer("⚠️ <b>Serverda xatolik yuz berdi!</b>", parse_mode="HTML")
         return
+    if transition.result == NOT_FOUND:
+        await message.answer("⚠️ Buyurtma topilmadi!")
+        await state.finish()
+        return
+    if transition.result == ALREADY_HANDLED:
+        # Sabab yozilguncha boshqa admin qabul qilgan yoki rad etgan
+        await message.answer("⚠️ Bu buyurtma allaqachon tasdiqlangan yoki rad etilgan!")
+        await state.finish()
+        return
+    order = transition.order
+    scheduler.cancel(order_id, "reminder")
     reason = message.text
     admin_text = (
         f"❌ <b>Buyurtma #{order_id} rad etildi</b>\n"
@@ -0,0 +1,39 @@
+import hashlib
+from aiogram import types
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, InlineQueryResultArticle, InputTextMessageContent
+from loader import dp, admins, order_search
+from keyboards.inline.callback_datas import order_details
+from utils.misc import rate_limit
+
+STATUS_EMOJI = {"Jarayonda": "⏳", "Qabul qilindi": "✅", "Rad etildi": "❌", "Bajarildi": "✔️"}
+
+
+# Inline rejimda buyurtma qidirish: @bot 123 yoki @bot familiya
+@dp.inline_handler(state='*')
+@rate_limit(0.5, burst=5)
+async def inline_order_search(inline_query: types.InlineQuery):
+    if not admins.is_admin(inline_query.from_user.id):
+        await inline_query.answer([], cache_time=300, is_personal=True)
+        return
+    orders = order_search.search(inline_query.query)
+    results = []
+    for order in orders:
+        emoji = STATUS_EMOJI.get(order[11], "✔️")
+        text = (
+            f"{emoji} <b>Buyurtma #{order[0]}</b> - <i>{order[11]}</i>\n"
+            f"👤 {order[2]} (@{order[3] or 'Noma’lum'})\n"
+            f"📦 {order[5]}\n"
+            f"💵 {order[9]:,} so'm\n"
+            f"⏳ {order[10]}"
+        )
+        markup = InlineKeyboardMarkup().add(
+            InlineKeyboardButton(f"#{order[0]} Batafsil", callback_data=order_details.new(order[0]))
+        )
+        results.append(InlineQueryResultArticle(
+            id=hashlib.md5(f"{order[0]}:{order[11]}".encode()).hexdigest(),
+            title=f"{emoji} #{order[0]} - {order[2]}",
+            description=f"{order[5]} | {order[11]} | {order[10]}",
+            input_message_content=InputTextMessageContent(text, parse_mode="HTML"),
+            reply_markup=markup
+        ))
+    await inline_query.answer(results, cache_time=5, is_personal=True)
@@ -1,17 +1,16 @@
-import asyncio
 import logging
 import re
+import uuid
 from datetime import datetime, timedelta
 import pytz  # O‘zbekiston vaqtini olish uchun
 from aiogram import types
 from aiogram.dispatcher import FSMContext
 from aiogram.dispatcher.filters.state import State, StatesGroup
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton
-from loader import dp, bot, db
-from data.config import ADMINS
-from data.services import SERVICES
+from loader import dp, bot, db, scheduler, admins, catalog, callbacks, idempotency
+from keyboards.inline.admin_panel import get_admin_panel_keyboard
+from keyboards.inline import callback_datas as cb
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class OrderState(StatesGroup):
@@ -60,10 +59,10 @@ def get_phone_menu():
 def get_deadline_inline_keyboard():
     markup = InlineKeyboardMarkup(row_width=2)
     markup.add(
-        InlineKeyboardButton("⏳ Bugun", callback_data="deadline_today"),
-        InlineKeyboardButton("📅 3 kun", callback_data="deadline_3days"),
-        InlineKeyboardButton("📅 1 hafta", callback_data="deadline_1week"),
-        InlineKeyboardButton("⌨️ Boshqa sana", callback_data="deadline_custom"),
+        InlineKeyboardButton("⏳ Bugun", callback_data=cb.deadline.new("today")),
+        InlineKeyboardButton("📅 3 kun", callback_data=cb.deadline.new("3days")),
+        InlineKeyboardButton("📅 1 hafta", callback_data=cb.deadline.new("1week")),
+        InlineKeyboardButton("⌨️ Boshqa sana", callback_data=cb.deadline.new("custom")),
         InlineKeyboardButton("❌ Bekor", callback_data="cancel_order")
     )
     return markup
@@ -88,17 +87,24 @@ async def safe_edit_or_send(chat_id, message_id, text, markup=None, parse_mode="
     msg = await bot.send_message(chat_id, text, reply_markup=markup, parse_mode=parse_mode)
     return msg.message_id
 
-# Eslatma yuborish funksiyasi
-async def send_reminder(order_id, user_id):
-    await asyncio.sleep(REMINDER_DELAY)
-    order = db.get_order_by_id(order_id)
-    if order and order[11] == "Jarayonda":  # Agar hali tasdiqlanmagan bo‘lsa
-        await bot.send_message(
-            user_id,
-            f"⏳ <b>Buyurtma #{order_id} hali tasdiqlanmadi!</b>\n"
-            f"ℹ️ Shoshilinch bo‘lsa, admin bilan bog‘laning: @{ADMIN_USERNAME}",
-            parse_mode="HTML"
-        )
+# Eslatma yuborish funksiyasi (rejalashtiruvchi muddati kelgan eslatmalarni to‘plab beradi)
+async def send_reminders(jobs):
+    orders = {order[0]: order for order in db.get_orders_by_ids(job.order_id for job in jobs)}
+    for job in jobs:
+        order = orders.get(job.order_id)
+        if not order or order[11] != "Jarayonda":  # Tasdiqlangan yoki o‘chirilgan bo‘lsa
+            continue
+        try:
+            await bot.send_message(
+                job.chat_id,
+                f"⏳ <b>Buyurtma #{job.order_id} hali tasdiqlanmadi!</b>\n"
+                f"ℹ️ Shoshilinch bo‘lsa, admin bilan bog‘laning: @{ADMIN_USERNAME}",
+                parse_mode="HTML"
+            )
+        except Exception as e:
+            logger.error(f"Buyurtma #{job.order_id} eslatmasini yuborishda xato: {e}")
+
+scheduler.register("reminder", send_reminders)
 
 # Bekor qilish
 @dp.message_handler(state='*', text="❌ Bekor")
@@ -117,25 +123,17 @@ async def cancel_order(message: types.Message, state: FSMContext):
 @dp.message_handler(commands=['admin'], state='*')
 async def admin_panel(message: types.Message, state: FSMContext):
     user_id = str(message.from_user.id)
-    if user_id not in ADMINS:
+    if not admins.is_admin(user_id):
         await message.answer("🚫 <b>Bu buyruq faqat adminlar uchun!</b>", parse_mode="HTML")
         return
     await state.finish()
-    markup = InlineKeyboardMarkup(row_width=2)
-    markup.add(
-        InlineKeyboardButton("📋 Buyurtmalar", callback_data="view_orders"),
-        InlineKeyboardButton("👥 Foydalanuvchilar", callback_data="view_users"),
-        InlineKeyboardButton("📊 Statistika", callback_data="stats"),
-        InlineKeyboardButton("🕒 Tarix", callback_data="order_history"),
-        InlineKeyboardButton("💰 Narxlar", callback_data="manage_prices"),
-        InlineKeyboardButton("👨‍💻 Adminlar", callback_data="manage_admins")
-    )
+    markup = get_admin_panel_keyboard()
     await message.answer(
         "👨‍💻 <b>Admin Paneli</b>\n"
         "🎨 <i>Kerakli bo‘limni tanlang:</i>",
         reply_markup=markup, parse_mode="HTML"
     )
-    logger.info(f"Admin {user_id} panelga kirdi.")
+    logger.info("Admin %s panelga kirdi.", user_id)
 
 # Start
 @dp.message_handler(commands=['start'], state='*')
@@ -147,7 +145,7 @@ async def bot_start(message: types.Message, state: FSMContext):
         if not db.select_user(user_id):
             db.add_user(user_id, username)
             user_count = db.count_users()
-            for admin in ADMINS:
+            for admin in admins.ids():
                 await bot.send_message(admin, f"🆕 <b>Yangi foydalanuvchi:</b> @{username}\n👥 <b>Jami:</b> {user_count}", parse_mode="HTML")
         db.update_last_active(user_id)
     except Exception as e:
@@ -208,9 +206,14 @@ async def process_service(message: types.Message, state: FSMContext):
         return
 
     service = message.text
-    price = SERVICES.get(service, {}).get('price', 5000)
-    min_pages = SERVICES.get(service, {}).get('min_pages', 5)
-    await state.update_data(service=service, price=price, min_pages=min_pages)
+    # Katalogda yo‘q xizmatlar "Boshqa xizmatlar" narxi bilan hisoblanadi
+    info, catalog_version = catalog.lookup(service)
+    if not info:
+        await message.answer("⚠️ <b>Serverda xatolik yuz berdi, keyinroq urinib ko‘ring!</b>", parse_mode="HTML")
+        return
+    price = info['price']
+    min_pages = info['min_pages']
+    await state.update_data(service=service, price=price, min_pages=min_pages, catalog_version=catalog_version)
     text = (
         f"📋 <b>Buyurtma:</b>\n"
         f"🌟 Xizmat: <i>{service}</i>\n"
@@ -319,15 +322,16 @@ async def process_pages(message: types.Message, state: FSMContext):
     await message.delete()
 
 # Muddat tanlash (O‘zbekiston vaqti bilan va bugun uchun 2 soat qolish sharti)
-@dp.callback_query_handler(lambda c: c.data.startswith('deadline_'), state=OrderState.deadline)
-async def process_deadline_choice(callback_query: types.CallbackQuery, state: FSMContext):
+@callbacks.register(cb.deadline, state=OrderState.deadline)
+async def process_deadline_choice(callback_query: types.CallbackQuery, state: FSMContext, callback_data: dict):
     data = await state.get_data()
     chat_id = callback_query.message.chat.id
     message_id = data.get('message_id')
     uz_tz = pytz.timezone("Asia/Tashkent")  # O‘zbekiston vaqt zonasi
     today = datetime.now(uz_tz)
+    choice = callback_data["choice"]
 
-    if callback_query.data == "deadline_today":
+    if choice == "today":
         if today.hour >= 22:  # 22:00 dan keyin bugun tanlanmasin (2 soat qolish uchun)
             await callback_query.answer(
                 "⚠️ Bugun uchun yetarli vaqt qolmadi!\n"
@@ -336,11 +340,11 @@ async def process_deadline_choice(callback_query: types.CallbackQuery, state: FS
             )
             return
         deadline = today.strftime("%d.%m.%Y")
-    elif callback_query.data == "deadline_3days":
+    elif choice == "3days":
         deadline = (today + timedelta(days=3)).strftime("%d.%m.%Y")
-    elif callback_query.data == "deadline_1week":
+    elif choice == "1week":
         deadline = (today + timedelta(weeks=1)).strftime("%d.%m.%Y")
-    elif callback_query.data == "deadline_custom":
+    elif choice == "custom":
         text = (
             f"📋 <b>Buyurtma:</b>\n"
             f"🌟 Xizmat: <i>{data['service']}</i>\n"
@@ -487,13 +491,15 @@ async def process_phone(message: types.Message, state: FSMContext):
         InlineKeyboardButton("❌ Bekor", callback_data="cancel_order")
     )
     msg = await safe_edit_or_send(chat_id, message_id, text, markup)
-    await state.update_data(message_id=msg)
+    # Tasdiqlash bitta buyurtma yaratishi uchun sessiya tokeni (ikki marta bosishga qarshi)
+    await state.update_data(message_id=msg, order_token=uuid.uuid4().hex)
     await OrderState.confirm.set()
     await message.delete()
 
 # Tasdiqlash
-@dp.callback_query_handler(lambda c: c.data in ['confirm_order', 'edit_order', 'cancel_order'],
-                           state=OrderState.confirm)
+@callbacks.register("confirm_order", state=OrderState.confirm)
+@callbacks.register("edit_order", state=OrderState.confirm)
+@callbacks.register("cancel_order", state=OrderState.confirm)
 async def process_confirmation(callback_query: types.CallbackQuery, state: FSMContext):
     data = await state.get_data()
     user = callback_query.from_user
@@ -518,6 +524,12 @@ async def process_confirmation(callback_query: types.CallbackQuery, state: FSMCo
         return
 
     if callback_query.data == "confirm_order":
+        # Bir sessiyadagi takroriy tasdiqlash baza va Bot API ga yetmaydi
+        order_key = ("order", data.get('order_token') or f"{chat_id}:{message_id}")
+        if not idempotency.claim(order_key):
+            await callback_query.answer("⏳ Buyurtmangiz allaqachon yuborilgan!")
+            return
+
         # Vaqt zonasi bilan ishlash uchun tz o‘zgaruvchisi
         tz = pytz.timezone("Asia/Tashkent")
 
@@ -530,6 +542,7 @@ async def process_confirmation(callback_query: types.CallbackQuery, state: FSMCo
             ).total_seconds() < ORDER_COOLDOWN
         ]
         if len(recent_orders) >= ORDER_LIMIT:
+            idempotency.release(order_key)
             await callback_query.answer("⚠️ 24 soat ichida ko‘p buyurtma berdingiz!", show_alert=True)
             return
 
@@ -545,12 +558,17 @@ async def process_confirmation(callback_query: types.CallbackQuery, state: FSMCo
             'price': data['price'],
             'total_price': total_price,
             'deadline': data['deadline'],
-            'status': 'Jarayonda'
+            'status': 'Jarayonda',
+            'catalog_version': data.get('catalog_version')
         }
         try:
             order_id = db.add_order(order)
         except Exception as e:
             logger.error(f"DB error in add_order: {e}")
+            order_id = None
+        if order_id is None:
+            # Buyurtma yaratilmadi - qayta tasdiqlashga ruxsat
+            idempotency.release(order_key)
             await callback_query.message.edit_text("⚠️ <b>Serverda xatolik yuz berdi, keyinroq urinib ko‘ring!</b>",
                                                    parse_mode="HTML")
             return
@@ -571,7 +589,7 @@ async def process_confirmation(callback_query: types.CallbackQuery, state: FSMCo
         await state.update_data(message_id=msg)
 
         # Adminlarga xabar yuborish
-        for admin_id in ADMINS:
+        for admin_id in admins.ids():
             admin_text = (
                 f"🚀 <b>Yangi buyurtma!</b>\n"
                 f"📋 Buyurtma: <b>#{order_id}</b>\n"
@@ -584,13 +602,13 @@ async def process_confirmation(callback_query: types.CallbackQuery, state: FSMCo
                 f"⏳ Deadline: <i>{data['deadline']}</i>"
             )
             markup = InlineKeyboardMarkup(row_width=2).add(
-                InlineKeyboardButton("✅ Qabul", callback_data=f"accept_{order_id}"),
-                InlineKeyboardButton("❌ Rad etish", callback_data=f"reject_{order_id}")
+                InlineKeyboardButton("✅ Qabul", callback_data=cb.order_action.new("accept", order_id)),
+                InlineKeyboardButton("❌ Rad etish", callback_data=cb.order_action.new("reject", order_id))
             )
             await bot.send_message(admin_id, admin_text, reply_markup=markup, parse_mode="HTML")
 
-        # Eslatma vazifasini ishga tushirish
-        asyncio.create_task(send_reminder(order_id, user.id))
+        # Eslatmani rejalashtirish (bazada saqlanadi, restartdan keyin ham ishlaydi)
+        scheduler.schedule("reminder", REMINDER_DELAY, order_id=order_id, chat_id=user.id)
 
         # State ni tozalash va yangi buyurtma uchun tayyorlash
         await state.finish()  # Oldingi holatni tozalash
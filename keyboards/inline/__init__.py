@@ -1 +1 @@
-
+from . import admin_panel
@@ -0,0 +1,18 @@
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+
+def get_admin_panel_keyboard():
+    markup = InlineKeyboardMarkup(row_width=2)
+    markup.add(
+        InlineKeyboardButton("📋 Buyurtmalar", callback_data="view_orders"),
+        InlineKeyboardButton("👥 Foydalanuvchilar", callback_data="view_users"),
+        InlineKeyboardButton("📊 Statistika", callback_data="stats"),
+        InlineKeyboardButton("🕒 Tarix", callback_data="order_history"),
+        InlineKeyboardButton("💰 Narxlar", callback_data="manage_prices"),
+        InlineKeyboardButton("👨‍💻 Adminlar", callback_data="manage_admins"),
+        InlineKeyboardButton("📌 Navbatim", callback_data="my_queue"),
+        InlineKeyboardButton("📢 Xabar tarqatish", callback_data="broadcast"),
+        InlineKeyboardButton("🏅 Samaradorlik", callback_data="admin_perf"),
+        InlineKeyboardButton("🔎 Qidirish", switch_inline_query_current_chat="")
+    )
+    return markup
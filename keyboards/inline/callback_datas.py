@@ -0,0 +1,11 @@
+from utils.misc.callback_data import CallbackCodec
+
+# Buyurtma ustidagi amallar: accept, reject, complete, send
+order_action = CallbackCodec("o", "action", ("order_id", int))
+order_details = CallbackCodec("d", ("order_id", int))
+order_filter = CallbackCodec("f", "status")
+# Narxni tahrirlash: xizmat nomi o‘rniga katalogdagi qisqa id
+edit_price = CallbackCodec("p", ("service_id", int))
+remove_admin = CallbackCodec("ra", ("admin_id", int))
+broadcast_stop = CallbackCodec("bs", ("broadcast_id", int))
+deadline = CallbackCodec("dl", "choice")
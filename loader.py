@@ -1,19 +1,140 @@
-from aiogram import Bot, Dispatcher, types
+from aiogram import types
+from aiogram.bot.api import TelegramAPIServer, TELEGRAM_PRODUCTION
 from aiogram.contrib.fsm_storage.memory import MemoryStorage
 from dotenv import load_dotenv
 import os
 from data import config
 from utils.db_api.database import Database
+from utils.db_api.fsm_storage import SQLiteStorage, count_sessions
+from utils.db_api.profiler import profiler
+from utils.bot import MetricsBot
+from utils.metrics import MetricsServer, FSM_SESSIONS, PENDING_REMINDERS
+from utils.tracing import Tracer, JsonlSink
+from utils.recorder import UpdateRecorder, Scrubber, worker_path
+from utils.misc.cache import ChatCache
+from utils.misc.idempotency import IdempotencyGuard
+from utils.misc.logging import setup_logging
+from utils.scheduler import JobScheduler
+from utils.deadlines import DeadlineTracker
+from utils.broadcast import Broadcaster
+from utils.admins import AdminRegistry
+from utils.catalog import PriceCatalog
+from utils.order_search import OrderSearch
+from utils.order_status import OrderStateMachine
+from utils.update_queue import LaneDispatcher, UpdateScheduler
+from utils.misc.callback_data import CallbackRouter
+from utils.lifecycle import Lifecycle
+from utils.errors import ErrorAggregator
+from keyboards.inline import callback_datas
+from data.services import SERVICES, OTHER_SERVICE, MENU_TEXTS
+
+# Loglar navbat orqali alohida oqimda yoziladi (event loop faylga/stderr ga yozishni kutmaydi)
+setup_logging(
+    config.LOG_LEVEL, config.LOG_LEVELS, json_format=config.LOG_FORMAT == "json", log_file=config.LOG_FILE,
+    sample_burst=config.LOG_SAMPLE_BURST, sample_interval=config.LOG_SAMPLE_INTERVAL
+)
 
 # .env faylidan tokenni olish
 load_dotenv()
 BOT_TOKEN = os.getenv("BOT_TOKEN") or config.BOT_TOKEN
 
 # Bot va Dispatcher
-bot = Bot(token=BOT_TOKEN, parse_mode=types.ParseMode.HTML)
-storage = MemoryStorage()
-dp = Dispatcher(bot, storage=storage)
+server = TelegramAPIServer.from_base(config.BOT_API_SERVER) if config.BOT_API_SERVER else TELEGRAM_PRODUCTION
+bot = MetricsBot(token=BOT_TOKEN, parse_mode=types.ParseMode.HTML, server=server)
+# Ko‘p jarayonli rejimda FSM holatlari barcha ishchilar uchun umumiy bazada
+if config.MODE == "supervisor" or config.FSM_STORAGE == "sqlite":
+    storage = SQLiteStorage(config.FSM_DB)
+else:
+    storage = MemoryStorage()
+dp = LaneDispatcher(bot, storage=storage)
+
+# Bitta chat updatelari ketma-ket, turli chatlar parallel qayta ishlanadi
+update_scheduler = UpdateScheduler(
+    dp, workers=config.UPDATE_WORKERS, max_pending=config.UPDATE_QUEUE_SIZE, lane_size=config.CHAT_QUEUE_SIZE
+)
+dp.update_scheduler = update_scheduler
+
+# callback_query lar prefiks bo‘yicha bitta lug‘atdan tarqatiladi
+callbacks = CallbackRouter(dp)
+# Eski formatdagi (yuborilgan xabarlarda qolgan) tugmalar ham ishlashi uchun
+for _action in ("accept", "reject", "complete", "send"):
+    callbacks.alias(f"{_action}_", callback_datas.order_action, action=_action)
+callbacks.alias("details_", callback_datas.order_details)
+callbacks.alias("filter_", callback_datas.order_filter)
+callbacks.alias("remove_admin_", callback_datas.remove_admin)
+callbacks.alias("broadcast_stop_", callback_datas.broadcast_stop)
+callbacks.alias("deadline_", callback_datas.deadline)
+# edit_price_<xizmat nomi> ni id ga aylantirib bo‘lmaydi - "eskirgan tugma" javobini oladi
+
+# Adminlar ro‘yxati (barcha handlerlar uchun yagona)
+admins = AdminRegistry(config.ADMINS_FILE, default=config.ADMINS)
+
+# bot.get_chat natijalari uchun kesh (admin ekranlari uchun)
+chat_cache = ChatCache(bot)
+
+# Takroriy callback query id lari (har bir callback uchun bitta yozuv - oqim katta)
+callback_ids = IdempotencyGuard(maxsize=8192, ttl=600)
+# Buyurtma tokenlari va (buyurtma, amal) juftliklari alohida: callbacklar ularni keshdan siqib chiqarmaydi
+idempotency = IdempotencyGuard(maxsize=4096, ttl=600)
 
 # Ma’lumotlar bazasi (Users va Orders uchun yagona)
 db = Database(db_name="data/main.db")
-user_db = db  # user_db sifatida ham ishlatiladi (compatability uchun)
\ No newline at end of file
+user_db = db  # user_db sifatida ham ishlatiladi (compatability uchun)
+
+# Eslatmalar va boshqa kechiktirilgan vazifalar (bazada saqlanadi)
+# (supervisor rejimida taymer bitta ishchida, boshqalarning vazifalari bazadan o‘qiladi)
+scheduler = JobScheduler(db, poll_interval=5 if config.MODE == "supervisor" else None)
+
+# Qabul qilingan buyurtmalar muddatini kuzatish
+deadlines = DeadlineTracker(db, scheduler, bot)
+
+# Barcha foydalanuvchilarga ommaviy xabar tarqatish
+broadcaster = Broadcaster(db, bot)
+
+# Narxlar katalogi (bazada saqlanadi, versiya o‘zgarganda qayta yuklanadi)
+catalog = PriceCatalog(db, seed=SERVICES, fallback=OTHER_SERVICE)
+
+# Buyurtma holatlari o‘tishlari (bitta shartli UPDATE bilan)
+order_states = OrderStateMachine(db)
+
+# Admin inline qidiruvi (prefiks bo‘yicha qisqa muddatli kesh bilan)
+order_search = OrderSearch(db)
+
+# Tartibli to‘xtatish (SIGTERM): updatelarni kutish, buferlarni yozish, bazani yopish
+lifecycle = Lifecycle(
+    dp, scheduler=scheduler, broadcaster=broadcaster, databases=[db], drain_timeout=config.SHUTDOWN_TIMEOUT
+)
+
+# Handler xatolari tur va joy bo‘yicha guruhlanadi, adminlarga jamlangan holda yuboriladi
+errors = ErrorAggregator(
+    bot, admins, window=config.ERROR_WINDOW, samples=config.ERROR_SAMPLES,
+    digest_interval=config.ERROR_DIGEST_INTERVAL
+)
+lifecycle.add_flusher("xatolar jamlanmasi", errors.stop)
+
+# /metrics: handler, baza va Bot API vaqtlari, FSM sessiyalari va eslatmalar
+metrics_server = MetricsServer()
+FSM_SESSIONS.set_function(lambda: count_sessions(storage))
+PENDING_REMINDERS.set_function(lambda: db.count_pending_jobs("reminder"))
+lifecycle.add_flusher("metrikalar serveri", metrics_server.stop)
+
+# Update tracelari (python -m utils.tracing data/traces.jsonl - eng sekinlari)
+tracer = Tracer(
+    JsonlSink(config.TRACE_FILE), sample_rate=config.TRACE_SAMPLE_RATE, slow_threshold=config.TRACE_SLOW_THRESHOLD
+)
+lifecycle.add_flusher("tracelar", tracer.sink.close)
+
+# SQL profiler: shu chegaradan sekin so‘rovlar EXPLAIN QUERY PLAN bilan "db.slow" loggeriga
+profiler.slow_threshold = config.SLOW_QUERY_MS / 1000
+
+# Updatelarni replay uchun yozib olish (RECORD_FILE bo‘sh bo‘lsa o‘chirilgan)
+recorder = None
+if config.RECORD_FILE:
+    # Supervisor rejimida har bir ishchi o‘z fayliga yozadi (replay ularni vaqt bo‘yicha birlashtiradi)
+    record_file = worker_path(config.RECORD_FILE, os.getpid()) if config.MODE == "supervisor" else config.RECORD_FILE
+    recorder = UpdateRecorder(
+        record_file, Scrubber(
+            config.RECORD_SCRUB, salt=config.RECORD_SALT or BOT_TOKEN, keep_ids=admins.ids(), keep_texts=MENU_TEXTS
+        )
+    )
+    lifecycle.add_flusher("yozib olingan updatelar", recorder.close)
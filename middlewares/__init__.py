@@ -1,8 +1,18 @@
 from aiogram import Dispatcher
 
-from loader import dp
+from loader import dp, tracer, callback_ids, recorder as update_recorder
 from .throttling import ThrottlingMiddleware
+from .metrics import MetricsMiddleware
+from .tracing import TracingMiddleware
+from .recorder import RecorderMiddleware
+from .idempotency import IdempotencyMiddleware
 
 
 if __name__ == "middlewares":
+    # "recorder" nomi .recorder submoduli bilan band - loader dagi obyekt boshqa nom bilan olinadi
+    if update_recorder:
+        dp.middleware.setup(RecorderMiddleware(update_recorder))
+    dp.middleware.setup(IdempotencyMiddleware(callback_ids))
     dp.middleware.setup(ThrottlingMiddleware())
+    dp.middleware.setup(MetricsMiddleware())
+    dp.middleware.setup(TracingMiddleware(tracer))
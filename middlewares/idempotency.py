@@ -0,0 +1,17 @@
+from aiogram import types
+from aiogram.dispatcher.handler import CancelHandler
+from aiogram.dispatcher.middlewares import BaseMiddleware
+
+from utils.misc.idempotency import IdempotencyGuard
+
+
+class IdempotencyMiddleware(BaseMiddleware):
+    """Bir xil callback query (qayta yuborilgan yoki ikki marta ishlangan) handlergacha yetmaydi"""
+
+    def __init__(self, guard: IdempotencyGuard):
+        self.guard = guard
+        super(IdempotencyMiddleware, self).__init__()
+
+    async def on_pre_process_callback_query(self, callback_query: types.CallbackQuery, data: dict):
+        if not self.guard.claim(("callback", callback_query.id)):
+            raise CancelHandler()
@@ -0,0 +1,80 @@
+import time
+
+from aiogram import Dispatcher, types
+from aiogram.dispatcher.filters.builtin import StateFilter
+from aiogram.dispatcher.handler import current_handler
+from aiogram.dispatcher.middlewares import BaseMiddleware
+
+from utils.metrics import HANDLER_LATENCY
+
+
+_NO_STATE = object()
+
+
+async def resolve_state(data: dict):
+    """
+    Handler ishlayotgan FSM holati.
+    StateFilter raw_state ni faqat aniq holatli handlerlarda beradi (state='*' -
+    CallbackRouter, /start, /admin - da yo‘q). Aiogram shu updatega holatni
+    o‘qigan bo‘lsa, u StateFilter.ctx_state da turadi - storage qayta
+    o‘qilmaydi; o‘qilmagan bo‘lsa o‘qib, o‘sha yerga yoziladi (keyingi
+    filtrlar va middlewarelar uchun).
+    """
+    state = data.get("_fsm_state", _NO_STATE)
+    if state is not _NO_STATE:
+        return state
+    state = data.get("raw_state")
+    if state is None:
+        try:
+            state = StateFilter.ctx_state.get()
+        except LookupError:
+            context = data.get("state")
+            if context is None:
+                context = Dispatcher.get_current().current_state()
+            state = await context.get_state()
+            StateFilter.ctx_state.set(state)
+    data["_fsm_state"] = state
+    return state
+
+
+class MetricsMiddleware(BaseMiddleware):
+    """
+    Handler ishlash vaqtini handler nomi va FSM holati bo‘yicha yozish.
+    Vaqt on_process_* da belgilanadi, on_post_process_* da o‘lchanadi.
+    """
+
+    async def _start(self, data: dict, callback_data=None):
+        handler = current_handler.get()
+        router = getattr(handler, "__self__", None)
+        if callback_data is not None and hasattr(router, "handler_for"):
+            handler = router.handler_for(callback_data) or handler
+        state = await resolve_state(data)
+        data["_metrics"] = (
+            HANDLER_LATENCY.labels(getattr(handler, "__name__", "unknown"), state or "-"),
+            time.perf_counter()
+        )
+
+    @staticmethod
+    def _finish(data: dict):
+        timing = data.pop("_metrics", None)
+        if timing:
+            child, started = timing
+            child.observe(time.perf_counter() - started)
+
+    async def on_process_message(self, message: types.Message, data: dict):
+        await self._start(data)
+
+    async def on_post_process_message(self, message: types.Message, results, data: dict):
+        self._finish(data)
+
+    async def on_process_callback_query(self, callback_query: types.CallbackQuery, data: dict):
+        await self._start(data, callback_query.data)
+
+    async def on_post_process_callback_query(self, callback_query: types.CallbackQuery, results, data: dict):
+        self._finish(data)
+
+    async def on_process_inline_query(self, inline_query: types.InlineQuery, data: dict):
+        await self._start(data)
+
+    async def on_post_process_inline_query(self, inline_query: types.InlineQuery, results, data: dict):
+        self._finish(data)
@@ -0,0 +1,15 @@
+from aiogram import types
+from aiogram.dispatcher.middlewares import BaseMiddleware
+
+from utils.recorder import UpdateRecorder
+
+
+class RecorderMiddleware(BaseMiddleware):
+    """Har bir kelgan updateni (throttling va handlerlardan oldin) yozib olish"""
+
+    def __init__(self, recorder: UpdateRecorder):
+        self.recorder = recorder
+        super(RecorderMiddleware, self).__init__()
+
+    async def on_pre_process_update(self, update: types.Update, data: dict):
+        self.recorder.record(update.to_python())
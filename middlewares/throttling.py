@@ -1,37 +1,66 @@
-import asyncio
-
-from aiogram import types, Dispatcher
+from aiogram import types
 from aiogram.dispatcher import DEFAULT_RATE_LIMIT
 from aiogram.dispatcher.handler import CancelHandler, current_handler
 from aiogram.dispatcher.middlewares import BaseMiddleware
-from aiogram.utils.exceptions import Throttled
+
+from utils.misc.rate_limiter import TokenBucketLimiter
 
 
 class ThrottlingMiddleware(BaseMiddleware):
     """
-    Simple middleware
+    Token bucket middleware: xabarlar, callback va inline so‘rovlar uchun.
+
+    Har bir foydalanuvchi uchun umumiy bucket va har bir handler uchun
+    alohida bucket tekshiriladi. Handler sozlamalari rate_limit dekoratori
+    orqali beriladi.
     """
 
-    def __init__(self, limit=DEFAULT_RATE_LIMIT, key_prefix='antiflood_'):
+    def __init__(self, limit=DEFAULT_RATE_LIMIT, key_prefix='antiflood_',
+                 user_limit=0.5, user_burst=10, capacity=4096, idle_ttl=600):
         self.rate_limit = limit
         self.prefix = key_prefix
+        self.user_limit = user_limit
+        self.user_burst = user_burst
+        self.limiter = TokenBucketLimiter(capacity=capacity, idle_ttl=idle_ttl)
         super(ThrottlingMiddleware, self).__init__()
 
-    async def on_process_message(self, message: types.Message, data: dict):
+    def _handler_settings(self, event_type, data=None):
         handler = current_handler.get()
-        dispatcher = Dispatcher.get_current()
+        router = getattr(handler, "__self__", None)
+        if data is not None and hasattr(router, "handler_for"):
+            # Callbacklar CallbackRouter orqali keladi: sozlama asl handlerda
+            handler = router.handler_for(data) or handler
         if handler:
             limit = getattr(handler, "throttling_rate_limit", self.rate_limit)
             key = getattr(handler, "throttling_key", f"{self.prefix}_{handler.__name__}")
+            burst = getattr(handler, "throttling_burst", 1)
         else:
-            limit = self.rate_limit
-            key = f"{self.prefix}_message"
-        try:
-            await dispatcher.throttle(key, rate=limit)
-        except Throttled as t:
-            await self.message_throttled(message, t)
+            limit, key, burst = self.rate_limit, f"{self.prefix}_{event_type}", 1
+        return limit, key, burst
+
+    def _check(self, user_id, event_type, data=None):
+        """(ruxsat, birinchi_rad) - avval foydalanuvchi, keyin handler bucketi"""
+        allowed, first = self.limiter.consume((user_id, None), self.user_limit, self.user_burst)
+        if not allowed:
+            return allowed, first
+        limit, key, burst = self._handler_settings(event_type, data)
+        return self.limiter.consume((user_id, key), limit, burst)
+
+    async def on_process_message(self, message: types.Message, data: dict):
+        allowed, first = self._check(message.from_user.id, "message")
+        if not allowed:
+            if first:
+                await message.reply("Too many requests!")
             raise CancelHandler()
 
-    async def message_throttled(self, message: types.Message, throttled: Throttled):
-        if throttled.exceeded_count <= 2:
-            await message.reply("Too many requests!")
+    async def on_process_callback_query(self, callback_query: types.CallbackQuery, data: dict):
+        allowed, first = self._check(callback_query.from_user.id, "callback_query", callback_query.data)
+        if not allowed:
+            # Tugma "yuklanmoqda" holatida qolmasligi uchun har doim javob beriladi
+            await callback_query.answer("⏳ Juda tez! Biroz kuting." if first else None)
+            raise CancelHandler()
+
+    async def on_process_inline_query(self, inline_query: types.InlineQuery, data: dict):
+        allowed, _ = self._check(inline_query.from_user.id, "inline_query")
+        if not allowed:
+            raise CancelHandler()
@@ -0,0 +1,79 @@
+import time
+
+from aiogram import types
+from aiogram.dispatcher.handler import current_handler
+from aiogram.dispatcher.middlewares import BaseMiddleware
+
+from utils.tracing import Tracer, add_span, current_trace
+from .metrics import resolve_state
+
+
+class TracingMiddleware(BaseMiddleware):
+    """
+    Har bir updatega trace ochadi. Middleware (handlergacha bo‘lgan vaqt) va
+    handler spanlari shu yerda, baza va Bot API spanlari esa o‘z joylarida
+    contextvars orqali shu tracega yoziladi.
+    """
+
+    def __init__(self, tracer: Tracer):
+        self.tracer = tracer
+        super(TracingMiddleware, self).__init__()
+
+    async def on_pre_process_update(self, update: types.Update, data: dict):
+        event_type, user = self._describe(update)
+        data["_trace"] = self.tracer.start(
+            update.update_id, type=event_type, user_id=user.id if user else None
+        )
+
+    async def on_post_process_update(self, update: types.Update, results, data: dict):
+        trace = data.pop("_trace", None)
+        if trace:
+            self.tracer.finish(*trace)
+
+    @staticmethod
+    def _describe(update: types.Update):
+        for event_type in ("message", "edited_message", "callback_query", "inline_query", "chosen_inline_result"):
+            event = getattr(update, event_type)
+            if event:
+                return event_type, event.from_user
+        return "other", None
+
+    @staticmethod
+    async def _handler_started(data: dict, callback_data=None):
+        trace = current_trace()
+        if trace is None:
+            return
+        # Holat o‘qilishi middleware vaqtiga kiradi
+        state = await resolve_state(data)
+        now = time.perf_counter()
+        add_span("middleware", "pre_handler", trace.started, now - trace.started)
+        handler = current_handler.get()
+        router = getattr(handler, "__self__", None)
+        if callback_data is not None and hasattr(router, "handler_for"):
+            handler = router.handler_for(callback_data) or handler
+        data["_trace_handler"] = (getattr(handler, "__name__", "unknown"), state, now)
+
+    @staticmethod
+    def _handler_finished(data: dict):
+        started = data.pop("_trace_handler", None)
+        if started:
+            name, state, at = started
+            add_span("handler", name, at, time.perf_counter() - at, state=state)
+
+    async def on_process_message(self, message: types.Message, data: dict):
+        await self._handler_started(data)
+
+    async def on_post_process_message(self, message: types.Message, results, data: dict):
+        self._handler_finished(data)
+
+    async def on_process_callback_query(self, callback_query: types.CallbackQuery, data: dict):
+        await self._handler_started(data, callback_query.data)
+
+    async def on_post_process_callback_query(self, callback_query: types.CallbackQuery, results, data: dict):
+        self._handler_finished(data)
+
+    async def on_process_inline_query(self, inline_query: types.InlineQuery, data: dict):
+        await self._handler_started(data)
+
+    async def on_post_process_inline_query(self, inline_query: types.InlineQuery, results, data: dict):
+        self._handler_finished(data)
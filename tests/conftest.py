@@ -0,0 +1,13 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# data.config import paytida o‘qiladi - testlar haqiqiy token va tarmoqsiz ishlaydi
+os.environ.setdefault("BOT_TOKEN", "123456:test")
+os.environ.setdefault("METRICS_PORT", "0")
+# loader bazalar va fayllarni nisbiy yo‘llar bilan ochadi
+os.chdir(tempfile.mkdtemp(prefix="bot-tests-"))
+os.makedirs("data", exist_ok=True)
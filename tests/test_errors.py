@@ -0,0 +1,48 @@
+import asyncio
+
+from aiohttp import web
+from aiogram.bot.api import TelegramAPIServer
+from aiogram.utils.exceptions import TelegramAPIError
+
+from utils.bot import MetricsBot
+from utils.errors import fingerprint
+
+
+async def failing_api(request):
+    return web.json_response({"ok": False, "error_code": 400, "description": "Bad Request: chat not found"}, status=400)
+
+
+async def send_receipt(bot):
+    await bot.send_message(1, "chek")
+
+
+async def send_reminder(bot):
+    await bot.send_message(1, "eslatma")
+
+
+def test_bot_api_errors_grouped_by_calling_handler():
+    async def scenario():
+        app = web.Application()
+        app.router.add_route("*", "/bot{token}/{method}", failing_api)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", 0).start()
+        host, port = runner.addresses[0][:2]
+        bot = MetricsBot("123456:test", server=TelegramAPIServer.from_base(f"http://{host}:{port}"))
+        fingerprints = []
+        try:
+            for handler in (send_receipt, send_reminder, send_receipt):
+                try:
+                    await handler(bot)
+                except TelegramAPIError as e:
+                    fingerprints.append(fingerprint(e))
+        finally:
+            await (await bot.get_session()).close()
+            await runner.cleanup()
+        return fingerprints
+
+    receipt, reminder, receipt_again = asyncio.run(scenario())
+    assert receipt[0] == receipt_again[0]
+    assert receipt[0] != reminder[0]
+    assert "send_receipt" in receipt[2] and "send_reminder" in reminder[2]
+    assert "utils/bot.py" not in receipt[2]
@@ -0,0 +1,63 @@
+import asyncio
+
+from aiogram import Bot, types
+from aiogram.contrib.fsm_storage.memory import MemoryStorage
+
+from middlewares.metrics import MetricsMiddleware
+from utils.update_queue import LaneDispatcher, UpdateScheduler
+from test_update_queue import make_update
+
+
+class CountingStorage(MemoryStorage):
+    def __init__(self):
+        super().__init__()
+        self.reads = 0
+
+    async def get_state(self, *, chat=None, user=None, default=None):
+        self.reads += 1
+        return await super().get_state(chat=chat, user=user, default=default)
+
+
+def run_updates(register):
+    async def scenario():
+        storage = CountingStorage()
+        dp = LaneDispatcher(Bot("123456:test"), storage=storage)
+        dp.middleware.setup(MetricsMiddleware())
+        await storage.set_state(chat=10, user=10, state="Wizard:subject")
+        states = []
+        register(dp, states)
+        scheduler = UpdateScheduler(dp, workers=1)
+        dp.update_scheduler = scheduler
+        await dp.process_updates([make_update(1, 10)])
+        assert await scheduler.join(5)
+        await scheduler.stop()
+        return storage.reads, states
+
+    return asyncio.run(scenario())
+
+
+def test_state_read_once_per_update():
+    def register(dp, states):
+        @dp.message_handler(commands=["help"])
+        async def help_command(message: types.Message):
+            pass
+
+        @dp.message_handler(state="*")
+        async def any_state(message: types.Message, state):
+            states.append(await state.get_state())
+
+    reads, states = run_updates(register)
+    # help_command filtri holatni o‘qiydi, middleware uni qayta ishlatadi (+ handlerning o‘zi)
+    assert states == ["Wizard:subject"]
+    assert reads == 2
+
+
+def test_state_read_when_aiogram_did_not():
+    def register(dp, states):
+        @dp.message_handler(state="*")
+        async def any_state(message: types.Message):
+            states.append("handled")
+
+    reads, states = run_updates(register)
+    assert states == ["handled"]
+    assert reads == 1
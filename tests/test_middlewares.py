@@ -0,0 +1,60 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# loader konfiguratsiyani import paytida o‘qiydi - har bir holat alohida jarayonda
+SCRIPT = """
+import asyncio, json
+from aiogram import Bot, Dispatcher, types
+import loader, middlewares
+from middlewares.recorder import RecorderMiddleware
+
+installed = [m for m in loader.dp.middleware.applications if isinstance(m, RecorderMiddleware)]
+
+async def main():
+    Bot.set_current(loader.bot)
+    Dispatcher.set_current(loader.dp)
+    update = types.Update(**{"update_id": 1, "message": {
+        "message_id": 1, "date": 0, "chat": {"id": 10, "type": "private"},
+        "from": {"id": 10, "is_bot": False, "first_name": "Test"}, "text": "salom"}})
+    await loader.dp.updates_handler.notify(update)
+    if loader.recorder:
+        loader.recorder.close()
+    session = await loader.bot.get_session()
+    await session.close()
+
+asyncio.run(main())
+print(json.dumps({"installed": len(installed), "recorder": loader.recorder is not None}))
+"""
+
+
+def run_bot_script(record_file):
+    workdir = tempfile.mkdtemp(prefix="bot-middlewares-")
+    os.makedirs(os.path.join(workdir, "data"))
+    env = dict(
+        os.environ, PYTHONPATH=ROOT, BOT_TOKEN="123456:test", METRICS_PORT="0", RECORD_FILE=record_file,
+        BOT_API_SERVER="http://127.0.0.1:9",
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", SCRIPT], cwd=workdir, env=env, capture_output=True, text=True, timeout=60
+    )
+    assert output.returncode == 0, output.stderr
+    return json.loads(output.stdout.strip().splitlines()[-1]), workdir
+
+
+def test_recorder_not_installed_without_record_file():
+    result, _ = run_bot_script("")
+    assert result == {"installed": 0, "recorder": False}
+
+
+def test_recorder_records_updates_with_record_file():
+    from utils.recorder import read_recording
+
+    result, workdir = run_bot_script("data/updates.jsonl.gz")
+    assert result == {"installed": 1, "recorder": True}
+    records = read_recording(os.path.join(workdir, "data", "updates.jsonl.gz"))
+    assert [record["update"]["update_id"] for record in records] == [1]
@@ -0,0 +1,89 @@
+import random
+import sqlite3
+from datetime import timedelta
+
+from utils.db_api.database import Database, local_now
+
+# Jamlanmalardan oldingi sxema (ustunlar va jadvallar migratsiyada qo‘shiladi)
+LEGACY_SCHEMA = """
+CREATE TABLE Users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    telegram_id BIGINT NOT NULL UNIQUE,
+    username VARCHAR(255) NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    last_active DATETIME NULL
+);
+CREATE TABLE Orders (
+    order_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id BIGINT, user TEXT, username TEXT, phone TEXT,
+    service TEXT NOT NULL, subject TEXT NOT NULL, pages INTEGER NOT NULL, price INTEGER NOT NULL,
+    total_price INTEGER NOT NULL, deadline TEXT NOT NULL, status TEXT DEFAULT 'Jarayonda',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP, confirmed_by_admin_id BIGINT,
+    FOREIGN KEY (user_id) REFERENCES Users(telegram_id)
+);
+"""
+STATUSES = ("Jarayonda", "Qabul qilindi", "Bajarildi", "Rad etildi")
+SERVICES = ("📑 Mustaqil ish", "📜 Referat")
+
+
+def legacy_stats(conn):
+    """Jamlanmalargacha Orders dan hisoblangan raqamlar (Qabul qilingan - keyin bajarilganlari bilan)"""
+    def one(sql):
+        return conn.execute(sql).fetchone()
+
+    accepted = "status IN ('Qabul qilindi', 'Bajarildi')"
+    return {
+        "total": one("SELECT COUNT(*) FROM Orders")[0],
+        "accepted": one(f"SELECT COUNT(*) FROM Orders WHERE {accepted}")[0],
+        "income": one(f"SELECT COALESCE(SUM(total_price), 0) FROM Orders WHERE {accepted}")[0],
+        "completed": one("SELECT COUNT(*) FROM Orders WHERE status = 'Bajarildi'")[0],
+        "rejected": one("SELECT COUNT(*) FROM Orders WHERE status = 'Rad etildi'")[0],
+    }
+
+
+def rollup_stats(db):
+    """show_stats ishlatadigan raqamlar"""
+    totals = db.get_status_totals()
+    return {
+        "total": totals.get("Jarayonda", (0, 0))[0],
+        "accepted": totals.get("Qabul qilindi", (0, 0))[0],
+        "income": totals.get("Qabul qilindi", (0, 0))[1],
+        "completed": totals.get("Bajarildi", (0, 0))[0],
+        "rejected": totals.get("Rad etildi", (0, 0))[0],
+    }
+
+
+def test_backfilled_rollups_match_order_queries(tmp_path):
+    path = str(tmp_path / "main.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    rng = random.Random(1)
+    now = local_now() - timedelta(hours=5)  # created_at - UTC
+    for i in range(300):
+        created = now - timedelta(days=rng.randrange(90), minutes=rng.randrange(1440))
+        conn.execute(
+            "INSERT INTO Orders (user_id, user, username, phone, service, subject, pages, price, total_price, "
+            "deadline, status, created_at, confirmed_by_admin_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (i, f"User {i}", f"user{i}", None, rng.choice(SERVICES), "Mavzu", 10, 2000, rng.randrange(1, 50) * 1000,
+             "01.01.2030", rng.choice(STATUSES), created.strftime("%Y-%m-%d %H:%M:%S"), 1)
+        )
+    conn.commit()
+    expected = legacy_stats(conn)
+    conn.close()
+
+    db = Database(db_name=path)
+    assert rollup_stats(db) == expected
+    daily = db.get_daily_totals("Qabul qilindi", 120)
+    assert sum(orders for orders, _ in daily.values()) == expected["accepted"]
+    assert sum(revenue for _, revenue in daily.values()) == expected["income"]
+
+    # Jonli o‘tishlar ham xuddi shu raqamlarni beradi
+    order_id = db.add_order({
+        "user_id": 1, "user": "User 1", "username": "user1", "phone": None, "service": SERVICES[0],
+        "subject": "Mavzu", "pages": 10, "price": 2000, "total_price": 20000, "deadline": "01.01.2030",
+        "status": "Jarayonda",
+    })
+    db.transition_order_status(order_id, "Jarayonda", "Qabul qilindi", confirmed_by_admin_id=7)
+    db.transition_order_status(order_id, "Qabul qilindi", "Bajarildi", owner_id=7)
+    assert rollup_stats(db) == legacy_stats(db.conn)
+    db.close()
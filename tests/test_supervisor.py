@@ -0,0 +1,23 @@
+import time
+
+from aiogram import Bot
+
+from utils.supervisor import Supervisor
+
+
+def test_shutdown_does_not_block_on_full_queue():
+    supervisor = Supervisor(Bot("123456:test"), target=None, workers=2, queue_size=1)
+    # #0 - navbati to‘la va osilib qolgan ishchi, #1 - allaqachon to‘xtagan ishchi
+    hung = supervisor._ctx.Process(target=time.sleep, args=(60,))
+    hung.start()
+    dead = supervisor._ctx.Process(target=time.sleep, args=(0,))
+    dead.start()
+    dead.join()
+    supervisor._processes = [hung, dead]
+    for queue in supervisor._queues:
+        queue.put([{"update_id": 1}])
+
+    started = time.monotonic()
+    supervisor._shutdown(timeout=10, put_timeout=0.5)
+    assert time.monotonic() - started < 5
+    assert not hung.is_alive()
@@ -0,0 +1,44 @@
+import asyncio
+
+from aiogram import Bot, types
+
+from middlewares.tracing import TracingMiddleware
+from utils.tracing import Tracer
+from utils.update_queue import LaneDispatcher, UpdateScheduler
+from test_update_queue import make_update
+
+
+class ListSink:
+    def __init__(self):
+        self.records = []
+
+    def write(self, record):
+        self.records.append(record)
+
+
+def test_update_trace_through_scheduler():
+    sink = ListSink()
+
+    async def scenario():
+        dp = LaneDispatcher(Bot("123456:test"))
+        dp.middleware.setup(TracingMiddleware(Tracer(sink, sample_rate=1)))
+
+        @dp.message_handler()
+        async def echo(message: types.Message):
+            await asyncio.sleep(0)
+
+        scheduler = UpdateScheduler(dp, workers=1)
+        dp.update_scheduler = scheduler
+        await dp.process_updates([make_update(7, 10)])
+        assert await scheduler.join(5)
+        await scheduler.stop()
+
+    asyncio.run(scenario())
+    assert len(sink.records) == 1
+    trace = sink.records[0]
+    assert trace["update_id"] == 7
+    assert trace["type"] == "message"
+    assert trace["user_id"] == 10
+    spans = {(span["kind"], span["name"]) for span in trace["spans"]}
+    assert ("middleware", "pre_handler") in spans
+    assert ("handler", "echo") in spans
@@ -0,0 +1,105 @@
+import asyncio
+
+from aiogram import Bot, types
+from aiogram.dispatcher.middlewares import BaseMiddleware
+
+from utils.update_queue import LaneDispatcher, UpdateScheduler
+
+
+def make_update(update_id, chat_id, text="salom"):
+    user = {"id": chat_id, "is_bot": False, "first_name": "Test"}
+    return types.Update(**{"update_id": update_id, "message": {
+        "message_id": update_id, "date": 0, "chat": {"id": chat_id, "type": "private"}, "from": user, "text": text,
+    }})
+
+
+class UpdateHooks(BaseMiddleware):
+    def __init__(self):
+        self.events = []
+        super(UpdateHooks, self).__init__()
+
+    async def on_pre_process_update(self, update: types.Update, data: dict):
+        self.events.append(("pre", update.update_id))
+
+    async def on_post_process_update(self, update: types.Update, results, data: dict):
+        self.events.append(("post", update.update_id))
+
+
+def test_scheduler_runs_update_middlewares():
+    async def scenario():
+        dp = LaneDispatcher(Bot("123456:test"))
+        hooks = UpdateHooks()
+        dp.middleware.setup(hooks)
+        handled = []
+
+        @dp.message_handler()
+        async def echo(message: types.Message):
+            handled.append(message.message_id)
+
+        scheduler = UpdateScheduler(dp, workers=2)
+        dp.update_scheduler = scheduler
+        await dp.process_updates([make_update(1, 10), make_update(2, 20)])
+        assert await scheduler.join(5)
+        await scheduler.stop()
+        return hooks.events, handled
+
+    events, handled = asyncio.run(scenario())
+    assert sorted(handled) == [1, 2]
+    assert sorted(events) == [("post", 1), ("post", 2), ("pre", 1), ("pre", 2)]
+
+
+def test_full_lane_waits_instead_of_dropping():
+    async def scenario():
+        dp = LaneDispatcher(Bot("123456:test"))
+        release = asyncio.Event()
+        handled = []
+
+        @dp.message_handler()
+        async def slow(message: types.Message):
+            await release.wait()
+            handled.append(message.message_id)
+
+        scheduler = UpdateScheduler(dp, workers=2, lane_size=2)
+        assert await scheduler.submit(make_update(1, 10))
+        assert await scheduler.submit(make_update(2, 10))
+        blocked = asyncio.ensure_future(scheduler.submit(make_update(3, 10)))
+        await asyncio.sleep(0.05)
+        # Boshqa chat navbati to‘lgan chatni kutmaydi
+        assert await scheduler.submit(make_update(4, 20))
+        assert not blocked.done()
+        release.set()
+        assert await blocked
+        assert await scheduler.join(5)
+        await scheduler.stop()
+        return handled
+
+    handled = asyncio.run(scenario())
+    assert [i for i in handled if i != 4] == [1, 2, 3]
+    assert sorted(handled) == [1, 2, 3, 4]
+
+
+def test_fsm_state_does_not_leak_between_chats():
+    from aiogram.contrib.fsm_storage.memory import MemoryStorage
+
+    async def scenario():
+        dp = LaneDispatcher(Bot("123456:test"), storage=MemoryStorage())
+        await dp.storage.set_state(chat=10, user=10, state="Wizard:subject")
+        handled = []
+
+        @dp.message_handler(state="Wizard:subject")
+        async def subject(message: types.Message):
+            handled.append(("subject", message.chat.id))
+
+        @dp.message_handler()
+        async def idle(message: types.Message):
+            handled.append(("idle", message.chat.id))
+
+        # Bitta ishchi ikkala chatni ketma-ket qayta ishlaydi
+        scheduler = UpdateScheduler(dp, workers=1)
+        dp.update_scheduler = scheduler
+        await dp.process_updates([make_update(1, 10), make_update(2, 20)])
+        assert await scheduler.join(5)
+        await scheduler.stop()
+        return handled
+
+    assert asyncio.run(scenario()) == [("subject", 10), ("idle", 20)]
@@ -0,0 +1,28 @@
+import asyncio
+
+from aiogram import Bot, types
+
+from utils.update_queue import LaneDispatcher
+from utils.webhook import WebhookServer
+from test_update_queue import UpdateHooks, make_update
+
+
+def test_webhook_runs_update_middlewares():
+    async def scenario():
+        dp = LaneDispatcher(Bot("123456:test"))
+        hooks = UpdateHooks()
+        dp.middleware.setup(hooks)
+        handled = []
+
+        @dp.message_handler()
+        async def echo(message: types.Message):
+            handled.append(message.message_id)
+
+        server = WebhookServer(dp)
+        await server.submit(make_update(1, 10))
+        await server.wait_pending(5)
+        return hooks.events, handled
+
+    events, handled = asyncio.run(scenario())
+    assert handled == [1]
+    assert events == [("pre", 1), ("post", 1)]
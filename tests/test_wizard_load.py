@@ -0,0 +1,17 @@
+import argparse
+import asyncio
+import shutil
+
+from benchmarks.wizard_load import run
+
+
+def test_bot_completes_wizard_against_fake_api():
+    args = argparse.Namespace(
+        users=1, admins=1, mode="polling", workers=1, think=0.0, ramp=0.0, admin_delay=0.1,
+        api_latency=0.0, timeout=20, startup_timeout=60, port=0,
+    )
+    result = asyncio.run(run(args))
+    shutil.rmtree(result["workdir"], ignore_errors=True)
+    assert result["failures"] == {}
+    assert result["confirmed"] == 1
+    assert result["accepted"] == 1
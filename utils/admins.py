@@ -0,0 +1,111 @@
+import json
+import logging
+import os
+import tempfile
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class AdminRegistry:
+    """
+    Adminlar ro‘yxati (admins.json).
+
+    Ro‘yxat xotirada set sifatida turadi, fayl faqat o‘zgarganda (mtime
+    bo‘yicha) qayta o‘qiladi. Yozish vaqtinchalik fayl + rename orqali
+    atomar bajariladi.
+    """
+
+    def __init__(self, path="admins.json", default=(), check_interval=5):
+        self.path = path
+        self.default = [str(admin_id) for admin_id in default]
+        self.check_interval = check_interval
+        self._ids = []
+        self._set = set()
+        self._mtime = None
+        self._checked_at = 0
+        self._load(force=True)
+
+    def is_admin(self, user_id):
+        """Foydalanuvchi adminmi (O(1) tekshiruv)"""
+        self._refresh()
+        return str(user_id) in self._set
+
+    def __contains__(self, user_id):
+        return self.is_admin(user_id)
+
+    def ids(self):
+        """Adminlar ID lari (qo‘shilgan tartibda)"""
+        self._refresh()
+        return list(self._ids)
+
+    def __iter__(self):
+        return iter(self.ids())
+
+    def __len__(self):
+        self._refresh()
+        return len(self._ids)
+
+    def add(self, user_id):
+        """Admin qo‘shish, allaqachon admin bo‘lsa False"""
+        self._load()
+        user_id = str(user_id)
+        if user_id in self._set:
+            return False
+        self._save(self._ids + [user_id])
+        return True
+
+    def remove(self, user_id):
+        """Adminni o‘chirish, ro‘yxatda bo‘lmasa False"""
+        self._load()
+        user_id = str(user_id)
+        if user_id not in self._set:
+            return False
+        self._save([admin_id for admin_id in self._ids if admin_id != user_id])
+        return True
+
+    def _refresh(self):
+        # Faylni har safar emas, check_interval da bir marta tekshiramiz
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self._load()
+
+    def _load(self, force=False):
+        self._checked_at = time.monotonic()
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._mtime and not force:
+            return
+        if mtime is None:
+            ids = self.default
+        else:
+            try:
+                with open(self.path, "r") as f:
+                    ids = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error(f"{self.path} faylini o‘qishda xato: {e}")
+                return
+        self._set_ids(ids)
+        self._mtime = mtime
+
+    def _save(self, ids):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".admins_", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(ids, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._set_ids(ids)
+        self._mtime = os.stat(self.path).st_mtime_ns
+
+    def _set_ids(self, ids):
+        self._ids = [str(admin_id) for admin_id in ids]
+        self._set = set(self._ids)
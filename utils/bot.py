@@ -0,0 +1,27 @@
+import time
+
+from aiogram import Bot
+
+from utils.metrics import API_LATENCY, API_ERRORS
+from utils.tracing import add_span
+
+
+class MetricsBot(Bot):
+    """Har bir Bot API so‘rovi vaqti va xatolarini metrikalarga (va tracega) yozuvchi Bot"""
+
+    async def request(self, method, data=None, files=None, **kwargs):
+        started = time.perf_counter()
+        error = None
+        try:
+            return await super().request(method, data, files, **kwargs)
+        except Exception as e:
+            error = type(e).__name__
+            API_ERRORS.labels(method, error).inc()
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            API_LATENCY.labels(method).observe(duration)
+            if error:
+                add_span("api", method, started, duration, error=error)
+            else:
+                add_span("api", method, started, duration)
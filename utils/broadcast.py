@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import time
+
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram.utils.exceptions import Unauthorized, RetryAfter, MessageNotModified, TelegramAPIError
+
+from keyboards.inline.callback_datas import broadcast_stop
+
+logger = logging.getLogger(__name__)
+
+
+class Broadcaster:
+    """
+    Barcha foydalanuvchilarga ommaviy xabar tarqatish.
+
+    Qabul qiluvchilar Users jadvalidan id bo‘yicha sahifalab olinadi, har
+    bir yuborishdan keyin holat Broadcasts jadvaliga yoziladi. Bot qayta ishga
+    tushsa, tarqatish oxirgi saqlangan joydan davom etadi.
+    """
+
+    def __init__(self, db, bot, rate=25, batch_size=25, progress_interval=5):
+        self.db = db
+        self.bot = bot
+        self.interval = 1 / rate  # Telegram: ~30 xabar/soniya umumiy limit
+        self.batch_size = batch_size
+        self.progress_interval = progress_interval
+        self._next_send = 0
+        self._tasks = {}
+
+    async def start(self, admin_id, text):
+        """Yangi tarqatishni boshlash, holat xabari adminga yuboriladi"""
+        broadcast_id = self.db.create_broadcast(admin_id, text)
+        if broadcast_id is None:
+            return None
+        msg = await self.bot.send_message(
+            admin_id, self._progress_text(broadcast_id, 0, 0, 0, "running"),
+            reply_markup=self._stop_markup(broadcast_id), parse_mode="HTML"
+        )
+        self.db.update_broadcast(broadcast_id, message_id=msg.message_id)
+        self._spawn(broadcast_id)
+        return broadcast_id
+
+    def resume(self):
+        """Tugallanmagan tarqatishlarni davom ettirish"""
+        for broadcast_id in self.db.get_running_broadcasts():
+            logger.info("Ommaviy xabar #%s davom ettirilmoqda.", broadcast_id)
+            self._spawn(broadcast_id)
+
+    def stop(self, broadcast_id):
+        """Tarqatishni to‘xtatish"""
+        self.db.update_broadcast(broadcast_id, status="cancelled")
+        task = self._tasks.get(broadcast_id)
+        if task:
+            task.cancel()
+
+    async def pause(self):
+        """Barcha tarqatishlarni to‘xtatib turish: holat saqlanadi, resume() davom ettiradi"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return len(tasks)
+
+    def _spawn(self, broadcast_id):
+        if broadcast_id not in self._tasks:
+            task = asyncio.ensure_future(self._run(broadcast_id))
+            task.add_done_callback(lambda _: self._tasks.pop(broadcast_id, None))
+            self._tasks[broadcast_id] = task
+
+    async def _throttle(self):
+        # Barcha tarqatishlar uchun umumiy tezlik cheklovi
+        now = time.monotonic()
+        if self._next_send > now:
+            await asyncio.sleep(self._next_send - now)
+        self._next_send = max(now, self._next_send) + self.interval
+
+    async def _send(self, chat_id, text):
+        """Xabar yuborish: 'sent', 'blocked' yoki 'failed' qaytaradi"""
+        for _ in range(3):
+            await self._throttle()
+            try:
+                await self.bot.send_message(chat_id, text, parse_mode="HTML")
+                return "sent"
+            except RetryAfter as e:
+                logger.warning(f"RetryAfter: {e.timeout} soniya kutilmoqda.")
+                await asyncio.sleep(e.timeout)
+            except Unauthorized:
+                self.db.deactivate_user(chat_id)
+                return "blocked"
+            except TelegramAPIError as e:
+                logger.error(f"{chat_id} ga ommaviy xabar yuborishda xato: {e}")
+                return "failed"
+        return "failed"
+
+    async def _run(self, broadcast_id):
+        row = self.db.get_broadcast(broadcast_id)
+        if not row:
+            return
+        _, admin_id, message_id, text, last_user_id, sent, failed, blocked, status = row
+        counters = {"sent": sent, "failed": failed, "blocked": blocked}
+        last_report = 0
+        try:
+            while True:
+                users = self.db.get_active_users_after(last_user_id, self.batch_size)
+                if not users:
+                    status = "done"
+                    break
+                for user_pk, telegram_id in users:
+                    counters[await self._send(telegram_id, text)] += 1
+                    last_user_id = user_pk
+                    # Har bir yuborishdan keyin checkpoint: jarayon to‘satdan to‘xtasa ko‘pi bilan
+                    # bitta foydalanuvchi xabarni qayta oladi (butun sahifa emas)
+                    self.db.update_broadcast(broadcast_id, last_user_id=last_user_id, **counters)
+                current = self.db.get_broadcast(broadcast_id)
+                if current and current[8] == "cancelled":
+                    # Boshqa jarayonda (worker) to‘xtatilgan
+                    status = "cancelled"
+                    break
+                if time.monotonic() - last_report >= self.progress_interval:
+                    last_report = time.monotonic()
+                    await self._report(broadcast_id, admin_id, message_id, counters, status)
+        except asyncio.CancelledError:
+            # To‘xtatilganda ham oxirgi holatni saqlaymiz
+            self.db.update_broadcast(broadcast_id, last_user_id=last_user_id, **counters)
+            status = self.db.get_broadcast(broadcast_id)[8]
+            await self._report(broadcast_id, admin_id, message_id, counters, status)
+            raise
+        self.db.update_broadcast(broadcast_id, status=status)
+        await self._report(broadcast_id, admin_id, message_id, counters, status)
+        logger.info("Ommaviy xabar #%s yakunlandi: %s", broadcast_id, counters)
+
+    async def _report(self, broadcast_id, admin_id, message_id, counters, status):
+        if not message_id:
+            return
+        text = self._progress_text(broadcast_id, counters["sent"], counters["blocked"], counters["failed"], status)
+        markup = self._stop_markup(broadcast_id) if status == "running" else None
+        try:
+            await self.bot.edit_message_text(text, admin_id, message_id, reply_markup=markup, parse_mode="HTML")
+        except MessageNotModified:
+            pass
+        except TelegramAPIError as e:
+            logger.error(f"Ommaviy xabar #{broadcast_id} holatini yangilashda xato: {e}")
+
+    def _progress_text(self, broadcast_id, sent, blocked, failed, status):
+        title = {
+            "running": "⏳ Yuborilmoqda...",
+            "done": "✅ Yakunlandi",
+            "cancelled": "⛔️ To‘xtatildi",
+        }.get(status, status)
+        return (
+            f"📢 <b>Ommaviy xabar #{broadcast_id}</b> - <i>{title}</i>\n"
+            f"✅ Yuborildi: {sent}\n"
+            f"🚫 Bloklagan: {blocked}\n"
+            f"⚠️ Xato: {failed}\n"
+            f"👥 Faol foydalanuvchilar: {self.db.count_active_users()}"
+        )
+
+    @staticmethod
+    def _stop_markup(broadcast_id):
+        return InlineKeyboardMarkup().add(
+            InlineKeyboardButton("⛔️ To‘xtatish", callback_data=broadcast_stop.new(broadcast_id))
+        )
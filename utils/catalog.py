@@ -0,0 +1,81 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class PriceCatalog:
+    """
+    Narxlar katalogi.
+
+    Narxlar Services jadvalida, versiya esa CatalogVersion jadvalida
+    saqlanadi. Har bir jarayon katalog nusxasini xotirada tutadi va
+    versiya o‘zgargandagina uni bazadan qayta yuklaydi.
+    """
+
+    def __init__(self, db, seed=None, fallback=None, check_interval=2):
+        self.db = db
+        self.fallback = fallback
+        self.check_interval = check_interval
+        self._version = None
+        self._services = {}
+        self._names = {}  # qisqa id (callback_data uchun) -> nom
+        self._checked_at = 0
+        if seed:
+            db.seed_services(seed)
+        self.refresh(force=True)
+
+    @property
+    def version(self):
+        self.refresh()
+        return self._version
+
+    def refresh(self, force=False):
+        """Versiya o‘zgargan bo‘lsa katalogni qayta yuklash"""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        version = self.db.get_catalog_version()
+        if version is None or (version == self._version and not force):
+            return
+        version, rows = self.db.get_services()
+        if version is None:
+            return
+        self._services = {
+            name: {"id": service_id, "price": price, "min_pages": min_pages, "description": description}
+            for service_id, name, price, min_pages, description in rows
+        }
+        self._names = {service_id: name for service_id, name, *_ in rows}
+        self._version = version
+        logger.info("Narxlar katalogi yuklandi (v%s).", version)
+
+    def lookup(self, name):
+        """Xizmat ma'lumoti va katalog versiyasi; katalogda yo‘q bo‘lsa fallback yozuvi"""
+        self.refresh()
+        info = self._services.get(name) or self._services.get(self.fallback)
+        return info, self._version
+
+    def get(self, name):
+        """Xizmat ma'lumoti (katalogda bo‘lmasa None)"""
+        self.refresh()
+        return self._services.get(name)
+
+    def name_by_id(self, service_id):
+        """Qisqa id bo‘yicha xizmat nomi (topilmasa None)"""
+        self.refresh()
+        return self._names.get(service_id)
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def items(self):
+        self.refresh()
+        return list(self._services.items())
+
+    def set_price(self, name, price):
+        """Narxni bazada o‘zgartirish, yangi versiyani qaytaradi (xizmat topilmasa None)"""
+        version = self.db.set_service_price(name, price)
+        if version is not None:
+            self.refresh(force=True)
+        return version
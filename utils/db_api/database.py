@@ -1,16 +1,69 @@
 import sqlite3
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+
+from utils.metrics import DB_LATENCY, instrument_methods
+from utils.db_api.profiler import ProfilingConnection
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+TASHKENT_UTC_OFFSET = 5 * 60 * 60  # Asia/Tashkent (UTC+5, yozgi vaqtsiz)
+
+# Admin javob vaqtlari gistogrammasi chegaralari (soniya); oxirgisi - qolgan hammasi
+LATENCY_BUCKETS = (
+    60, 5 * 60, 15 * 60, 30 * 60, 60 * 60, 2 * 3600, 4 * 3600, 8 * 3600, 12 * 3600,
+    24 * 3600, 2 * 86400, 3 * 86400, 7 * 86400, 14 * 86400, 10 ** 9
+)
+
+
+def deadline_to_timestamp(deadline):
+    """DD.MM.YYYY muddatini o‘sha kun oxiriga (Toshkent vaqti) mos unix vaqtga o‘tkazish"""
+    day = datetime.strptime(deadline, "%d.%m.%Y").replace(tzinfo=timezone.utc)
+    return int(day.timestamp()) + 24 * 60 * 60 - TASHKENT_UTC_OFFSET
+
+
+def histogram_median(counts):
+    """Gistogrammadan ({chegara: soni}) medianani taxminiy hisoblash (soniya)"""
+    total = sum(counts.values())
+    if not total:
+        return None
+    half = total / 2
+    seen = 0
+    lower = 0
+    for bound in LATENCY_BUCKETS:
+        count = counts.get(bound, 0)
+        if count and seen + count >= half:
+            if bound == LATENCY_BUCKETS[-1]:
+                return lower
+            return lower + (bound - lower) * (half - seen) / count
+        seen += count
+        lower = bound
+    return lower
+
+
+def search_terms(order_id, user, username):
+    """Buyurtmani qidirish uchun kalit so‘zlar: ID, ism-familiya so‘zlari va username"""
+    terms = {str(order_id)}
+    terms.update(word for word in (user or '').lower().split() if word)
+    if username:
+        terms.add(username.lower().lstrip('@'))
+    return terms
+
+
+def local_now():
+    """Joriy vaqt (Toshkent)"""
+    return datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=TASHKENT_UTC_OFFSET)
+
+
 class Database:
     def __init__(self, db_name="data/main.db"):
         """Ma'lumotlar bazasiga ulanish"""
         self.db_name = db_name  # Fayl nomini saqlash
         try:
-            self.conn = sqlite3.connect(db_name, check_same_thread=False)
+            self.conn = sqlite3.connect(db_name, check_same_thread=False, timeout=10, factory=ProfilingConnection)
+            # WAL: bir nechta jarayon (worker) bir vaqtda o‘qiy oladi, yozuvchi esa kutadi
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA busy_timeout=5000')
             self.cursor = self.conn.cursor()
             self.create_tables()
         except sqlite3.Error as e:
@@ -27,9 +80,11 @@ class Database:
                     telegram_id BIGINT NOT NULL UNIQUE,
                     username VARCHAR(255) NULL,
                     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    last_active DATETIME NULL
+                    last_active DATETIME NULL,
+                    is_active INTEGER NOT NULL DEFAULT 1
                 )
             ''')
+            self._migrate_users()
             # Orders jadvali
             self.cursor.execute('''
                 CREATE TABLE IF NOT EXISTS Orders (
@@ -47,15 +102,256 @@ class Database:
                     status TEXT DEFAULT 'Jarayonda',
                     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
                     confirmed_by_admin_id BIGINT,
+                    deadline_at INTEGER,
+                    catalog_version INTEGER,
                     FOREIGN KEY (user_id) REFERENCES Users(telegram_id)
                 )
             ''')
+            self._migrate_orders()
+            # Qabul qilingan buyurtmalar muddati bo‘yicha tartiblangan indeks
+            self.cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_orders_status_deadline ON Orders (status, deadline_at)'
+            )
+            self.cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_orders_admin_status_deadline '
+                'ON Orders (confirmed_by_admin_id, status, deadline_at)'
+            )
+            # Jobs jadvali (rejalashtirilgan vazifalar, masalan eslatmalar)
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS Jobs (
+                    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    order_id INTEGER,
+                    chat_id BIGINT,
+                    run_at REAL NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            self.cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_jobs_status_run_at ON Jobs (status, run_at)'
+            )
+            self.cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_jobs_order_status ON Jobs (order_id, status)'
+            )
+            # Services jadvali (narxlar katalogi) va uning versiyasi
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS Services (
+                    name TEXT PRIMARY KEY,
+                    price INTEGER NOT NULL,
+                    min_pages INTEGER NOT NULL DEFAULT 5,
+                    description TEXT,
+                    position INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS CatalogVersion (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    version INTEGER NOT NULL
+                )
+            ''')
+            self.cursor.execute('INSERT OR IGNORE INTO CatalogVersion (id, version) VALUES (1, 0)')
+            # Daromad va buyurtmalar soni bo‘yicha kunlik/oylik jamlanmalar
+            # (har bir qator: shu kuni shu holatga o‘tgan buyurtmalar)
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS RevenueDaily (
+                    day TEXT NOT NULL,
+                    service TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    orders INTEGER NOT NULL DEFAULT 0,
+                    revenue INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (day, service, status)
+                ) WITHOUT ROWID
+            ''')
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS RevenueMonthly (
+                    month TEXT NOT NULL,
+                    service TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    orders INTEGER NOT NULL DEFAULT 0,
+                    revenue INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (month, service, status)
+                ) WITHOUT ROWID
+            ''')
+            self.cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_revenue_daily_status_day ON RevenueDaily (status, day)'
+            )
+            self._backfill_revenue()
+            # Adminlar samaradorligi: hisoblagichlar va javob vaqti gistogrammasi
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS AdminStats (
+                    admin_id BIGINT PRIMARY KEY,
+                    accepted INTEGER NOT NULL DEFAULT 0,
+                    completed INTEGER NOT NULL DEFAULT 0,
+                    rejected INTEGER NOT NULL DEFAULT 0,
+                    open_orders INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS AdminLatency (
+                    admin_id BIGINT NOT NULL,
+                    metric TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (admin_id, metric, bucket)
+                ) WITHOUT ROWID
+            ''')
+            self._backfill_admin_stats()
+            # OrderSearch jadvali (buyurtmalarni prefiks bo‘yicha qidirish indeksi)
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS OrderSearch (
+                    term TEXT NOT NULL,
+                    order_id INTEGER NOT NULL,
+                    PRIMARY KEY (term, order_id)
+                ) WITHOUT ROWID
+            ''')
+            self._backfill_search()
+            # Broadcasts jadvali (ommaviy xabar tarqatish va uning holati)
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS Broadcasts (
+                    broadcast_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    admin_id BIGINT NOT NULL,
+                    message_id BIGINT,
+                    text TEXT NOT NULL,
+                    last_user_id INTEGER NOT NULL DEFAULT 0,
+                    sent INTEGER NOT NULL DEFAULT 0,
+                    failed INTEGER NOT NULL DEFAULT 0,
+                    blocked INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL DEFAULT 'running',
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
             self.conn.commit()
             logger.info("Jadvallar muvaffaqiyatli yaratildi yoki mavjud edi.")
         except sqlite3.Error as e:
             logger.error(f"Jadvallarni yaratishda xato: {e}")
             raise  # Xatolikni yuqori darajaga qaytarish
 
+    def _migrate_users(self):
+        """Eski Users jadvaliga is_active ustunini qo‘shish"""
+        self.cursor.execute('PRAGMA table_info(Users)')
+        columns = {row[1] for row in self.cursor.fetchall()}
+        if 'is_active' not in columns:
+            self.cursor.execute('ALTER TABLE Users ADD COLUMN is_active INTEGER NOT NULL DEFAULT 1')
+            logger.info("Users jadvaliga is_active ustuni qo‘shildi.")
+
+    def _migrate_orders(self):
+        """Eski bazalarga yangi ustunlarni qo‘shish"""
+        self.cursor.execute('PRAGMA table_info(Orders)')
+        columns = {row[1] for row in self.cursor.fetchall()}
+        if 'deadline_at' not in columns:
+            self.cursor.execute('ALTER TABLE Orders ADD COLUMN deadline_at INTEGER')
+            # DD.MM.YYYY -> kun oxiri (Toshkent vaqti) unix vaqtda
+            self.cursor.execute('''
+                UPDATE Orders SET deadline_at = CAST(strftime('%s',
+                    substr(deadline, 7, 4) || '-' || substr(deadline, 4, 2) || '-' || substr(deadline, 1, 2)
+                ) AS INTEGER) + 86400 - ?
+                WHERE deadline LIKE '__.__.____'
+            ''', (TASHKENT_UTC_OFFSET,))
+            logger.info("Orders jadvaliga deadline_at ustuni qo‘shildi.")
+        if 'catalog_version' not in columns:
+            self.cursor.execute('ALTER TABLE Orders ADD COLUMN catalog_version INTEGER')
+            logger.info("Orders jadvaliga catalog_version ustuni qo‘shildi.")
+
+    def _backfill_revenue(self):
+        """Jamlanma jadvallar bo‘sh bo‘lsa, mavjud buyurtmalardan bir marta to‘ldirish"""
+        self.cursor.execute('SELECT 1 FROM RevenueMonthly LIMIT 1')
+        if self.cursor.fetchone():
+            return
+        # Eski buyurtmalarning o‘tish vaqti noma'lum, shuning uchun yaratilgan kuni olinadi.
+        # Jonli o‘tishlar kabi: har bir buyurtma Jarayonda dan o‘tgan, Bajarildi lar Qabul qilindi dan ham
+        for status_expr, where in (
+                ("'Jarayonda'", ""),
+                ("'Qabul qilindi'", "WHERE status IN ('Qabul qilindi', 'Bajarildi')"),
+                ("status", "WHERE status NOT IN ('Jarayonda', 'Qabul qilindi')"),
+        ):
+            self.cursor.execute(f'''
+                INSERT INTO RevenueDaily (day, service, status, orders, revenue)
+                SELECT date(created_at, ?), service, {status_expr}, COUNT(*), SUM(total_price)
+                FROM Orders {where}
+                GROUP BY 1, 2, 3
+            ''', (f'+{TASHKENT_UTC_OFFSET} seconds',))
+        self.cursor.execute('''
+            INSERT INTO RevenueMonthly (month, service, status, orders, revenue)
+            SELECT substr(day, 1, 7), service, status, SUM(orders), SUM(revenue)
+            FROM RevenueDaily
+            GROUP BY 1, 2, 3
+        ''')
+
+    def _backfill_admin_stats(self):
+        """AdminStats bo‘sh bo‘lsa, mavjud buyurtmalardan hisoblagichlarni to‘ldirish"""
+        self.cursor.execute('SELECT 1 FROM AdminStats LIMIT 1')
+        if self.cursor.fetchone():
+            return
+        # Eski buyurtmalar uchun o‘tish vaqtlari ma'lum emas, faqat sonlar tiklanadi
+        self.cursor.execute('''
+            INSERT INTO AdminStats (admin_id, accepted, completed, rejected, open_orders)
+            SELECT confirmed_by_admin_id,
+                   SUM(status IN ('Qabul qilindi', 'Bajarildi')),
+                   SUM(status = 'Bajarildi'),
+                   0,
+                   SUM(status = 'Qabul qilindi')
+            FROM Orders
+            WHERE confirmed_by_admin_id IS NOT NULL
+            GROUP BY confirmed_by_admin_id
+        ''')
+
+    def _backfill_search(self):
+        """Qidiruv indeksi bo‘sh bo‘lsa, mavjud buyurtmalardan to‘ldirish"""
+        self.cursor.execute('SELECT 1 FROM OrderSearch LIMIT 1')
+        if self.cursor.fetchone():
+            return
+        self.cursor.execute('SELECT order_id, user, username FROM Orders')
+        for order_id, user, username in self.cursor.fetchall():
+            self._index_order(order_id, user, username)
+
+    def _index_order(self, order_id, user, username):
+        self.cursor.executemany(
+            'INSERT OR IGNORE INTO OrderSearch (term, order_id) VALUES (?, ?)',
+            [(term, order_id) for term in search_terms(order_id, user, username)]
+        )
+
+    def _record_admin_event(self, admin_id, old_status, new_status, age):
+        """Holat o‘tishini admin hisoblagichlari va gistogrammasiga qo‘shish (commit chaqiruvchida)"""
+        if not admin_id:
+            return
+        accepted = completed = rejected = opened = 0
+        metric = None
+        if new_status == 'Qabul qilindi':
+            accepted, opened, metric = 1, 1, 'accept'
+        elif new_status == 'Bajarildi':
+            completed, metric = 1, 'complete'
+        elif new_status == 'Rad etildi':
+            rejected = 1
+        if old_status == 'Qabul qilindi':
+            opened -= 1
+        self.cursor.execute('''
+            INSERT INTO AdminStats (admin_id, accepted, completed, rejected, open_orders)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (admin_id) DO UPDATE SET
+                accepted = accepted + excluded.accepted,
+                completed = completed + excluded.completed,
+                rejected = rejected + excluded.rejected,
+                open_orders = open_orders + excluded.open_orders
+        ''', (admin_id, accepted, completed, rejected, opened))
+        if metric and age is not None:
+            bucket = next(bound for bound in LATENCY_BUCKETS if age <= bound)
+            self.cursor.execute('''
+                INSERT INTO AdminLatency (admin_id, metric, bucket, count) VALUES (?, ?, ?, 1)
+                ON CONFLICT (admin_id, metric, bucket) DO UPDATE SET count = count + 1
+            ''', (admin_id, metric, bucket))
+
+    def _record_status(self, service, status, total_price):
+        """Buyurtmaning yangi holatga o‘tishini jamlanmalarga qo‘shish (commit chaqiruvchida)"""
+        day = local_now().strftime('%Y-%m-%d')
+        for table, key_column, key in (('RevenueDaily', 'day', day), ('RevenueMonthly', 'month', day[:7])):
+            self.cursor.execute(f'''
+                INSERT INTO {table} ({key_column}, service, status, orders, revenue)
+                VALUES (?, ?, ?, 1, ?)
+                ON CONFLICT ({key_column}, service, status)
+                DO UPDATE SET orders = orders + 1, revenue = revenue + excluded.revenue
+            ''', (key, service, status, total_price))
+
     def add_user(self, telegram_id, username):
         """Yangi foydalanuvchi qo‘shish"""
         try:
@@ -64,7 +360,7 @@ class Database:
                 (telegram_id, username)
             )
             self.conn.commit()
-            logger.info(f"Foydalanuvchi qo‘shildi: {telegram_id} - @{username}")
+            logger.info("Foydalanuvchi qo‘shildi: %s - @%s", telegram_id, username)
             return True
         except sqlite3.Error as e:
             logger.error(f"Foydalanuvchi qo‘shishda xato: {e}")
@@ -74,12 +370,12 @@ class Database:
         """Oxirgi faol vaqtni yangilash"""
         try:
             self.cursor.execute(
-                'UPDATE Users SET last_active = ? WHERE telegram_id = ?',
+                'UPDATE Users SET last_active = ?, is_active = 1 WHERE telegram_id = ?',
                 (datetime.now(), telegram_id)
             )
             self.conn.commit()
             if self.cursor.rowcount > 0:
-                logger.info(f"Foydalanuvchi {telegram_id} uchun last_active yangilandi.")
+                logger.info("Foydalanuvchi %s uchun last_active yangilandi.", telegram_id)
             return self.cursor.rowcount > 0
         except sqlite3.Error as e:
             logger.error(f"Oxirgi faol vaqtni yangilashda xato: {e}")
@@ -105,20 +401,56 @@ class Database:
             logger.error(f"Foydalanuvchilar sonini olishda xato: {e}")
             return 0
 
+    def count_active_users(self):
+        """Botni bloklamagan foydalanuvchilar soni"""
+        try:
+            self.cursor.execute('SELECT COUNT(*) FROM Users WHERE is_active = 1')
+            return self.cursor.fetchone()[0] or 0
+        except sqlite3.Error as e:
+            logger.error(f"Faol foydalanuvchilar sonini olishda xato: {e}")
+            return 0
+
+    def get_active_users_after(self, last_id, limit=100):
+        """Faol foydalanuvchilarni id bo‘yicha sahifalab olish (keyset pagination)"""
+        try:
+            self.cursor.execute(
+                'SELECT id, telegram_id FROM Users WHERE id > ? AND is_active = 1 ORDER BY id LIMIT ?',
+                (last_id, limit)
+            )
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Foydalanuvchilarni olishda xato: {e}")
+            return []
+
+    def deactivate_user(self, telegram_id):
+        """Botni bloklagan foydalanuvchini nofaol deb belgilash"""
+        try:
+            self.cursor.execute('UPDATE Users SET is_active = 0 WHERE telegram_id = ?', (telegram_id,))
+            self.conn.commit()
+            return self.cursor.rowcount > 0
+        except sqlite3.Error as e:
+            logger.error(f"Foydalanuvchi {telegram_id} ni nofaol qilishda xato: {e}")
+            self.conn.rollback()
+            return False
+
     def add_order(self, order):
         """Yangi buyurtma qo‘shish"""
         try:
             self.cursor.execute('''
-                INSERT INTO Orders (user_id, user, username, phone, service, subject, pages, price, total_price, deadline, status)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                INSERT INTO Orders (user_id, user, username, phone, service, subject, pages, price, total_price,
+                                    deadline, status, deadline_at, catalog_version)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
                 order['user_id'], order['user'], order['username'], order['phone'],
                 order['service'], order['subject'], order['pages'], order['price'],
-                order['total_price'], order['deadline'], order['status']
+                order['total_price'], order['deadline'], order['status'],
+                deadline_to_timestamp(order['deadline']), order.get('catalog_version')
             ))
-            self.conn.commit()
             order_id = self.cursor.lastrowid
-            logger.info(f"Yangi buyurtma qo‘shildi: #{order_id}")
+            self._record_status(order['service'], order['status'], order['total_price'])
+            self._index_order(order_id, order['user'], order['username'])
+            self.conn.commit()
+            logger.info("Yangi buyurtma qo‘shildi: #%s", order_id)
             return order_id
         except sqlite3.Error as e:
             logger.error(f"Buyurtma qo‘shishda xato: {e}")
@@ -138,25 +470,44 @@ class Database:
             logger.error(f"Buyurtmalarni olishda xato: {e}")
             return []
 
-    def update_order_status(self, order_id, status, confirmed_by_admin_id=None):
-        """Buyurtma holatini yangilash"""
+    def transition_order_status(self, order_id, expected, status, confirmed_by_admin_id=None, actor_id=None,
+                                owner_id=None):
+        """
+        Holatni faqat joriy holat expected bo‘lsa o‘zgartirish (compare-and-set).
+        Bitta UPDATE ... RETURNING, oldindan o‘qishsiz; owner_id berilsa buyurtma
+        shu admin tasdiqlagan bo‘lishi kerak. Natija (qator, holat): o‘tish
+        bajarilsa - yangilangan qator (get_order_by_id kabi) va yangi holat;
+        bajarilmasa - (None, joriy holat), buyurtma yo‘q bo‘lsa (None, None);
+        baza xatosi - False. Joriy holat faqat o‘tish bajarilmaganda o‘qiladi.
+        """
+        assignments, params = ["status = ?"], [status]
+        if confirmed_by_admin_id:
+            assignments.append("confirmed_by_admin_id = ?")
+            params.append(confirmed_by_admin_id)
+        conditions = ["order_id = ?", "status = ?"]
+        params += [order_id, expected]
+        if owner_id:
+            conditions.append("confirmed_by_admin_id = ?")
+            params.append(owner_id)
         try:
-            if confirmed_by_admin_id:
-                self.cursor.execute(
-                    'UPDATE Orders SET status = ?, confirmed_by_admin_id = ? WHERE order_id = ?',
-                    (status, confirmed_by_admin_id, order_id)
-                )
-            else:
-                self.cursor.execute(
-                    'UPDATE Orders SET status = ? WHERE order_id = ?',
-                    (status, order_id)
-                )
+            self.cursor.execute(f'''
+                UPDATE Orders SET {", ".join(assignments)} WHERE {" AND ".join(conditions)}
+                RETURNING *, CAST(strftime('%s', 'now') - strftime('%s', created_at) AS INTEGER)
+            ''', params)
+            rows = self.cursor.fetchall()
+            if not rows:
+                self.conn.commit()
+                self.cursor.execute('SELECT status FROM Orders WHERE order_id = ?', (order_id,))
+                row = self.cursor.fetchone()
+                return None, row[0] if row else None
+            *order, age = rows[0]
+            self._record_status(order[5], status, order[9])
+            self._record_admin_event(confirmed_by_admin_id or actor_id or order[13], expected, status, age)
             self.conn.commit()
-            if self.cursor.rowcount > 0:
-                logger.info(f"Buyurtma #{order_id} holati yangilandi: {status}")
-            return self.cursor.rowcount > 0
+            logger.info("Buyurtma #%s holati yangilandi: %s -> %s", order_id, expected, status)
+            return tuple(order), status
         except sqlite3.Error as e:
-            logger.error(f"Buyurtma holatini yangilashda xato: {e}")
+            logger.error(f"Buyurtma #{order_id} holatini o‘zgartirishda xato: {e}")
             self.conn.rollback()
             return False
 
@@ -164,10 +515,12 @@ class Database:
         """Buyurtmani o‘chirish"""
         try:
             self.cursor.execute('DELETE FROM Orders WHERE order_id = ?', (order_id,))
+            deleted = self.cursor.rowcount > 0
+            self.cursor.execute('DELETE FROM OrderSearch WHERE order_id = ?', (order_id,))
             self.conn.commit()
-            if self.cursor.rowcount > 0:
-                logger.info(f"Buyurtma #{order_id} o‘chirildi")
-            return self.cursor.rowcount > 0
+            if deleted:
+                logger.info("Buyurtma #%s o‘chirildi", order_id)
+            return deleted
         except sqlite3.Error as e:
             logger.error(f"Buyurtma o‘chirishda xato: {e}")
             self.conn.rollback()
@@ -198,10 +551,350 @@ class Database:
             logger.error(f"Foydalanuvchi {user_id} uchun tasdiqlangan buyurtmani olishda xato: {e}")
             return None
 
+    def get_orders_by_ids(self, order_ids):
+        """Bir nechta buyurtmani bitta so‘rov bilan olish"""
+        order_ids = list(order_ids)
+        if not order_ids:
+            return []
+        try:
+            placeholders = ', '.join('?' * len(order_ids))
+            self.cursor.execute(f'SELECT * FROM Orders WHERE order_id IN ({placeholders})', order_ids)
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Buyurtmalarni ID bo‘yicha olishda xato: {e}")
+            return []
+
+    def search_orders(self, prefix, limit=20):
+        """Kalit so‘zi prefiks bilan boshlanadigan buyurtmalar (yangilari birinchi)"""
+        try:
+            self.cursor.execute('''
+                SELECT * FROM Orders WHERE order_id IN (
+                    SELECT order_id FROM OrderSearch WHERE term >= ? AND term < ?
+                )
+                ORDER BY order_id DESC
+                LIMIT ?
+            ''', (prefix, prefix + '\U0010ffff', limit))
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Buyurtmalarni qidirishda xato: {e}")
+            return []
+
+    def get_admin_queue(self, admin_id, limit=20):
+        """Admin qabul qilgan, hali bajarilmagan buyurtmalar (muddati yaqinlari birinchi)"""
+        try:
+            self.cursor.execute('''
+                SELECT * FROM Orders
+                WHERE confirmed_by_admin_id = ? AND status = 'Qabul qilindi'
+                ORDER BY deadline_at
+                LIMIT ?
+            ''', (admin_id, limit))
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Admin {admin_id} navbatini olishda xato: {e}")
+            return []
+
+    def get_untracked_accepted_orders(self, kinds):
+        """Muddat eslatmalari hali rejalashtirilmagan qabul qilingan buyurtmalar: (order_id, deadline_at, admin_id)"""
+        kinds = list(kinds)
+        try:
+            placeholders = ', '.join('?' * len(kinds))
+            self.cursor.execute(f'''
+                SELECT order_id, deadline_at, confirmed_by_admin_id FROM Orders
+                WHERE status = 'Qabul qilindi' AND deadline_at IS NOT NULL
+                AND NOT EXISTS (
+                    SELECT 1 FROM Jobs
+                    WHERE Jobs.order_id = Orders.order_id
+                    AND Jobs.status IN ('pending', 'done')
+                    AND Jobs.kind IN ({placeholders})
+                )
+                ORDER BY deadline_at
+            ''', kinds)
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Kuzatilmagan buyurtmalarni olishda xato: {e}")
+            return []
+
+    def get_status_totals(self):
+        """Har bir holatga o‘tgan buyurtmalar soni va summasi (butun davr): {status: (orders, revenue)}"""
+        try:
+            self.cursor.execute(
+                'SELECT status, SUM(orders), SUM(revenue) FROM RevenueMonthly GROUP BY status'
+            )
+            return {status: (orders, revenue) for status, orders, revenue in self.cursor.fetchall()}
+        except sqlite3.Error as e:
+            logger.error(f"Holatlar bo‘yicha jamlanmani olishda xato: {e}")
+            return {}
+
+    def get_daily_totals(self, status, days):
+        """Oxirgi N kun uchun kunlik jamlanma: {'YYYY-MM-DD': (orders, revenue)}"""
+        since = (local_now() - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+        try:
+            self.cursor.execute('''
+                SELECT day, SUM(orders), SUM(revenue) FROM RevenueDaily
+                WHERE status = ? AND day >= ?
+                GROUP BY day
+            ''', (status, since))
+            return {day: (orders, revenue) for day, orders, revenue in self.cursor.fetchall()}
+        except sqlite3.Error as e:
+            logger.error(f"Kunlik jamlanmani olishda xato: {e}")
+            return {}
+
+    def get_monthly_totals(self, status, months):
+        """Berilgan oylar uchun jamlanma: {'YYYY-MM': (orders, revenue)}"""
+        months = list(months)
+        try:
+            placeholders = ', '.join('?' * len(months))
+            self.cursor.execute(f'''
+                SELECT month, SUM(orders), SUM(revenue) FROM RevenueMonthly
+                WHERE status = ? AND month IN ({placeholders})
+                GROUP BY month
+            ''', (status, *months))
+            return {month: (orders, revenue) for month, orders, revenue in self.cursor.fetchall()}
+        except sqlite3.Error as e:
+            logger.error(f"Oylik jamlanmani olishda xato: {e}")
+            return {}
+
+    def get_service_totals(self, status, days):
+        """Oxirgi N kun uchun xizmatlar kesimida jamlanma (daromad bo‘yicha kamayish tartibida)"""
+        since = (local_now() - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+        try:
+            self.cursor.execute('''
+                SELECT service, SUM(orders), SUM(revenue) FROM RevenueDaily
+                WHERE status = ? AND day >= ?
+                GROUP BY service
+                ORDER BY SUM(revenue) DESC
+            ''', (status, since))
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Xizmatlar bo‘yicha jamlanmani olishda xato: {e}")
+            return []
+
+    def get_admin_stats(self):
+        """Adminlar hisoblagichlari: [(admin_id, accepted, completed, rejected, open_orders)]"""
+        try:
+            self.cursor.execute('''
+                SELECT admin_id, accepted, completed, rejected, open_orders
+                FROM AdminStats ORDER BY accepted DESC
+            ''')
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Admin statistikasini olishda xato: {e}")
+            return []
+
+    def get_admin_latency(self):
+        """Javob vaqti gistogrammalari: {(admin_id, metric): {chegara: soni}}"""
+        try:
+            self.cursor.execute('SELECT admin_id, metric, bucket, count FROM AdminLatency')
+            histograms = {}
+            for admin_id, metric, bucket, count in self.cursor.fetchall():
+                histograms.setdefault((admin_id, metric), {})[bucket] = count
+            return histograms
+        except sqlite3.Error as e:
+            logger.error(f"Admin javob vaqtlarini olishda xato: {e}")
+            return {}
+
+    def add_job(self, kind, run_at, order_id=None, chat_id=None):
+        """Yangi rejalashtirilgan vazifa qo‘shish (run_at - unix vaqt)"""
+        try:
+            self.cursor.execute(
+                'INSERT INTO Jobs (kind, order_id, chat_id, run_at) VALUES (?, ?, ?, ?)',
+                (kind, order_id, chat_id, run_at)
+            )
+            self.conn.commit()
+            return self.cursor.lastrowid
+        except sqlite3.Error as e:
+            logger.error(f"Vazifa qo‘shishda xato: {e}")
+            self.conn.rollback()
+            return None
+
+    def get_pending_jobs(self, after_id=0):
+        """Bajarilmagan vazifalarni vaqt bo‘yicha tartiblab olish (after_id dan keyin yaratilganlari)"""
+        try:
+            self.cursor.execute('''
+                SELECT job_id, kind, order_id, chat_id, run_at FROM Jobs
+                WHERE status = 'pending' AND job_id > ?
+                ORDER BY run_at
+            ''', (after_id,))
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Vazifalarni olishda xato: {e}")
+            return []
+
+    def cancel_jobs(self, order_id, kind=None):
+        """Buyurtmaga tegishli kutilayotgan vazifalarni bekor qilish"""
+        try:
+            if kind:
+                self.cursor.execute(
+                    "UPDATE Jobs SET status = 'cancelled' WHERE order_id = ? AND kind = ? AND status = 'pending'",
+                    (order_id, kind)
+                )
+            else:
+                self.cursor.execute(
+                    "UPDATE Jobs SET status = 'cancelled' WHERE order_id = ? AND status = 'pending'",
+                    (order_id,)
+                )
+            self.conn.commit()
+            return self.cursor.rowcount
+        except sqlite3.Error as e:
+            logger.error(f"Buyurtma #{order_id} vazifalarini bekor qilishda xato: {e}")
+            self.conn.rollback()
+            return 0
+
+    def count_pending_jobs(self, kind=None):
+        """Kutilayotgan vazifalar soni (kind berilsa faqat shu turdagilar)"""
+        try:
+            if kind:
+                self.cursor.execute("SELECT COUNT(*) FROM Jobs WHERE status = 'pending' AND kind = ?", (kind,))
+            else:
+                self.cursor.execute("SELECT COUNT(*) FROM Jobs WHERE status = 'pending'")
+            return self.cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            logger.error(f"Vazifalar sonini olishda xato: {e}")
+            return 0
+
+    def get_pending_job_ids(self, job_ids):
+        """Berilgan vazifalardan hali bekor qilinmagan (pending) lari"""
+        try:
+            placeholders = ','.join('?' * len(job_ids))
+            self.cursor.execute(
+                f"SELECT job_id FROM Jobs WHERE status = 'pending' AND job_id IN ({placeholders})",
+                list(job_ids)
+            )
+            return {row[0] for row in self.cursor.fetchall()}
+        except sqlite3.Error as e:
+            logger.error(f"Vazifalar holatini olishda xato: {e}")
+            return set(job_ids)
+
+    def finish_jobs(self, job_ids, status='done'):
+        """Vazifalarni bajarilgan (yoki xato) deb belgilash"""
+        try:
+            self.cursor.executemany(
+                'UPDATE Jobs SET status = ? WHERE job_id = ?',
+                [(status, job_id) for job_id in job_ids]
+            )
+            self.conn.commit()
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Vazifalar holatini yangilashda xato: {e}")
+            self.conn.rollback()
+            return False
+
+    def get_catalog_version(self):
+        """Narxlar katalogining joriy versiyasi"""
+        try:
+            self.cursor.execute('SELECT version FROM CatalogVersion WHERE id = 1')
+            row = self.cursor.fetchone()
+            return row[0] if row else 0
+        except sqlite3.Error as e:
+            logger.error(f"Katalog versiyasini olishda xato: {e}")
+            return None
+
+    def get_services(self):
+        """Katalogdagi xizmatlar va joriy versiya: (version, [(id, name, price, min_pages, description)])"""
+        try:
+            self.cursor.execute('SELECT version FROM CatalogVersion WHERE id = 1')
+            version = self.cursor.fetchone()[0]
+            self.cursor.execute('SELECT rowid, name, price, min_pages, description FROM Services ORDER BY position')
+            return version, self.cursor.fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Xizmatlar katalogini olishda xato: {e}")
+            return None, []
+
+    def seed_services(self, services):
+        """Katalog bo‘sh bo‘lsa boshlang‘ich xizmatlarni yozish"""
+        try:
+            self.cursor.execute('SELECT COUNT(*) FROM Services')
+            if self.cursor.fetchone()[0]:
+                return False
+            self.cursor.executemany(
+                'INSERT INTO Services (name, price, min_pages, description, position) VALUES (?, ?, ?, ?, ?)',
+                [(name, info['price'], info.get('min_pages', 5), info.get('description'), position)
+                 for position, (name, info) in enumerate(services.items())]
+            )
+            self.cursor.execute('UPDATE CatalogVersion SET version = version + 1 WHERE id = 1')
+            self.conn.commit()
+            logger.info("Narxlar katalogi boshlang‘ich qiymatlar bilan to‘ldirildi.")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Narxlar katalogini to‘ldirishda xato: {e}")
+            self.conn.rollback()
+            return False
+
+    def set_service_price(self, name, price):
+        """Xizmat narxini o‘zgartirish va katalog versiyasini oshirish, yangi versiyani qaytaradi"""
+        try:
+            self.cursor.execute('UPDATE Services SET price = ? WHERE name = ?', (price, name))
+            if self.cursor.rowcount == 0:
+                self.conn.rollback()
+                return None
+            self.cursor.execute('UPDATE CatalogVersion SET version = version + 1 WHERE id = 1')
+            self.cursor.execute('SELECT version FROM CatalogVersion WHERE id = 1')
+            version = self.cursor.fetchone()[0]
+            self.conn.commit()
+            logger.info("%s narxi %s ga o‘zgartirildi (katalog v%s)", name, price, version)
+            return version
+        except sqlite3.Error as e:
+            logger.error(f"Xizmat narxini o‘zgartirishda xato: {e}")
+            self.conn.rollback()
+            return None
+
+    def create_broadcast(self, admin_id, text):
+        """Yangi ommaviy xabar yozuvini yaratish"""
+        try:
+            self.cursor.execute('INSERT INTO Broadcasts (admin_id, text) VALUES (?, ?)', (admin_id, text))
+            self.conn.commit()
+            return self.cursor.lastrowid
+        except sqlite3.Error as e:
+            logger.error(f"Ommaviy xabar yaratishda xato: {e}")
+            self.conn.rollback()
+            return None
+
+    def get_broadcast(self, broadcast_id):
+        """Ommaviy xabar holatini olish"""
+        try:
+            self.cursor.execute('''
+                SELECT broadcast_id, admin_id, message_id, text, last_user_id, sent, failed, blocked, status
+                FROM Broadcasts WHERE broadcast_id = ?
+            ''', (broadcast_id,))
+            return self.cursor.fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Ommaviy xabar #{broadcast_id} ni olishda xato: {e}")
+            return None
+
+    def get_running_broadcasts(self):
+        """Tugallanmagan ommaviy xabarlar (restartdan keyin davom ettirish uchun)"""
+        try:
+            self.cursor.execute("SELECT broadcast_id FROM Broadcasts WHERE status = 'running'")
+            return [row[0] for row in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Tugallanmagan ommaviy xabarlarni olishda xato: {e}")
+            return []
+
+    def update_broadcast(self, broadcast_id, **fields):
+        """Ommaviy xabar holatini saqlash (checkpoint)"""
+        allowed = {'message_id', 'last_user_id', 'sent', 'failed', 'blocked', 'status'}
+        fields = {key: value for key, value in fields.items() if key in allowed}
+        if not fields:
+            return False
+        try:
+            assignments = ', '.join(f"{key} = ?" for key in fields)
+            self.cursor.execute(
+                f'UPDATE Broadcasts SET {assignments} WHERE broadcast_id = ?',
+                (*fields.values(), broadcast_id)
+            )
+            self.conn.commit()
+            return self.cursor.rowcount > 0
+        except sqlite3.Error as e:
+            logger.error(f"Ommaviy xabar #{broadcast_id} holatini saqlashda xato: {e}")
+            self.conn.rollback()
+            return False
+
     def close(self):
         """Ma'lumotlar bazasini yopish"""
         try:
             if self.conn:
+                # Tugallanmagan tranzaksiya yo‘qolmasligi uchun
+                self.conn.commit()
                 self.conn.close()
                 logger.info("Ma'lumotlar bazasi yopildi.")
         except sqlite3.Error as e:
@@ -219,5 +912,8 @@ class Database:
             return False
         return True
 
+# Har bir metod chaqiruvi vaqti /metrics ga yoziladi
+instrument_methods(Database, DB_LATENCY)
+
 # Singleton obyekt yaratish
 db = Database()
\ No newline at end of file
@@ -2,13 +2,7 @@
 import sqlite3
 from datetime import datetime
 
-def logger(statement):
-    print(f"""
-_____________________________________________________        
-Executing: 
-{statement}
-_____________________________________________________
-""")
+from .profiler import ProfilingConnection
 
 class Database:
     def __init__(self, path_to_db="main.db"):
@@ -16,13 +10,13 @@ class Database:
 
     @property
     def connection(self):
-        return sqlite3.connect(self.path_to_db)
+        # So‘rovlar profilerga yoziladi (sekinlari "db.slow" loggerida)
+        return sqlite3.connect(self.path_to_db, factory=ProfilingConnection)
 
     def execute(self, sql: str, parameters: tuple = None, fetchone=False, fetchall=False, commit=False):
         if not parameters:
             parameters = ()
         connection = self.connection
-        connection.set_trace_callback(logger)
         cursor = connection.cursor()
         data = None
         try:
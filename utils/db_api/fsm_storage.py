@@ -0,0 +1,146 @@
+import copy
+import json
+import logging
+import sqlite3
+import typing
+
+from aiogram.dispatcher.storage import BaseStorage
+
+logger = logging.getLogger(__name__)
+
+EMPTY_ROW = "state IS NULL AND data = '{}' AND bucket = '{}'"
+
+
+def count_sessions(storage):
+    """Holati bor FSM sessiyalari soni (SQLiteStorage yoki MemoryStorage)"""
+    if hasattr(storage, "count_sessions"):
+        return storage.count_sessions()
+    return sum(
+        1 for chat in getattr(storage, "data", {}).values()
+        for user in chat.values() if user.get("state")
+    )
+
+
+class SQLiteStorage(BaseStorage):
+    """
+    FSM holatlarini SQLite faylida saqlash.
+
+    Bir nechta jarayon (worker) bir xil faylni ishlatishi mumkin, shuning
+    uchun holatlar jarayonlar orasida umumiy bo‘ladi.
+    """
+
+    def __init__(self, path="data/fsm.db"):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA busy_timeout=5000')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS FSM (
+                chat TEXT NOT NULL,
+                user TEXT NOT NULL,
+                state TEXT,
+                data TEXT NOT NULL DEFAULT '{}',
+                bucket TEXT NOT NULL DEFAULT '{}',
+                PRIMARY KEY (chat, user)
+            ) WITHOUT ROWID
+        ''')
+        # Avvalgi versiyalardan qolgan bo‘sh yozuvlar
+        self.conn.execute(f'DELETE FROM FSM WHERE {EMPTY_ROW}')
+        self.conn.commit()
+
+    def _address(self, chat, user):
+        chat, user = self.check_address(chat=chat, user=user)
+        return str(chat), str(user)
+
+    def _get(self, chat, user, column):
+        row = self.conn.execute(
+            f'SELECT {column} FROM FSM WHERE chat = ? AND user = ?', (chat, user)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set(self, chat, user, column, value):
+        self.conn.execute(f'''
+            INSERT INTO FSM (chat, user, {column}) VALUES (?, ?, ?)
+            ON CONFLICT (chat, user) DO UPDATE SET {column} = excluded.{column}
+        ''', (chat, user, value))
+        if value is None or value == '{}':
+            # state.finish() dan keyin bo‘sh qolgan yozuv o‘chiriladi (MemoryStorage kabi) -
+            # aks holda jadval bot bilan gaplashgan har bir foydalanuvchiga bitta qator o‘sadi
+            self.conn.execute(f'''
+                DELETE FROM FSM WHERE chat = ? AND user = ? AND {EMPTY_ROW}
+            ''', (chat, user))
+        self.conn.commit()
+
+    async def get_state(self, *, chat: typing.Union[str, int, None] = None,
+                        user: typing.Union[str, int, None] = None,
+                        default: typing.Optional[str] = None) -> typing.Optional[str]:
+        chat, user = self._address(chat, user)
+        state = self._get(chat, user, 'state')
+        return state if state is not None else self.resolve_state(default)
+
+    async def get_data(self, *, chat: typing.Union[str, int, None] = None,
+                       user: typing.Union[str, int, None] = None,
+                       default: typing.Optional[dict] = None) -> typing.Dict:
+        chat, user = self._address(chat, user)
+        data = self._get(chat, user, 'data')
+        return json.loads(data) if data else copy.deepcopy(default or {})
+
+    async def set_state(self, *, chat: typing.Union[str, int, None] = None,
+                        user: typing.Union[str, int, None] = None,
+                        state: typing.Optional[typing.AnyStr] = None):
+        chat, user = self._address(chat, user)
+        self._set(chat, user, 'state', self.resolve_state(state))
+
+    async def set_data(self, *, chat: typing.Union[str, int, None] = None,
+                       user: typing.Union[str, int, None] = None,
+                       data: typing.Dict = None):
+        chat, user = self._address(chat, user)
+        self._set(chat, user, 'data', json.dumps(data or {}))
+
+    async def update_data(self, *, chat: typing.Union[str, int, None] = None,
+                          user: typing.Union[str, int, None] = None,
+                          data: typing.Dict = None, **kwargs):
+        current = await self.get_data(chat=chat, user=user)
+        current.update(data or {}, **kwargs)
+        await self.set_data(chat=chat, user=user, data=current)
+
+    def has_bucket(self):
+        return True
+
+    async def get_bucket(self, *, chat: typing.Union[str, int, None] = None,
+                         user: typing.Union[str, int, None] = None,
+                         default: typing.Optional[dict] = None) -> typing.Dict:
+        chat, user = self._address(chat, user)
+        bucket = self._get(chat, user, 'bucket')
+        return json.loads(bucket) if bucket else copy.deepcopy(default or {})
+
+    async def set_bucket(self, *, chat: typing.Union[str, int, None] = None,
+                         user: typing.Union[str, int, None] = None,
+                         bucket: typing.Dict = None):
+        chat, user = self._address(chat, user)
+        self._set(chat, user, 'bucket', json.dumps(bucket or {}))
+
+    async def update_bucket(self, *, chat: typing.Union[str, int, None] = None,
+                            user: typing.Union[str, int, None] = None,
+                            bucket: typing.Dict = None, **kwargs):
+        current = await self.get_bucket(chat=chat, user=user)
+        current.update(bucket or {}, **kwargs)
+        await self.set_bucket(chat=chat, user=user, bucket=current)
+
+    async def reset_all(self, full=True):
+        if full:
+            self.conn.execute('DELETE FROM FSM')
+        else:
+            self.conn.execute("UPDATE FSM SET state = NULL, data = '{}'")
+            self.conn.execute(f'DELETE FROM FSM WHERE {EMPTY_ROW}')
+        self.conn.commit()
+
+    def count_sessions(self):
+        """Faol FSM sessiyalari soni (holati bor yozuvlar)"""
+        return self.conn.execute('SELECT COUNT(*) FROM FSM WHERE state IS NOT NULL').fetchone()[0]
+
+    async def close(self):
+        self.conn.close()
+
+    async def wait_closed(self):
+        return True
@@ -0,0 +1,227 @@
+import logging
+import re
+import sqlite3
+import time
+from collections import deque
+
+slow_logger = logging.getLogger("db.slow")
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(sql):
+    """SQL ni bir xil ko‘rinishga keltirish: literallar ?, IN (?, ?, ...) -> IN (...)"""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("(...)", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+class QueryStats:
+    __slots__ = ("sql", "count", "total", "rows", "max", "samples")
+
+    def __init__(self, sql, sample_size):
+        self.sql = sql
+        self.count = 0
+        self.total = 0.0
+        self.rows = 0
+        self.max = 0.0
+        self.samples = deque(maxlen=sample_size)  # oxirgi vaqtlar (p95 uchun)
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+        self.samples.append(duration)
+
+    @property
+    def p95(self):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+class QueryProfiler:
+    """
+    SQL so‘rovlari profili: normallashtirilgan SQL bo‘yicha soni, umumiy va
+    p95 vaqti, qaytarilgan qatorlar. threshold dan sekin so‘rovlar EXPLAIN
+    QUERY PLAN bilan birga "db.slow" loggeriga yoziladi (har bir so‘rov
+    shakli uchun explain_interval da bir marta).
+    """
+
+    def __init__(self, slow_threshold=0.05, sample_size=256, explain_interval=300):
+        self.slow_threshold = slow_threshold
+        self.sample_size = sample_size
+        self.explain_interval = explain_interval
+        self.enabled = True
+        self._stats = {}
+        self._normalized = {}  # xom SQL -> normallashtirilgan (kesh)
+        self._explained = {}  # normallashtirilgan SQL -> oxirgi EXPLAIN vaqti
+
+    def stats_for(self, sql):
+        key = self._normalized.get(sql)
+        if key is None:
+            key = normalize(sql)
+            if len(self._normalized) < 4096:
+                self._normalized[sql] = key
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = QueryStats(key, self.sample_size)
+        return stats
+
+    def record(self, conn, sql, params, duration, many=False):
+        stats = self.stats_for(sql)
+        stats.add(duration)
+        if duration >= self.slow_threshold:
+            self._log_slow(conn, stats, sql, params, duration, many)
+        return stats
+
+    def _log_slow(self, conn, stats, sql, params, duration, many):
+        now = time.monotonic()
+        plan = ""
+        if not many and now - self._explained.get(stats.sql, -self.explain_interval) >= self.explain_interval:
+            self._explained[stats.sql] = now
+            plan = self.explain(conn, sql, params)
+        slow_logger.warning(
+            f"Sekin so‘rov ({duration * 1000:.1f} ms): {stats.sql}" + (f"\n{plan}" if plan else "")
+        )
+
+    @staticmethod
+    def explain(conn, sql, params=()):
+        """EXPLAIN QUERY PLAN natijasi (profil qilinmaydigan oddiy kursor bilan)"""
+        try:
+            cursor = sqlite3.Connection.cursor(conn)
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params or ())
+            return "\n".join(f"  {row[-1]}" for row in cursor.fetchall())
+        except sqlite3.Error as e:
+            return f"  (EXPLAIN bajarilmadi: {e})"
+
+    def top(self, limit=10, key="total"):
+        """Eng og‘ir so‘rovlar (total, count, p95 yoki rows bo‘yicha)"""
+        return sorted(self._stats.values(), key=lambda s: getattr(s, key), reverse=True)[:limit]
+
+    def reset(self):
+        self._stats.clear()
+        self._explained.clear()
+
+
+profiler = QueryProfiler()
+
+
+class ProfilingCursor(sqlite3.Cursor):
+    """
+    Har bir so‘rov vaqti va fetch qilingan qatorlar profilerga yoziladi.
+
+    SELECT ning execute() i faqat birinchi qadamni bajaradi - qolgan qatorlar
+    fetch paytida o‘qiladi. Shuning uchun qator qaytaradigan so‘rov vaqti
+    (sekin log va p95 uchun) execute + fetch bo‘lib, natija tugaganda, keyingi
+    execute da yoki kursor yopilganda yoziladi.
+    """
+
+    _stats = None
+    _pending = None  # [sql, parameters, vaqt] - qatorlari hali o‘qilayotgan so‘rov
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        if not profiler.enabled:
+            self._stats = None
+            return super().execute(sql, parameters)
+        started = time.perf_counter()
+        self._stats = profiler.stats_for(sql)
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            duration = time.perf_counter() - started
+            if self.description is None:
+                profiler.record(self.connection, sql, parameters, duration)
+                if self.rowcount > 0:
+                    self._stats.rows += self.rowcount
+            else:
+                self._pending = [sql, parameters, duration]
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        if not profiler.enabled:
+            self._stats = None
+            return super().executemany(sql, seq_of_parameters)
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._stats = profiler.record(self.connection, sql, None, time.perf_counter() - started, many=True)
+            if self.rowcount > 0:
+                self._stats.rows += self.rowcount
+
+    def _fetched(self, rows, started, done):
+        if self._stats is not None:
+            self._stats.rows += rows
+        if self._pending is not None:
+            self._pending[2] += time.perf_counter() - started
+            if done:
+                self._finish()
+
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            profiler.record(self.connection, *pending)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(1 if row is not None else 0, started, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        started = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._fetched(len(rows), started, len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(len(rows), started, True)
+        return rows
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # conn.execute(...).fetchone() - kursor natija oxirigacha o‘qilmasdan tashlanadi
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class ProfilingConnection(sqlite3.Connection):
+    """sqlite3.connect(..., factory=ProfilingConnection) - barcha so‘rovlar profil qilinadi"""
+
+    def cursor(self, factory=ProfilingCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def format_top(limit=10, key="total"):
+    """Admin uchun eng og‘ir so‘rovlar matni (HTML)"""
+    lines = []
+    for i, stats in enumerate(profiler.top(limit, key), 1):
+        sql = stats.sql if len(stats.sql) <= 120 else stats.sql[:117] + "..."
+        sql = sql.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        lines.append(
+            f"{i}. <code>{sql}</code>\n"
+            f"   🔁 {stats.count} | ⏱ {stats.total * 1000:.1f} ms | p95 {stats.p95 * 1000:.2f} ms | 📄 {stats.rows}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,92 @@
+import logging
+import time
+
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+from keyboards.inline.callback_datas import order_details
+
+logger = logging.getLogger(__name__)
+
+DUE_SOON = "deadline_soon"
+OVERDUE = "deadline_overdue"
+DUE_SOON_WINDOW = 24 * 60 * 60  # muddatga 24 soat qolganda ogohlantirish
+
+
+def urgency(deadline_at, now=None):
+    """Buyurtma shoshilinchligi: (emoji, qolgan soniyalar)"""
+    left = deadline_at - (now or time.time())
+    if left <= 0:
+        return "🔴", left
+    if left <= DUE_SOON_WINDOW:
+        return "🟠", left
+    return "🟢", left
+
+
+def format_time_left(left):
+    """Qolgan/kechikkan vaqtni o‘qiladigan ko‘rinishga keltirish"""
+    hours = int(abs(left) // 3600)
+    text = f"{hours // 24} kun {hours % 24} soat" if hours >= 24 else f"{hours} soat"
+    return f"{text} kechikdi" if left <= 0 else f"{text} qoldi"
+
+
+class DeadlineTracker:
+    """
+    Qabul qilingan buyurtmalar muddatini kuzatish.
+
+    Har bir qabul qilingan buyurtma uchun rejalashtiruvchiga ikki vazifa
+    qo‘yiladi: muddatga 24 soat qolganda va muddat o‘tganda. Ogohlantirish
+    buyurtmani qabul qilgan adminga yuboriladi.
+    """
+
+    def __init__(self, db, scheduler, bot):
+        self.db = db
+        self.scheduler = scheduler
+        self.bot = bot
+        scheduler.register(DUE_SOON, self._send_alerts)
+        scheduler.register(OVERDUE, self._send_alerts)
+
+    def track(self, order_id, deadline_at, admin_id):
+        """Qabul qilingan buyurtma uchun muddat ogohlantirishlarini rejalashtirish"""
+        if deadline_at is None:
+            return
+        if deadline_at - DUE_SOON_WINDOW > time.time():
+            self.scheduler.schedule_at(DUE_SOON, deadline_at - DUE_SOON_WINDOW, order_id=order_id, chat_id=admin_id)
+        self.scheduler.schedule_at(OVERDUE, deadline_at, order_id=order_id, chat_id=admin_id)
+
+    def untrack(self, order_id):
+        """Buyurtma yakunlanganda ogohlantirishlarni bekor qilish"""
+        self.scheduler.cancel(order_id, DUE_SOON)
+        self.scheduler.cancel(order_id, OVERDUE)
+
+    def sync(self):
+        """Ishga tushishda ogohlantirishsiz qolgan qabul qilingan buyurtmalarni rejalashtirish"""
+        rows = self.db.get_untracked_accepted_orders([DUE_SOON, OVERDUE])
+        for order_id, deadline_at, admin_id in rows:
+            if admin_id:
+                self.track(order_id, deadline_at, admin_id)
+        if rows:
+            logger.info("%s ta buyurtma uchun muddat ogohlantirishlari rejalashtirildi.", len(rows))
+
+    async def _send_alerts(self, jobs):
+        orders = {order[0]: order for order in self.db.get_orders_by_ids(job.order_id for job in jobs)}
+        for job in jobs:
+            order = orders.get(job.order_id)
+            if not order or order[11] != "Qabul qilindi":
+                continue
+            if job.kind == OVERDUE:
+                title = f"🔴 <b>Buyurtma #{order[0]} muddati o‘tdi!</b>"
+            else:
+                title = f"🟠 <b>Buyurtma #{order[0]} muddatiga 24 soatdan kam qoldi!</b>"
+            text = (
+                f"{title}\n"
+                f"📦 Xizmat: {order[5]}\n"
+                f"📌 Mavzu: {order[6]}\n"
+                f"⏳ Muddat: {order[10]}"
+            )
+            markup = InlineKeyboardMarkup().add(
+                InlineKeyboardButton(f"#{order[0]} Batafsil", callback_data=order_details.new(order[0]))
+            )
+            try:
+                await self.bot.send_message(job.chat_id, text, reply_markup=markup, parse_mode="HTML")
+            except Exception as e:
+                logger.error(f"Admin {job.chat_id} ga muddat ogohlantirishini yuborishda xato: {e}")
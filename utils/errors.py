@@ -0,0 +1,191 @@
+import asyncio
+import hashlib
+import html
+import logging
+import os
+import time
+
+from utils.metrics import HANDLER_ERRORS
+
+logger = logging.getLogger(__name__)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Har bir chaqiruvni o‘rab oluvchi modullar: xato ularni chaqirgan joy bo‘yicha guruhlanadi
+WRAPPER_FILES = {os.path.join(ROOT, "utils", "bot.py"), os.path.join(ROOT, "utils", "tracing.py")}
+UPDATE_KINDS = ("message", "callback_query", "inline_query", "edited_message", "chosen_inline_result",
+                "my_chat_member", "pre_checkout_query")
+
+
+def fingerprint(exception):
+    """
+    Xato turi va joyi: (kalit, tur, joy).
+
+    Joy - tracebackdagi loyiha kodining oxirgi freymi, WRAPPER_FILES dagi
+    o‘ramlar (MetricsBot.request) hisobga olinmaydi: aiogram ichida ko‘tarilgan
+    TelegramAPIError ham uni chaqirgan handler bo‘yicha guruhlanadi. Manba
+    qatorlari o‘qilmaydi - faqat fayl, qator va funksiya.
+    """
+    name = type(exception).__name__
+    last = own = None
+    tb = exception.__traceback__
+    while tb is not None:
+        code = tb.tb_frame.f_code
+        last = (code.co_filename, tb.tb_lineno, code.co_name)
+        if (code.co_filename.startswith(ROOT) and "site-packages" not in code.co_filename
+                and code.co_filename not in WRAPPER_FILES):
+            own = last
+        tb = tb.tb_next
+    frame = own or last
+    if frame is None:
+        location = "?"
+    else:
+        filename, lineno, func = frame
+        filename = os.path.relpath(filename, ROOT) if frame is own else os.path.basename(filename)
+        location = f"{filename}:{lineno} {func}"
+    key = hashlib.sha1(f"{name}@{location}".encode()).hexdigest()[:8]
+    return key, name, location
+
+
+def describe_update(update):
+    """Update haqida qisqa ma’lumot (to‘liq update logga yozilmaydi)"""
+    if update is None:
+        return "update yo‘q"
+    for kind in UPDATE_KINDS:
+        event = getattr(update, kind, None)
+        if event:
+            user = getattr(event, "from_user", None)
+            return f"update {update.update_id}, {kind}, user {user.id if user else '?'}"
+    return f"update {getattr(update, 'update_id', '?')}"
+
+
+class ErrorAggregator:
+    """
+    Handler xatolarini guruhlash.
+
+    Xatolar tur va joy bo‘yicha guruhlanadi, har bir guruh window soniyalik
+    oynalarda sanaladi: oynadagi birinchi samples tasi traceback bilan
+    logga yoziladi, qolganlari oyna tugaganda bitta qator bilan. Adminlarga
+    digest_interval soniyada ko‘pi bilan bitta jamlangan xabar yuboriladi
+    (Telegram uzilishida har bir update uchun xabar emas). start() dagi fon
+    tsikli oynalarni yopadi va digestni xatolar to‘xtagandan keyin ham yuboradi.
+    """
+
+    def __init__(self, bot, admins, window=60, samples=3, digest_interval=600, digest_top=10):
+        self.bot = bot
+        self.admins = admins
+        self.window = window
+        self.samples = samples
+        self.digest_interval = digest_interval
+        self.digest_top = digest_top
+        self._groups = {}  # kalit -> guruh holati
+        self._digest_at = None
+        self._task = None
+
+    def start(self):
+        """Oynalarni yopish va digest yuborish tsiklini ishga tushirish"""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._loop())
+
+    async def stop(self):
+        """Tsiklni to‘xtatish va ochiq oynalarni logga yozish"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.flush()
+
+    async def _loop(self):
+        interval = max(1, min(self.window, self.digest_interval) / 2)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self._roll_windows(time.monotonic())
+                await self.notify()
+            except Exception as e:
+                logger.warning("Xatolar jamlanmasini yuborishda xato: %s", e)
+
+    def record(self, exception, update=None, quiet=False):
+        """Xatoni hisoblash; oynadagi birinchi samples tasi to‘liq logga yoziladi (quiet - digestga kirmaydi)"""
+        key, name, location = fingerprint(exception)
+        now = time.monotonic()
+        self._roll_windows(now)
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = {
+                "key": key, "error": name, "location": location, "total": 0,
+                "window_start": now, "window_count": 0, "unreported": 0, "quiet": quiet,
+            }
+        group["total"] += 1
+        group["window_count"] += 1
+        group["unreported"] += 1
+        group["message"] = str(exception)[:200]
+        HANDLER_ERRORS.inc(name)
+        if group["window_count"] <= self.samples:
+            logger.error(
+                "Xato [%s] %s @ %s (%s): %s", key, name, location, describe_update(update), exception,
+                exc_info=exception
+            )
+        return group
+
+    def _roll_windows(self, now):
+        for group in self._groups.values():
+            if group["window_count"] and now - group["window_start"] >= self.window:
+                self._summarize(group, now)
+                group["window_start"] = now
+                group["window_count"] = 0
+
+    def _summarize(self, group, now):
+        skipped = group["window_count"] - self.samples
+        if skipped > 0:
+            logger.warning(
+                "Xato [%s] %s @ %s: %.0f s da %s marta (%s tasi logga yozilmadi), oxirgisi: %s",
+                group["key"], group["error"], group["location"], now - group["window_start"],
+                group["window_count"], skipped, group["message"]
+            )
+
+    def flush(self):
+        """Ochiq oynalar jamlanmasini logga yozish (to‘xtatishda)"""
+        now = time.monotonic()
+        for group in self._groups.values():
+            if group["window_count"]:
+                self._summarize(group, now)
+                group["window_start"] = now
+                group["window_count"] = 0
+
+    def digest(self):
+        """Oxirgi digestdan beri xatolar matni (xato bo‘lmasa None)"""
+        groups = [g for g in self._groups.values() if g["unreported"] and not g["quiet"]]
+        groups.sort(key=lambda g: -g["unreported"])
+        if not groups:
+            return None
+        lines = [f"⚠️ <b>Handler xatolari</b> ({sum(g['unreported'] for g in groups)} ta):"]
+        for group in groups[:self.digest_top]:
+            lines.append(
+                f"• <code>{html.escape(group['error'])}</code> × {group['unreported']} — "
+                f"{html.escape(group['location'])}\n  {html.escape(group['message'][:100])}"
+            )
+        if len(groups) > self.digest_top:
+            lines.append(f"... yana {len(groups) - self.digest_top} xil xato")
+        return "\n".join(lines)
+
+    async def notify(self):
+        """Adminlarga digest (oxirgisidan digest_interval o‘tgan bo‘lsa)"""
+        now = time.monotonic()
+        if self._digest_at is not None and now - self._digest_at < self.digest_interval:
+            return False
+        text = self.digest()
+        if text is None:
+            return False
+        self._digest_at = now
+        sent = False
+        for admin_id in self.admins.ids():
+            try:
+                await self.bot.send_message(admin_id, text, parse_mode="HTML")
+                sent = True
+            except Exception as e:
+                logger.warning("Xatolar digestini admin %s ga yuborib bo‘lmadi: %s", admin_id, e)
+        if sent:
+            # Yuborilmagan bo‘lsa hisoblar keyingi digestga qoladi
+            for group in self._groups.values():
+                group["unreported"] = 0
+        return sent
@@ -0,0 +1,85 @@
+import inspect
+import logging
+import signal
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Lifecycle:
+    """
+    Botni tartibli to‘xtatish.
+
+    Bosqichlar: yangi updatelarni qabul qilishni to‘xtatish, ishlanayotgan
+    handlerlarni kutish, buferlarni yozish (flushers), tarqatishlarni
+    to‘xtatib turish, rejalashtiruvchini to‘xtatish va bazani yopish. Har
+    bir bosqich davomiyligi logga yoziladi; bitta bosqichdagi xato
+    keyingilarini to‘xtatmaydi.
+    """
+
+    def __init__(self, dp, scheduler=None, broadcaster=None, databases=(), drain_timeout=25):
+        self.dp = dp
+        self.scheduler = scheduler
+        self.broadcaster = broadcaster
+        self.databases = list(databases)
+        self.drain_timeout = drain_timeout
+        self._flushers = []
+        self._stopped = False
+
+    def add_flusher(self, name, func):
+        """To‘xtashda chaqiriladigan funksiya (oddiy yoki async) - masalan, buferni yozish"""
+        self._flushers.append((name, func))
+        return func
+
+    async def _phase(self, name, func):
+        started = time.monotonic()
+        try:
+            result = func()
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.exception(f"To‘xtatish: '{name}' bosqichida xato: {e}")
+        logger.info("To‘xtatish: %s - %.2f s", name, time.monotonic() - started)
+
+    async def shutdown(self):
+        if self._stopped:
+            return
+        self._stopped = True
+        started = time.monotonic()
+        await self._phase("yangi updatelar to‘xtatildi", self._stop_intake)
+        await self._phase("ishlanayotgan updatelar", self._drain)
+        for name, func in self._flushers:
+            await self._phase(name, func)
+        if self.broadcaster:
+            await self._phase("tarqatishlar to‘xtatib turildi", self.broadcaster.pause)
+        if self.scheduler:
+            await self._phase("rejalashtiruvchi", self.scheduler.stop)
+        for db in self.databases:
+            await self._phase(f"baza ({db.db_name})", db.close)
+        logger.info("Bot to‘xtatildi (%.2f s).", time.monotonic() - started)
+
+    def _stop_intake(self):
+        self.dp.stop_polling()
+        scheduler = getattr(self.dp, "update_scheduler", None)
+        if scheduler is not None:
+            scheduler.accepting = False
+
+    async def _drain(self):
+        scheduler = getattr(self.dp, "update_scheduler", None)
+        if scheduler is None:
+            return
+        pending = scheduler.pending
+        if not await scheduler.join(self.drain_timeout):
+            logger.warning(f"{self.drain_timeout} s ichida {scheduler.pending} ta update tugamadi.")
+        await scheduler.stop()
+        logger.info("Navbatdagi %s ta update kutildi.", pending)
+
+
+def exit_on_sigterm():
+    """
+    SIGTERM ni KeyboardInterrupt kabi ishlash: aiogram executor shunda
+    on_shutdown ni chaqiradi (standart holatda jarayon darhol o‘ladi).
+    """
+    def _handler(signum, frame):
+        raise SystemExit(0)
+    signal.signal(signal.SIGTERM, _handler)
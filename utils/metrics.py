@@ -0,0 +1,221 @@
+import functools
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+from utils.tracing import add_span
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+DB_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels_text(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # oxirgisi +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """Yorliq qiymatlari uchun metrika (keshlab ishlatish mumkin)"""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def header(self):
+        return f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.kind}\n"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value, *labels):
+        self.labels(*labels).observe(value)
+
+    def expose(self):
+        lines = [self.header()]
+        for values, child in list(self._children.items()):
+            total = 0
+            for bound, count in zip(self.buckets + ("+Inf",), child.counts):
+                total += count
+                le = _labels_text(self.labelnames, values, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {total}\n")
+            labels = _labels_text(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {child.sum}\n")
+            lines.append(f"{self.name}_count{labels} {total}\n")
+        return "".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, *labels, amount=1):
+        self.labels(*labels).inc(amount)
+
+    def expose(self):
+        lines = [self.header()]
+        for values, child in list(self._children.items()):
+            lines.append(f"{self.name}_total{_labels_text(self.labelnames, values)} {child.value}\n")
+        return "".join(lines)
+
+
+class Gauge(_Metric):
+    """Qiymati so‘ralgan paytda funksiyadan olinadigan gauge"""
+    kind = "gauge"
+
+    def __init__(self, name, documentation, func=None):
+        super().__init__(name, documentation)
+        self.func = func
+
+    def set_function(self, func):
+        self.func = func
+
+    def expose(self):
+        if self.func is None:
+            return ""
+        try:
+            value = self.func()
+        except Exception as e:
+            logger.error(f"{self.name} gauge qiymatini olishda xato: {e}")
+            return ""
+        return f"{self.header()}{self.name} {value}\n"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def expose(self):
+        """Prometheus text formatidagi natija"""
+        return "".join(metric.expose() for metric in self._metrics)
+
+
+registry = Registry()
+
+HANDLER_LATENCY = registry.register(Histogram(
+    "bot_handler_seconds", "Handler ishlash vaqti", ("handler", "state")
+))
+DB_LATENCY = registry.register(Histogram(
+    "bot_db_seconds", "Database metodlari ishlash vaqti", ("method",), buckets=DB_BUCKETS
+))
+API_LATENCY = registry.register(Histogram(
+    "bot_api_seconds", "Bot API so‘rovlari vaqti", ("method",)
+))
+API_ERRORS = registry.register(Counter(
+    "bot_api_errors", "Bot API xatolari", ("method", "error")
+))
+HANDLER_ERRORS = registry.register(Counter(
+    "bot_handler_errors", "Handler xatolari (errors_handler)", ("error",)
+))
+FSM_SESSIONS = registry.register(Gauge("bot_fsm_sessions", "Holati bor FSM sessiyalari"))
+PENDING_REMINDERS = registry.register(Gauge("bot_pending_reminders", "Kutilayotgan eslatmalar"))
+
+
+def instrument_methods(cls, histogram, exclude=("close",)):
+    """
+    Klassning ochiq metodlarini o‘rab, har bir chaqiruv vaqtini histogramga
+    (va joriy update tracega span sifatida) yozish
+    """
+    for name, attr in list(vars(cls).items()):
+        if name.startswith("_") or name in exclude or not callable(attr):
+            continue
+        setattr(cls, name, _timed(attr, histogram.labels(name), name))
+    return cls
+
+
+def _timed(func, child, name, kind="db"):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            duration = time.perf_counter() - started
+            child.observe(duration)
+            add_span(kind, name, started, duration)
+    return wrapper
+
+
+class MetricsServer:
+    """/metrics manzilini beruvchi lokal HTTP server"""
+
+    def __init__(self, registry=registry):
+        self.registry = registry
+        self._runner = None
+
+    async def start(self, host="127.0.0.1", port=9100):
+        from aiohttp import web
+
+        async def handle(request):
+            return web.Response(text=self.registry.expose(), content_type="text/plain", charset="utf-8")
+
+        app = web.Application()
+        app.router.add_get("/metrics", handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        logger.info("Metrikalar: http://%s:%s/metrics", host, port)
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
@@ -1,2 +1,5 @@
 from .throttling import rate_limit
+from .cache import TTLCache, ChatCache
+from .idempotency import IdempotencyGuard
+from .callback_data import CallbackCodec, CallbackRouter
 from . import logging
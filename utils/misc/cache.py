@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Muddati (TTL) va hajmi cheklangan LRU kesh"""
+
+    def __init__(self, maxsize=1024, ttl=600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        """Qiymatni olish (muddati o‘tgan bo‘lsa default qaytadi)"""
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING:
+            return default
+        value, expires_at = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl=None):
+        """Qiymatni saqlash, eng eski yozuvlarni siqib chiqarish"""
+        self._data[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        item = self._data.pop(key, _MISSING)
+        return default if item is _MISSING else item[0]
+
+    def clear(self):
+        self._data.clear()
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ChatCache:
+    """bot.get_chat natijalarini keshlash (bir xil so‘rovlar bittaga birlashtiriladi)"""
+
+    def __init__(self, bot, maxsize=512, ttl=30 * 60):
+        self.bot = bot
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._pending = {}
+
+    async def get(self, chat_id):
+        """Chat profilini olish: avval keshdan, bo‘lmasa API dan"""
+        key = str(chat_id)
+        chat = self._cache.get(key)
+        if chat is not None:
+            return chat
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(key))
+            self._pending[key] = task
+        # shield: kutayotganlardan biri bekor qilinsa, umumiy so‘rov to‘xtamaydi
+        return await asyncio.shield(task)
+
+    async def get_many(self, chat_ids):
+        """Bir nechta profilni parallel olish: {str(chat_id): chat yoki None}"""
+        keys = list(dict.fromkeys(str(chat_id) for chat_id in chat_ids))
+        chats = await asyncio.gather(*(self._get_or_none(key) for key in keys))
+        return dict(zip(keys, chats))
+
+    def invalidate(self, chat_id):
+        self._cache.pop(str(chat_id))
+
+    async def _get_or_none(self, key):
+        try:
+            return await self.get(key)
+        except Exception as e:
+            logger.error(f"Chat {key} ma'lumotini olishda xato: {e}")
+            return None
+
+    async def _fetch(self, key):
+        try:
+            chat = await self.bot.get_chat(key)
+            self._cache.set(key, chat)
+            return chat
+        finally:
+            self._pending.pop(key, None)
@@ -0,0 +1,151 @@
+import inspect
+import logging
+
+from aiogram import Dispatcher, types
+from aiogram.dispatcher import FSMContext
+from aiogram.dispatcher.filters.state import State
+
+logger = logging.getLogger(__name__)
+
+SEP = ":"
+MAX_LENGTH = 64  # Telegram callback_data limiti (bayt)
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def encode_int(value):
+    """Butun sonni base36 ko‘rinishida (qisqaroq) yozish"""
+    value = int(value)
+    if value < 0:
+        return "-" + encode_int(-value)
+    text = ""
+    while True:
+        value, rem = divmod(value, 36)
+        text = DIGITS[rem] + text
+        if not value:
+            return text
+
+
+class CallbackCodec:
+    """
+    callback_data kodeki: "prefiks:qiymat1:qiymat2".
+
+    Maydonlar (nom, tur) ko‘rinishida beriladi; int maydonlar base36 da
+    yoziladi. Natija 64 baytdan oshsa yoki qiymatda ajratuvchi bo‘lsa
+    ValueError ko‘tariladi.
+    """
+
+    def __init__(self, prefix, *fields):
+        if SEP in prefix:
+            raise ValueError(f"Prefiksda '{SEP}' bo‘lishi mumkin emas: {prefix}")
+        self.prefix = prefix
+        self.fields = [field if isinstance(field, tuple) else (field, str) for field in fields]
+
+    def new(self, *args, **kwargs):
+        values = dict(zip((name for name, _ in self.fields), args), **kwargs)
+        parts = [self.prefix]
+        for name, kind in self.fields:
+            if name not in values:
+                raise ValueError(f"'{self.prefix}' uchun '{name}' qiymati berilmadi")
+            value = encode_int(values[name]) if kind is int else str(values[name])
+            if SEP in value:
+                raise ValueError(f"'{name}' qiymatida '{SEP}' bo‘lishi mumkin emas")
+            parts.append(value)
+        data = SEP.join(parts)
+        if len(data.encode()) > MAX_LENGTH:
+            raise ValueError(f"callback_data {MAX_LENGTH} baytdan uzun: {data}")
+        return data
+
+    def parse(self, data):
+        """callback_data ni maydonlar lug‘atiga aylantirish"""
+        prefix, *parts = data.split(SEP)
+        if prefix != self.prefix or len(parts) != len(self.fields):
+            raise ValueError(f"'{self.prefix}' uchun noto‘g‘ri callback_data: {data}")
+        return {
+            name: int(part, 36) if kind is int else part
+            for (name, kind), part in zip(self.fields, parts)
+        }
+
+
+class CallbackRouter:
+    """
+    callback_query larni prefiks bo‘yicha lug‘at orqali (O(1)) tarqatish.
+
+    Dispatcherga bitta handler ro‘yxatdan o‘tadi; u prefiksga mos handlerni
+    topadi va FSM holatini tekshiradi. state parametri aiogramdagidek:
+    None - holat yo‘q bo‘lganda, '*' - har qanday holatda. Mos handler
+    bo‘lmasa (eskirgan tugma yoki boshqa holat) callback stale_text bilan
+    javoblanadi - aks holda mijozda tugma "yuklanmoqda" holatida qoladi.
+    """
+
+    def __init__(self, dp: Dispatcher, stale_text="⚠️ Bu tugma eskirgan. Menyuni qaytadan oching."):
+        self.stale_text = stale_text
+        self._routes = {}  # prefiks -> [(holatlar, handler, kodek, parametrlar)]
+        self._aliases = {}  # eski "nom_" prefiksi -> (kodek, qo‘shimcha maydonlar)
+        dp.register_callback_query_handler(self._dispatch, state='*')
+
+    def register(self, codec, state=None):
+        """Dekorator: codec - CallbackCodec yoki oddiy callback_data satri"""
+        prefix = codec.prefix if isinstance(codec, CallbackCodec) else codec
+        states = self._resolve_states(state)
+
+        def decorator(handler):
+            params = set(inspect.signature(handler).parameters)
+            self._routes.setdefault(prefix, []).append((states, handler, codec, params))
+            return handler
+        return decorator
+
+    def alias(self, old_prefix, codec, **fixed):
+        """Eski formatdagi tugmalar ("accept_15") uchun: oxirgi maydon qoldiqdan olinadi"""
+        self._aliases[old_prefix] = (codec, fixed)
+
+    @staticmethod
+    def _resolve_states(state):
+        if state is None or state == '*':
+            return state
+        if not isinstance(state, (list, tuple, set)):
+            state = [state]
+        return {item.state if isinstance(item, State) else item for item in state}
+
+    def _resolve(self, data):
+        prefix = data.split(SEP, 1)[0]
+        if prefix in self._routes:
+            return prefix, data
+        old_prefix, _, rest = data.rpartition("_")
+        alias = self._aliases.get(old_prefix + "_")
+        if alias and rest:
+            codec, fixed = alias
+            last, kind = codec.fields[-1]
+            try:
+                value = int(rest) if kind is int else rest
+                return codec.prefix, codec.new(**fixed, **{last: value})
+            except ValueError:
+                return None, data
+        return None, data
+
+    def handler_for(self, data):
+        """callback_data ga mos birinchi handler (masalan, rate_limit sozlamasini o‘qish uchun)"""
+        prefix, _ = self._resolve(data or "")
+        routes = self._routes.get(prefix)
+        return routes[0][1] if routes else None
+
+    async def _dispatch(self, callback_query: types.CallbackQuery, state: FSMContext):
+        prefix, data = self._resolve(callback_query.data or "")
+        routes = self._routes.get(prefix)
+        if not routes:
+            await callback_query.answer(self.stale_text, show_alert=True)
+            return
+        current = await state.get_state()
+        for states, handler, codec, params in routes:
+            if states == '*' or (states is None and current is None) or (states and current in states):
+                kwargs = {}
+                if "state" in params:
+                    kwargs["state"] = state
+                if "callback_data" in params and isinstance(codec, CallbackCodec):
+                    try:
+                        kwargs["callback_data"] = codec.parse(data)
+                    except ValueError as e:
+                        logger.warning(f"Noto‘g‘ri callback_data: {e}")
+                        await callback_query.answer()
+                        return
+                return await handler(callback_query, **kwargs)
+        await callback_query.answer(self.stale_text, show_alert=True)
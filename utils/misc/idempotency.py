@@ -0,0 +1,28 @@
+from .cache import TTLCache
+
+
+class IdempotencyGuard:
+    """
+    Takroriy amallarni aniqlash.
+
+    claim(key) kalit muddat ichida birinchi marta ko‘rilganda True, takroriy
+    bo‘lsa False qaytaradi. Tekshirish va belgilash orasida await yo‘q -
+    event loop ichida atomar. Kalitlar: callback query id, FSM sessiyasidagi
+    buyurtma tokeni, (buyurtma, amal) juftligi.
+    """
+
+    def __init__(self, maxsize=4096, ttl=600):
+        self._seen = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def claim(self, key, ttl=None):
+        if key in self._seen:
+            return False
+        self._seen.set(key, True, ttl)
+        return True
+
+    def release(self, key):
+        """Amal bajarilmadi (xato) - kalitni qayta ishlatishga ruxsat berish"""
+        self._seen.pop(key)
+
+    def __len__(self):
+        return len(self._seen)
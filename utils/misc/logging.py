@@ -1,5 +1,144 @@
+import atexit
+import json
 import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
 
-logging.basicConfig(format=u'%(filename)s [LINE:%(lineno)d] #%(levelname)-8s [%(asctime)s]  %(message)s',
-                    level=logging.INFO,
-                    )
+TEXT_FORMAT = u'%(filename)s [LINE:%(lineno)d] #%(levelname)-8s [%(asctime)s]  %(message)s'
+
+_listener = None
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Tez-tez takrorlanadigan xabarlarni cheklash.
+
+    Bir xil logger va shablondagi (record.msg) xabarlardan har interval
+    soniyada faqat birinchi burst tasi o‘tadi, qolganlari sanaladi va keyingi
+    oynadagi birinchi xabarga record.suppressed sifatida qo‘shiladi.
+    WARNING va undan yuqorisi doim o‘tadi. Shablon bo‘yicha guruhlash uchun
+    xabarlar lazy formatda yozilishi kerak: logger.info("... %s", x).
+    """
+
+    max_keys = 10000
+
+    def __init__(self, burst=20, interval=60.0):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self._windows = {}  # (logger, shablon) -> [oyna boshi, o‘tganlar, o‘tkazib yuborilganlar]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not self.burst:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                if window is None and len(self._windows) >= self.max_keys:
+                    self._windows.clear()
+                suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if window[1] < self.burst:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record):
+        text = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            text += f" (+{suppressed} ta shunday xabar o‘tkazib yuborildi)"
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    """Har bir yozuv bitta JSON qator (log yig‘uvchi tizimlar uchun)"""
+
+    def format(self, record):
+        data = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "file": record.filename,
+            "line": record.lineno,
+            "process": record.process,
+        }
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            data["suppressed"] = suppressed
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class _LazyQueueHandler(QueueHandler):
+    """Yozuvni formatlamasdan navbatga qo‘yadi - formatlash ham listener oqimida"""
+
+    def prepare(self, record):
+        # Navbat shu jarayon ichida: pickle kerak emas, msg % args keyin hisoblanadi
+        return record
+
+
+def setup_logging(level="INFO", levels=None, json_format=False, log_file="", sample_burst=20, sample_interval=60.0):
+    """
+    Loglarni markazlashgan sozlash.
+
+    Root loggerga QueueHandler qo‘yiladi: event loop faqat yozuvni navbatga
+    qo‘shadi, formatlash va stderr/faylga yozish QueueListener oqimida
+    bajariladi. levels - modul darajalari ({"db.slow": "WARNING", ...}).
+    Qayta chaqirilsa avvalgi listener to‘xtatilib, yangisi o‘rnatiladi.
+    """
+    global _listener
+    stop_logging()
+
+    formatter = JsonFormatter() if json_format else TextFormatter(TEXT_FORMAT)
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, encoding="utf-8"))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    records = queue.SimpleQueue()
+    queue_handler = _LazyQueueHandler(records)
+    queue_handler.addFilter(SamplingFilter(sample_burst, sample_interval))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    for name, module_level in (levels or {}).items():
+        logging.getLogger(name).setLevel(module_level.upper())
+
+    _listener = QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Navbatdagi yozuvlarni yozib, listener oqimini to‘xtatish"""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+# Jarayon oxirida (lifecycle bosqichlari loglari ham) navbat bo‘shatiladi
+atexit.register(stop_logging)
@@ -0,0 +1,73 @@
+import time
+from array import array
+from collections import OrderedDict
+
+
+class TokenBucketLimiter:
+    """
+    Token bucket cheklovchi.
+
+    Har bir kalit (masalan, foydalanuvchi + handler) uchun tokenlar soni va
+    oxirgi to‘ldirilgan vaqt oldindan ajratilgan massivlarda turadi; lug‘at
+    faqat kalit -> katak raqamini saqlaydi. Uzoq ishlatilmagan kataklar
+    bo‘shatiladi, joy tugasa eng eski katak qayta ishlatiladi, shuning uchun
+    xotira hech qachon capacity dan oshmaydi.
+    """
+
+    def __init__(self, capacity=4096, idle_ttl=600):
+        self.capacity = capacity
+        self.idle_ttl = idle_ttl
+        self._tokens = array('d', bytes(8 * capacity))
+        self._stamps = array('d', bytes(8 * capacity))
+        self._notified = bytearray(capacity)  # rad etilgani haqida xabar berilganmi
+        self._slots = OrderedDict()  # kalit -> katak (eng eskisi boshida)
+        self._free = list(range(capacity - 1, -1, -1))
+
+    def __len__(self):
+        return len(self._slots)
+
+    def consume(self, key, rate, burst=1):
+        """
+        Bitta token olish. rate - bir token necha soniyada tiklanadi, burst -
+        ketma-ket ruxsat etilgan so‘rovlar soni. (ruxsat, birinchi_rad) qaytaradi.
+        """
+        now = time.monotonic()
+        self._evict_idle(now)
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._allocate(key)
+            self._tokens[slot] = burst
+            self._stamps[slot] = now
+            self._notified[slot] = 0
+        else:
+            self._slots.move_to_end(key)
+            if rate > 0:
+                refill = (now - self._stamps[slot]) / rate
+                self._tokens[slot] = min(burst, self._tokens[slot] + refill)
+            else:
+                self._tokens[slot] = burst
+            self._stamps[slot] = now
+        if self._tokens[slot] >= 1:
+            self._tokens[slot] -= 1
+            self._notified[slot] = 0
+            return True, False
+        first = not self._notified[slot]
+        self._notified[slot] = 1
+        return False, first
+
+    def _allocate(self, key):
+        if not self._free:
+            # Joy tugadi: eng uzoq ishlatilmagan kalit chiqariladi
+            _, slot = self._slots.popitem(last=False)
+            self._free.append(slot)
+        slot = self._free.pop()
+        self._slots[key] = slot
+        return slot
+
+    def _evict_idle(self, now):
+        while self._slots:
+            key, slot = next(iter(self._slots.items()))
+            if now - self._stamps[slot] < self.idle_ttl:
+                break
+            del self._slots[key]
+            self._free.append(slot)
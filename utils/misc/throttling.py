@@ -1,9 +1,10 @@
-def rate_limit(limit: int, key=None):
+def rate_limit(limit: float, key=None, burst: int = None):
     """
     Decorator for configuring rate limit and key in different functions.
 
-    :param limit:
-    :param key:
+    :param limit: seconds needed to restore one token
+    :param key: bucket key (defaults to the handler name)
+    :param burst: how many calls may be made back to back
     :return:
     """
 
@@ -11,6 +12,8 @@ def rate_limit(limit: int, key=None):
         setattr(func, 'throttling_rate_limit', limit)
         if key:
             setattr(func, 'throttling_key', key)
+        if burst:
+            setattr(func, 'throttling_burst', burst)
         return func
 
     return decorator
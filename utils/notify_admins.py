@@ -5,8 +5,8 @@ from aiogram import Dispatcher
 from data.config import ADMINS
 
 
-async def on_startup_notify(dp: Dispatcher):
-    for admin in ADMINS:
+async def on_startup_notify(dp: Dispatcher, admins=ADMINS):
+    for admin in admins:
         try:
             await dp.bot.send_message(admin, "Bot faollashdi!")
 
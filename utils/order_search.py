@@ -0,0 +1,50 @@
+from utils.db_api.database import search_terms
+from utils.misc.cache import TTLCache
+
+
+class OrderSearch:
+    """
+    Buyurtmalarni ID, ism yoki username prefiksi bo‘yicha qidirish.
+
+    Natijalar qisqa muddat prefiks bo‘yicha keshlanadi. Agar qisqaroq prefiks
+    natijasi to‘liq bo‘lsa (limitdan kam), uzunroq so‘rov bazaga bormasdan
+    shu natijadan filtrlanadi - tez yozilganda har bir harf uchun so‘rov
+    yuborilmaydi.
+    """
+
+    def __init__(self, db, limit=20, ttl=10, maxsize=256):
+        self.db = db
+        self.limit = limit
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    @staticmethod
+    def normalize(query):
+        return [word.lstrip('#@') for word in query.lower().split() if word.lstrip('#@')]
+
+    def search(self, query):
+        """So‘rovdagi har bir so‘z buyurtmaning biror kalit so‘ziga prefiks bo‘lishi kerak"""
+        words = self.normalize(query)
+        if not words:
+            return []
+        # Bazaga eng uzun (eng tanlovchi) so‘z bo‘yicha boriladi
+        orders = self._lookup(max(words, key=len))
+        return [order for order in orders if self._matches(order, words)]
+
+    def _lookup(self, prefix):
+        cached = self._cache.get(prefix)
+        if cached is not None:
+            return cached
+        for i in range(len(prefix) - 1, 0, -1):
+            shorter = self._cache.get(prefix[:i])
+            if shorter is not None and len(shorter) < self.limit:
+                orders = [order for order in shorter if self._matches(order, [prefix])]
+                break
+        else:
+            orders = self.db.search_orders(prefix, self.limit)
+        self._cache.set(prefix, orders)
+        return orders
+
+    @staticmethod
+    def _matches(order, words):
+        terms = search_terms(order[0], order[2], order[3])
+        return all(any(term.startswith(word) for term in terms) for word in words)
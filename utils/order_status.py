@@ -0,0 +1,53 @@
+from collections import namedtuple
+
+PENDING = "Jarayonda"
+ACCEPTED = "Qabul qilindi"
+REJECTED = "Rad etildi"
+DONE = "Bajarildi"
+
+# amal -> (joriy holat, yangi holat): Jarayonda -> Qabul qilindi / Rad etildi, Qabul qilindi -> Bajarildi
+TRANSITIONS = {
+    "accept": (PENDING, ACCEPTED),
+    "reject": (PENDING, REJECTED),
+    "complete": (ACCEPTED, DONE),
+}
+
+APPLIED = "applied"
+ALREADY_HANDLED = "already_handled"
+NOT_FOUND = "not_found"
+FAILED = "failed"
+
+# result: APPLIED, ALREADY_HANDLED, NOT_FOUND yoki FAILED; order - yangilangan qator (faqat APPLIED da);
+# status - buyurtmaning hozirgi holati (FAILED va NOT_FOUND da None)
+Transition = namedtuple("Transition", ["result", "order", "status"])
+
+
+class OrderStateMachine:
+    """
+    Buyurtma holatlari o‘tishlari.
+
+    Har bir o‘tish bazada bitta shartli UPDATE (WHERE status = joriy holat)
+    bilan bajariladi: ikki admin bir buyurtmani bir vaqtda qabul qilsa,
+    faqat bittasi APPLIED oladi, ikkinchisi - ALREADY_HANDLED. Yakunlashni
+    faqat buyurtmani tasdiqlagan admin qila oladi.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def apply(self, order_id, action, admin_id):
+        expected, status = TRANSITIONS[action]
+        if action == "accept":
+            result = self.db.transition_order_status(order_id, expected, status, confirmed_by_admin_id=admin_id)
+        elif action == "complete":
+            result = self.db.transition_order_status(order_id, expected, status, owner_id=admin_id)
+        else:
+            result = self.db.transition_order_status(order_id, expected, status, actor_id=admin_id)
+        if result is False:
+            return Transition(FAILED, None, None)
+        order, current = result
+        if order is not None:
+            return Transition(APPLIED, order, current)
+        if current is None:
+            return Transition(NOT_FOUND, None, None)
+        return Transition(ALREADY_HANDLED, None, current)
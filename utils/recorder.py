@@ -0,0 +1,170 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+SCRUB_FIELDS = ("ids", "names", "phone", "text")
+NAME_KEYS = {"first_name", "last_name", "username", "title"}
+TEXT_KEYS = {"text", "caption", "query"}
+ID_PARENTS = {"from", "chat", "user", "sender_chat", "forward_from", "contact"}
+# 9 va undan ko‘p raqamli ketma-ketlik (bo‘shliq, "-" va qavslar bilan): +998 90 123-45-67, 901234567
+PHONE = re.compile(r"\+?\d(?:[\s\-()]*\d){8,}")
+DIGIT = re.compile(r"\d")
+DATE = re.compile(r"^\d{2}\.\d{2}\.\d{4}$")
+ID_SPACE = 10 ** 10
+
+
+def _digest(salt, value):
+    return hashlib.sha256(f"{salt}:{value}".encode()).hexdigest()
+
+
+def _mask_phone(match):
+    """Raqamlar 0 ga almashtiriladi, +998 va ko‘rinish saqlanadi (replayda tekshiruv natijasi o‘zgarmaydi)"""
+    value = match.group()
+    head = "+998" if value.startswith("+998") else ""
+    return head + DIGIT.sub("0", value[len(head):])
+
+
+def worker_path(path, worker):
+    """data/updates.jsonl.gz -> data/updates.<worker>.jsonl.gz"""
+    directory, name = os.path.split(path)
+    stem, dot, ext = name.partition(".")
+    return os.path.join(directory, f"{stem}.{worker}{dot}{ext}")
+
+
+class Scrubber:
+    """
+    Updatedan shaxsiy ma’lumotlarni olib tashlash.
+
+    fields: ids - foydalanuvchi/chat ID lari barqaror psevdonimga (keep_ids
+    dagilar, masalan adminlar, o‘zgarmaydi); names - ism va username; phone -
+    telefon raqamlari (9 va undan ko‘p raqamli har qanday ketma-ketlik);
+    text - erkin matn bir xil uzunlikdagi "x" larga. Buyruqlar, qisqa
+    raqamlar, sanalar va keep_texts dagi menyu tugmalari saqlanadi - replayda
+    handlerlar shu yo‘ldan o‘tadi.
+    """
+
+    def __init__(self, fields=SCRUB_FIELDS, salt="", keep_ids=(), keep_texts=()):
+        unknown = set(fields) - set(SCRUB_FIELDS)
+        if unknown:
+            raise ValueError(f"Noma’lum scrub maydonlari: {', '.join(sorted(unknown))}")
+        self.fields = set(fields)
+        self.salt = salt
+        self.keep_ids = {int(user_id) for user_id in keep_ids}
+        self.keep_texts = frozenset(keep_texts)
+
+    def pseudo_id(self, value):
+        if value in self.keep_ids:
+            return value
+        # Ishora saqlanadi: guruh chatlari manfiy ID da qoladi
+        pseudo = int(_digest(self.salt, value)[:12], 16) % ID_SPACE + 1
+        return -pseudo if value < 0 else pseudo
+
+    def pseudo_name(self, value):
+        return "u" + _digest(self.salt, value)[:8]
+
+    def scrub_text(self, text, nested=False):
+        if "phone" in self.fields:
+            text = PHONE.sub(_mask_phone, text)
+        if "text" not in self.fields:
+            return text
+        if nested:
+            # Bot xabari (callback_query.message): mijoz ma’lumotlari bo‘lishi mumkin
+            return "x" * len(text)
+        stripped = text.strip()
+        if not stripped or stripped in self.keep_texts or stripped.startswith("/") or DATE.match(stripped):
+            return text
+        if stripped.isdigit() or PHONE.fullmatch(stripped):
+            # Qisqa raqam (varaq soni) saqlanadi; telefon raqami yuqorida niqoblangan bo‘lsa - o‘sha ko‘rinishda
+            if "phone" in self.fields or not PHONE.fullmatch(stripped):
+                return text
+        return "x" * len(text)
+
+    def scrub(self, value, parent=None, nested=False):
+        if isinstance(value, list):
+            return [self.scrub(item, parent, nested) for item in value]
+        if not isinstance(value, dict):
+            return value
+        result = {}
+        for key, item in value.items():
+            if isinstance(item, (dict, list)):
+                result[key] = self.scrub(item, key, nested or (key == "message" and parent == "callback_query"))
+            elif isinstance(item, str) and key in TEXT_KEYS:
+                result[key] = self.scrub_text(item, nested)
+            elif isinstance(item, str) and key in NAME_KEYS and "names" in self.fields:
+                result[key] = self.pseudo_name(item)
+            elif key == "phone_number" and "phone" in self.fields:
+                result[key] = "+998" + "0" * 9
+            elif isinstance(item, int) and "ids" in self.fields and (
+                    (key == "id" and parent in ID_PARENTS) or key == "user_id"):
+                result[key] = self.pseudo_id(item)
+            else:
+                result[key] = item
+        return result
+
+
+class UpdateRecorder:
+    """
+    Kelgan updatelarni gzip JSONL faylga yozish (replay uchun).
+
+    Har bir qator: {"ts": unix vaqt, "update": tozalangan update}. Yozuvlar
+    buferda yig‘iladi va flush_every tadan keyin (yoki flush/close da) faylga
+    qo‘shiladi - har flushdan keyin fayl o‘qiladigan holatda qoladi.
+    """
+
+    def __init__(self, path, scrubber: Scrubber = None, flush_every=100):
+        self.path = path
+        self.scrubber = scrubber
+        self.flush_every = flush_every
+        self.recorded = 0
+        self._buffer = []
+        self._file = None
+
+    def record(self, data: dict):
+        if self.scrubber:
+            data = self.scrubber.scrub(data)
+        self._buffer.append(json.dumps({"ts": round(time.time(), 3), "update": data}, ensure_ascii=False))
+        self.recorded += 1
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        lines, self._buffer = self._buffer, []
+        try:
+            if self._file is None:
+                self._file = gzip.open(self.path, "at", encoding="utf-8")
+            self._file.write("\n".join(lines) + "\n")
+            self._file.flush()
+        except OSError as e:
+            logger.error(f"{self.path} ga {len(lines)} ta updateni yozishda xato: {e}")
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_recording(*paths):
+    """Yozib olingan updatelar (bir nechta fayl bo‘lsa vaqt bo‘yicha birlashtiriladi)"""
+    records = []
+    for path in paths:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            try:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue
+            except EOFError:
+                # Jarayon to‘satdan to‘xtagan bo‘lsa fayl oxiri to‘liq bo‘lmaydi
+                logger.warning(f"{path} to‘liq emas, o‘qilgan qismi ishlatiladi.")
+    records.sort(key=lambda record: record["ts"])
+    return records
@@ -0,0 +1,166 @@
+import asyncio
+import heapq
+import logging
+import time
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+Job = namedtuple("Job", ["job_id", "kind", "order_id", "chat_id", "run_at"])
+
+
+class JobScheduler:
+    """
+    Bazada saqlanadigan vazifalar rejalashtiruvchisi.
+
+    Vazifalar Jobs jadvalida turadi, xotirada esa min-heap orqali bitta
+    taymer tsikli boshqaradi. Bot qayta ishga tushganda kechikkan vazifalar
+    bazadan tiklanadi va darhol bajariladi.
+    """
+
+    MAX_SLEEP = 60  # soat siljishiga qarshi maksimal kutish (soniya)
+
+    def __init__(self, db, batch_size=50, poll_interval=None):
+        self.db = db
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._last_id = 0  # bazadan o‘qilgan eng katta job_id
+        self._polled_at = 0
+        self._handlers = {}
+        self._heap = []
+        self._jobs = {}  # job_id -> Job (bekor qilinganlari o‘chiriladi)
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._stopping = False
+
+    def register(self, kind, handler):
+        """Vazifa turi uchun handler: async def handler(jobs: list[Job])"""
+        self._handlers[kind] = handler
+        return handler
+
+    def schedule(self, kind, delay, order_id=None, chat_id=None):
+        """Vazifani delay soniyadan keyin bajarishga rejalashtirish"""
+        return self.schedule_at(kind, time.time() + delay, order_id=order_id, chat_id=chat_id)
+
+    def schedule_at(self, kind, run_at, order_id=None, chat_id=None):
+        """Vazifani aniq vaqtga (unix vaqt) rejalashtirish"""
+        job_id = self.db.add_job(kind, run_at, order_id=order_id, chat_id=chat_id)
+        if job_id is None:
+            return None
+        if self._task is None:
+            # Taymer boshqa jarayonda: vazifani u bazadan o‘qib oladi
+            return job_id
+        self._push(Job(job_id, kind, order_id, chat_id, run_at))
+        return job_id
+
+    def cancel(self, order_id, kind=None):
+        """Buyurtmaga tegishli vazifalarni bekor qilish"""
+        cancelled = self.db.cancel_jobs(order_id, kind)
+        for job_id, job in list(self._jobs.items()):
+            if job.order_id == order_id and (kind is None or job.kind == kind):
+                # Heapdan keyinroq (navbati kelganda) tashlab yuboriladi
+                del self._jobs[job_id]
+        return cancelled
+
+    @property
+    def pending_count(self):
+        return len(self._jobs)
+
+    def start(self):
+        """Bazadagi vazifalarni tiklash va taymer tsiklini ishga tushirish"""
+        if self._task:
+            return
+        now = time.time()
+        rows = self.db.get_pending_jobs()
+        for row in rows:
+            self._push(Job(*row), wake=False)
+        self._last_id = max((row[0] for row in rows), default=0)
+        self._polled_at = time.monotonic()
+        overdue = sum(1 for row in rows if row[4] <= now)
+        logger.info("Rejalashtiruvchi: %s ta vazifa tiklandi, %s tasi kechikkan.", len(rows), overdue)
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self, timeout=10):
+        """
+        Taymer tsiklini to‘xtatish (vazifalar bazada qoladi). Bajarilayotgan
+        paket timeout gacha tugashi kutiladi, keyin bekor qilinadi - bunday
+        vazifalar pending holatida qoladi va keyingi ishga tushishda bajariladi.
+        """
+        if self._task:
+            self._stopping = True
+            self._wakeup.set()
+            try:
+                await asyncio.wait_for(asyncio.shield(self._task), timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Rejalashtiruvchi o‘z vaqtida to‘xtamadi, bekor qilinmoqda.")
+                self._task.cancel()
+                try:
+                    await self._task
+                except asyncio.CancelledError:
+                    pass
+            self._task = None
+            self._stopping = False
+
+    def _push(self, job, wake=True):
+        self._jobs[job.job_id] = job
+        heapq.heappush(self._heap, (job.run_at, job.job_id))
+        if wake and self._heap[0][1] == job.job_id:
+            self._wakeup.set()
+
+    def _poll(self):
+        """Boshqa jarayonlar yaratgan yangi vazifalarni bazadan o‘qish"""
+        self._polled_at = time.monotonic()
+        rows = self.db.get_pending_jobs(after_id=self._last_id)
+        for row in rows:
+            if row[0] not in self._jobs:
+                self._push(Job(*row), wake=False)
+            self._last_id = max(self._last_id, row[0])
+
+    def _pop_due(self, now):
+        batch = []
+        while self._heap and self._heap[0][0] <= now and len(batch) < self.batch_size:
+            _, job_id = heapq.heappop(self._heap)
+            job = self._jobs.pop(job_id, None)
+            if job:
+                batch.append(job)
+        return batch
+
+    async def _run(self):
+        while not self._stopping:
+            self._wakeup.clear()
+            if self.poll_interval and time.monotonic() - self._polled_at >= self.poll_interval:
+                self._poll()
+            now = time.time()
+            batch = self._pop_due(now)
+            if batch:
+                await self._dispatch(batch)
+                continue
+            timeout = self.poll_interval or self.MAX_SLEEP
+            if self._heap:
+                timeout = min(max(self._heap[0][0] - now, 0), timeout)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _dispatch(self, batch):
+        if self.poll_interval:
+            # Boshqa jarayonda bekor qilinganlari tashlab yuboriladi
+            pending = self.db.get_pending_job_ids([job.job_id for job in batch])
+            batch = [job for job in batch if job.job_id in pending]
+        by_kind = {}
+        for job in batch:
+            by_kind.setdefault(job.kind, []).append(job)
+        for kind, jobs in by_kind.items():
+            handler = self._handlers.get(kind)
+            job_ids = [job.job_id for job in jobs]
+            if handler is None:
+                logger.error(f"'{kind}' turidagi vazifa uchun handler topilmadi.")
+                self.db.finish_jobs(job_ids, status='failed')
+                continue
+            try:
+                await handler(jobs)
+                self.db.finish_jobs(job_ids)
+            except Exception as e:
+                logger.exception(f"'{kind}' vazifalarini bajarishda xato: {e}")
+                self.db.finish_jobs(job_ids, status='failed')
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import multiprocessing
+import signal
+import time
+from queue import Full
+
+from aiogram import Bot, Dispatcher, types
+from aiogram.utils.exceptions import TelegramAPIError, NetworkError
+
+from utils.update_queue import UpdateScheduler
+
+logger = logging.getLogger(__name__)
+
+
+def shard_for(update: types.Update, workers):
+    """Update qaysi ishchi jarayonga tegishli (chat_id bo‘yicha)"""
+    return abs(UpdateScheduler.lane_key(update)) % workers
+
+
+class Supervisor:
+    """
+    Ko‘p jarayonli rejim.
+
+    Supervisor getUpdates orqali updatelarni oladi va chat_id xeshi bo‘yicha
+    N ta ishchi jarayonga navbat orqali tarqatadi. Bitta chat har doim bitta
+    ishchiga tushadi, shuning uchun chat ichidagi tartib saqlanadi. Umumiy
+    holat (FSM, narxlar, adminlar, vazifalar) jarayonlar orasida bazada
+    turadi. Ishchi jarayon to‘xtab qolsa, qayta ishga tushiriladi.
+    """
+
+    def __init__(self, bot: Bot, target, workers=2, queue_size=100, poll_timeout=20):
+        self.bot = bot
+        self.target = target  # target(worker_id, queue) - ishchi jarayon funksiyasi
+        self.workers = workers
+        self.poll_timeout = poll_timeout
+        self._ctx = multiprocessing.get_context("spawn")
+        self._queues = [self._ctx.Queue(maxsize=queue_size) for _ in range(workers)]
+        self._processes = [None] * workers
+        self._running = False
+
+    def run(self):
+        loop = asyncio.get_event_loop()
+        for worker_id in range(self.workers):
+            self._spawn(worker_id)
+        task = asyncio.ensure_future(self._poll())
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, task.cancel)
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._shutdown()
+            loop.run_until_complete(self._close_session())
+
+    def _spawn(self, worker_id):
+        process = self._ctx.Process(
+            target=self.target, args=(worker_id, self._queues[worker_id]),
+            name=f"bot-worker-{worker_id}", daemon=False
+        )
+        process.start()
+        self._processes[worker_id] = process
+        logger.info("Ishchi #%s ishga tushdi (pid %s).", worker_id, process.pid)
+
+    def _check_workers(self):
+        for worker_id, process in enumerate(self._processes):
+            if not process.is_alive():
+                logger.error(f"Ishchi #{worker_id} to‘xtab qoldi (kod {process.exitcode}), qayta ishga tushirilmoqda.")
+                self._spawn(worker_id)
+
+    async def _poll(self):
+        loop = asyncio.get_event_loop()
+        Bot.set_current(self.bot)
+        offset = None
+        while True:
+            self._check_workers()
+            try:
+                updates = await self.bot.get_updates(offset=offset, limit=100, timeout=self.poll_timeout)
+            except NetworkError as e:
+                logger.warning(f"getUpdates: tarmoq xatosi: {e}")
+                await asyncio.sleep(5)
+                continue
+            except TelegramAPIError as e:
+                logger.error(f"getUpdates xatosi: {e}")
+                await asyncio.sleep(5)
+                continue
+            if not updates:
+                continue
+            offset = updates[-1].update_id + 1
+            shards = {}
+            for update in updates:
+                shards.setdefault(shard_for(update, self.workers), []).append(update.to_python())
+            for worker_id, batch in shards.items():
+                # Ishchi navbati to‘lsa shu yerda kutiladi (backpressure)
+                await loop.run_in_executor(None, self._queues[worker_id].put, batch)
+
+    def _shutdown(self, timeout=30, put_timeout=5):
+        logger.info("Supervisor to‘xtatilmoqda...")
+        deadline = time.monotonic() + timeout
+        for worker_id, (queue, process) in enumerate(zip(self._queues, self._processes)):
+            if process is None or not process.is_alive():
+                # O‘lik ishchi navbatni o‘qimaydi - chiqishda navbat oqimi kutilmasin
+                queue.cancel_join_thread()
+                continue
+            try:
+                # Navbat to‘la va ishchi osilib qolgan bo‘lsa put cheksiz kutib qolmasin
+                queue.put(None, timeout=max(min(put_timeout, deadline - time.monotonic()), 0.1))
+            except Full:
+                logger.warning(f"Ishchi #{worker_id} navbati to‘la (signal yuborilmadi), majburan to‘xtatildi.")
+                queue.cancel_join_thread()
+                process.kill()
+        for worker_id, process in enumerate(self._processes):
+            if process is None:
+                continue
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                # SIGTERM ishchida e’tiborsiz qoldiriladi (serve_worker), shuning uchun kill
+                logger.warning(f"Ishchi #{worker_id} o‘z vaqtida to‘xtamadi, majburan to‘xtatildi.")
+                self._queues[worker_id].cancel_join_thread()
+                process.kill()
+                process.join()
+
+    async def _close_session(self):
+        session = await self.bot.get_session()
+        await session.close()
+
+
+def serve_worker(dp: Dispatcher, queue, on_startup=None, on_shutdown=None, drain_timeout=10):
+    """
+    Ishchi jarayonning asosiy tsikli: navbatdan updatelarni olib
+    dp.update_scheduler ga topshiradi. None kelganda to‘xtaydi.
+    """
+    # Ctrl+C/SIGTERM butun guruhga keladi - ishchi supervisor signalini (None) kutadi
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    loop = asyncio.get_event_loop()
+
+    async def _serve():
+        Bot.set_current(dp.bot)
+        Dispatcher.set_current(dp)
+        if on_startup:
+            await on_startup(dp)
+        scheduler = dp.update_scheduler
+        scheduler.start()
+        while True:
+            batch = await loop.run_in_executor(None, queue.get)
+            if batch is None:
+                break
+            for data in batch:
+                await scheduler.submit(types.Update(**data))
+        await scheduler.join(drain_timeout)
+        await scheduler.stop()
+        if on_shutdown:
+            await on_shutdown(dp)
+        await dp.storage.close()
+        await dp.storage.wait_closed()
+        session = await dp.bot.get_session()
+        await session.close()
+
+    loop.run_until_complete(_serve())
@@ -0,0 +1,140 @@
+import argparse
+import contextvars
+import json
+import logging
+import random
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+
+
+class Trace:
+    """Bitta update bo‘yicha yozuvlar (spanlar)"""
+
+    __slots__ = ("trace_id", "update_id", "attrs", "started", "wall_started", "spans", "finished")
+
+    def __init__(self, update_id, attrs=None):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.update_id = update_id
+        self.attrs = attrs or {}
+        self.started = time.perf_counter()
+        self.wall_started = time.time()
+        self.spans = []
+        self.finished = False
+
+    def add(self, kind, name, started, duration, **attrs):
+        if self.finished:
+            return
+        span = {"kind": kind, "name": name, "offset": round(started - self.started, 6), "duration": round(duration, 6)}
+        if attrs:
+            span.update(attrs)
+        self.spans.append(span)
+
+    def to_dict(self, duration):
+        return {
+            "trace_id": self.trace_id,
+            "update_id": self.update_id,
+            "time": round(self.wall_started, 3),
+            "duration": round(duration, 6),
+            **self.attrs,
+            "spans": self.spans,
+        }
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def add_span(kind, name, started, duration, **attrs):
+    """Joriy update tracega span qo‘shish (trace bo‘lmasa hech narsa qilmaydi)"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(kind, name, started, duration, **attrs)
+
+
+class JsonlSink:
+    """Tracelarni JSONL faylga yozish; flush() to‘xtatishda chaqiriladi"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def write(self, record):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class Tracer:
+    """
+    Update tracelari.
+
+    Har bir update uchun trace yoziladi, lekin faylga faqat sample_rate
+    ulushi va slow_threshold dan sekin bo‘lganlari chiqariladi - sekin
+    updatelar hech qachon tushib qolmaydi.
+    """
+
+    def __init__(self, sink, sample_rate=0.01, slow_threshold=1.0):
+        self.sink = sink
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+
+    def start(self, update_id, **attrs):
+        trace = Trace(update_id, attrs)
+        return trace, _current_trace.set(trace)
+
+    def finish(self, trace, token):
+        duration = time.perf_counter() - trace.started
+        trace.finished = True
+        _current_trace.reset(token)
+        if duration >= self.slow_threshold or random.random() < self.sample_rate:
+            try:
+                self.sink.write(trace.to_dict(duration))
+            except (OSError, TypeError, ValueError) as e:
+                logger.error(f"Trace {trace.trace_id} ni yozishda xato: {e}")
+
+
+def summarize(path, top=10):
+    """Eng sekin tracelar va ularning span turlari bo‘yicha taqsimoti"""
+    traces = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                traces.append(json.loads(line))
+            except ValueError:
+                continue
+    traces.sort(key=lambda t: t["duration"], reverse=True)
+    lines = [f"Jami tracelar: {len(traces)}"]
+    for trace in traces[:top]:
+        by_kind = {}
+        for span in trace["spans"]:
+            by_kind[span["kind"]] = by_kind.get(span["kind"], 0) + span["duration"]
+        handler = next((s["name"] for s in trace["spans"] if s["kind"] == "handler"), "-")
+        breakdown = ", ".join(f"{kind} {value * 1000:.1f} ms" for kind, value in sorted(by_kind.items(), key=lambda x: -x[1]))
+        lines.append(
+            f"{trace['duration'] * 1000:8.1f} ms  {trace['trace_id']}  update {trace['update_id']}  "
+            f"{trace.get('type', '-')}  {handler}  [{breakdown}]"
+        )
+        for span in sorted(trace["spans"], key=lambda s: -s["duration"])[:5]:
+            lines.append(f"            {span['duration'] * 1000:8.1f} ms  {span['kind']}:{span['name']}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Eng sekin update tracelari")
+    parser.add_argument("path", nargs="?", default="data/traces.jsonl")
+    parser.add_argument("-n", "--top", type=int, default=10)
+    args = parser.parse_args()
+    print(summarize(args.path, args.top))
@@ -0,0 +1,203 @@
+import asyncio
+import logging
+from collections import deque
+
+import aiohttp
+from aiogram import Bot, Dispatcher, types
+
+logger = logging.getLogger(__name__)
+
+
+class UpdateScheduler:
+    """
+    Updatelarni chat bo‘yicha navbatlarga (lane) ajratib qayta ishlash.
+
+    Bitta chatning updatelari qat'iy ketma-ket, turli chatlarniki esa
+    cheklangan ishchilar (workers) soni bilan parallel bajariladi. Umumiy
+    navbat yoki chat navbati to‘lsa, submit() bo‘shagan joy kutadi
+    (backpressure) - getUpdates offseti allaqachon siljigan, update tashlab
+    yuborilsa foydalanuvchi amali butunlay yo‘qoladi.
+    """
+
+    def __init__(self, dp: Dispatcher, workers=32, max_pending=1000, lane_size=20):
+        self.dp = dp
+        self.workers = workers
+        self.lane_size = lane_size
+        self._slots = asyncio.Semaphore(max_pending)
+        self._lanes = {}
+        self._lane_waiters = {}  # chat -> chat navbatida joy kutayotgan submit() lar
+        self._ready = asyncio.Queue()
+        self._tasks = []
+        self._pending = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.accepting = True
+
+    @staticmethod
+    def lane_key(update: types.Update):
+        """Update qaysi chat navbatiga tegishli"""
+        if update.message:
+            return update.message.chat.id
+        if update.edited_message:
+            return update.edited_message.chat.id
+        if update.callback_query:
+            if update.callback_query.message:
+                return update.callback_query.message.chat.id
+            return update.callback_query.from_user.id
+        if update.inline_query:
+            return update.inline_query.from_user.id
+        if update.chosen_inline_result:
+            return update.chosen_inline_result.from_user.id
+        if update.my_chat_member:
+            return update.my_chat_member.chat.id
+        return update.update_id
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def submit(self, update: types.Update):
+        """Updateni chat navbatiga qo‘yish; umumiy yoki chat navbati to‘lgan bo‘lsa kutadi"""
+        if not self.accepting:
+            return False
+        self.start()
+        key = self.lane_key(update)
+        await self._slots.acquire()
+        try:
+            # Chat navbati joy olingandan keyin tekshiriladi: kutayotganlar birga kirib lane_size dan oshirmasin
+            while True:
+                lane = self._lanes.get(key)
+                if lane is None or len(lane) < self.lane_size:
+                    break
+                waiter = asyncio.get_event_loop().create_future()
+                self._lane_waiters.setdefault(key, []).append(waiter)
+                await waiter
+        except BaseException:
+            self._slots.release()
+            raise
+        self._pending += 1
+        self._idle.clear()
+        lane = self._lanes.get(key)
+        if lane is None:
+            self._lanes[key] = deque([update])
+            self._ready.put_nowait(key)
+        else:
+            lane.append(update)
+        return True
+
+    async def join(self, timeout=None):
+        """Navbatdagi va ishlanayotgan barcha updatelar tugashini kutish"""
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def stop(self):
+        """Ishchilarni to‘xtatish"""
+        self.accepting = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self):
+        Bot.set_current(self.dp.bot)
+        Dispatcher.set_current(self.dp)
+        while True:
+            key = await self._ready.get()
+            lane = self._lanes[key]
+            update = lane[0]
+            try:
+                # aiogram ning process_updates i kabi: update darajasidagi middlewarelar ham ishlaydi.
+                # Har bir update alohida taskda (o‘z contextvars nusxasi): StateFilter keshlagan holat
+                # va trace keyingi chat updatesiga o‘tib ketmaydi
+                await asyncio.ensure_future(self.dp.updates_handler.notify(update))
+            except Exception as e:
+                logger.exception(f"Update {update.update_id} ni qayta ishlashda xato: {e}")
+            finally:
+                lane.popleft()
+                self._slots.release()
+                for waiter in self._lane_waiters.pop(key, ()):
+                    if not waiter.done():
+                        waiter.set_result(None)
+                self._pending -= 1
+                if lane:
+                    # Boshqa chatlar ham navbat olishi uchun oxiriga qo‘yiladi
+                    self._ready.put_nowait(key)
+                else:
+                    del self._lanes[key]
+                if not self._pending:
+                    self._idle.set()
+
+
+class LaneDispatcher(Dispatcher):
+    """
+    Polling orqali kelgan updatelarni UpdateScheduler ga yo‘naltiruvchi Dispatcher.
+
+    aiogram ning start_polling har bir paketni alohida taskda ishlaydi va
+    keyingi getUpdates ni kutmasdan yuboradi - navbat to‘lganda bloklangan
+    submit() lar xotirada cheksiz yig‘iladi. Bu yerda paket navbatga
+    qo‘yilmaguncha keyingi getUpdates yuborilmaydi (offset ham siljimaydi).
+    """
+
+    update_scheduler = None
+
+    async def start_polling(self, timeout=20, relax=0.1, limit=None, reset_webhook=None, fast=True,
+                            error_sleep=5, allowed_updates=None):
+        if self.update_scheduler is None:
+            return await super().start_polling(
+                timeout=timeout, relax=relax, limit=limit, reset_webhook=reset_webhook, fast=fast,
+                error_sleep=error_sleep, allowed_updates=allowed_updates
+            )
+        if self._polling:
+            raise RuntimeError('Polling already started')
+        logger.info("Polling boshlandi (navbat orqali).")
+        Dispatcher.set_current(self)
+        Bot.set_current(self.bot)
+        if reset_webhook is None:
+            await self.reset_webhook(check=False)
+        if reset_webhook:
+            await self.reset_webhook(check=True)
+
+        self._polling = True
+        offset = None
+        request_timeout = None
+        total = getattr(self.bot.timeout, "total", None)
+        if total is not None and timeout is not None:
+            request_timeout = aiohttp.ClientTimeout(total=total + timeout or 1)
+        try:
+            while self._polling:
+                try:
+                    with self.bot.request_timeout(request_timeout):
+                        updates = await self.bot.get_updates(
+                            limit=limit, offset=offset, timeout=timeout, allowed_updates=allowed_updates
+                        )
+                except asyncio.CancelledError:
+                    break
+                except Exception:
+                    logger.exception("getUpdates da xato.")
+                    await asyncio.sleep(error_sleep)
+                    continue
+                if updates:
+                    offset = updates[-1].update_id + 1
+                    # Navbat to‘lgan bo‘lsa shu yerda kutiladi (backpressure getUpdates gacha yetadi)
+                    await self.process_updates(updates, fast)
+                if relax:
+                    await asyncio.sleep(relax)
+        finally:
+            waiter = getattr(self, "_close_waiter", None)
+            if waiter is not None and not waiter.done():
+                waiter.set_result(None)
+            logger.warning("Polling to‘xtatildi.")
+
+    async def process_updates(self, updates, fast=True):
+        if self.update_scheduler is None:
+            return await super().process_updates(updates, fast)
+        for update in updates:
+            await self.update_scheduler.submit(update)
+        return []
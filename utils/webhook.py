@@ -0,0 +1,106 @@
+import asyncio
+import hmac
+import logging
+
+from aiohttp import web
+from aiogram import Bot, Dispatcher, types
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class WebhookServer:
+    """
+    Telegram webhook qabul qiluvchi aiohttp server.
+
+    So‘rov maxfiy token bo‘yicha tekshiriladi, update navbatga qo‘yiladi va
+    handlerlar ishini kutmasdan darhol 200 qaytariladi. Dispatcherda
+    update_scheduler bo‘lsa, update chat navbatiga topshiriladi (navbat
+    to‘lganda javob shu yerda kutadi - backpressure).
+    """
+
+    def __init__(self, dp: Dispatcher, path="/webhook", secret=None):
+        self.dp = dp
+        self.path = path
+        self.secret = secret
+        self._tasks = set()
+        self.app = web.Application()
+        self.app.router.add_post(path, self.handle)
+
+    async def handle(self, request: web.Request):
+        if self.secret and not hmac.compare_digest(request.headers.get(SECRET_HEADER, ""), self.secret):
+            logger.warning(f"Webhook: noto‘g‘ri maxfiy token ({request.remote})")
+            return web.Response(status=403)
+        try:
+            payload = await request.json()
+            update = types.Update(**payload)
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Webhook: noto‘g‘ri update: {e}")
+            return web.Response(status=400)
+        scheduler = getattr(self.dp, "update_scheduler", None)
+        if scheduler is not None and not scheduler.accepting:
+            # Bot to‘xtatilmoqda: Telegram updateni keyinroq qayta yuboradi
+            return web.Response(status=503)
+        await self.submit(update)
+        return web.Response(status=200)
+
+    async def submit(self, update: types.Update):
+        """Updateni chat navbatiga yoki fon vazifasiga topshirish"""
+        scheduler = getattr(self.dp, "update_scheduler", None)
+        if scheduler is not None:
+            await scheduler.submit(update)
+            return
+        task = asyncio.ensure_future(self._process(update))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _process(self, update: types.Update):
+        Bot.set_current(self.dp.bot)
+        Dispatcher.set_current(self.dp)
+        try:
+            # Update darajasidagi middlewarelar (yozib olish, tracing) ham ishlashi uchun
+            await self.dp.updates_handler.notify(update)
+        except Exception as e:
+            logger.exception(f"Update {update.update_id} ni qayta ishlashda xato: {e}")
+
+    async def wait_pending(self, timeout=10):
+        """Ishlanayotgan updatelar tugashini kutish"""
+        scheduler = getattr(self.dp, "update_scheduler", None)
+        if scheduler is not None:
+            await scheduler.join(timeout)
+        if self._tasks:
+            await asyncio.wait(list(self._tasks), timeout=timeout)
+
+
+def start_webhook(dp: Dispatcher, on_startup=None, on_shutdown=None, webhook_url=None,
+                  path="/webhook", secret=None, host="0.0.0.0", port=8080):
+    """
+    Botni webhook rejimida ishga tushirish.
+    webhook_url bo‘sh bo‘lsa setWebhook chaqirilmaydi - server lokal sinov
+    uchun (yozib olingan update JSON larini POST qilib) ishlatiladi.
+    """
+    server = WebhookServer(dp, path=path, secret=secret)
+
+    async def _on_startup(app):
+        Bot.set_current(dp.bot)
+        Dispatcher.set_current(dp)
+        if on_startup:
+            await on_startup(dp)
+        if webhook_url:
+            await dp.bot.set_webhook(webhook_url, secret_token=secret or None)
+            logger.info("Webhook o‘rnatildi: %s", webhook_url)
+
+    async def _on_shutdown(app):
+        # Webhook o‘chirilmaydi: restart paytida kelgan updatelar Telegramda navbatda qoladi
+        await server.wait_pending()
+        if on_shutdown:
+            await on_shutdown(dp)
+        await dp.storage.close()
+        await dp.storage.wait_closed()
+        session = await dp.bot.get_session()
+        await session.close()
+
+    server.app.on_startup.append(_on_startup)
+    server.app.on_shutdown.append(_on_shutdown)
+    web.run_app(server.app, host=host, port=port)